@@ -1,4 +1,7 @@
 from .out_audio import Out
 from .in_audio import In
+from .source import Source
+from .devices import Devices
+from .duplex import Duplex
 
-__all__ = ["Out", "In"]
\ No newline at end of file
+__all__ = ["Out", "In", "Source", "Devices", "Duplex"]
\ No newline at end of file
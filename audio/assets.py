@@ -0,0 +1,94 @@
+import threading
+import numpy as np
+
+from typing import Hashable, Optional
+from collections import OrderedDict
+
+
+class AssetCache:
+    """
+    Preloaded audio, already converted to the mixer layout (float32 frames at
+    the output rate and channel count).
+
+    Entries are made read-only so that every play can hand the same array to
+    the mixer without copying it. When the total size exceeds the byte budget
+    the least recently played entries are evicted; audio still playing from
+    an evicted entry keeps its own reference and finishes normally.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._assets: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._assets
+
+    def put(self, key: Hashable, frames: np.ndarray) -> None:
+        """
+        Store frames under key, replacing any previous entry.
+
+        Raises:
+            ValueError: If the frames alone exceed the budget.
+        """
+        if frames.nbytes > self.budget:
+            raise ValueError(f"Asset {key!r} needs {frames.nbytes} bytes, the cache budget is {self.budget}")
+        frames.setflags(write=False)
+        with self._lock:
+            previous = self._assets.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self._assets[key] = frames
+            self.bytes += frames.nbytes
+            self._evict()
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Return the frames stored under key and mark them recently used, or None."""
+        with self._lock:
+            frames = self._assets.get(key)
+            if frames is None:
+                self.misses += 1
+                return None
+            self._assets.move_to_end(key)
+            self.hits += 1
+            return frames
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            frames = self._assets.pop(key, None)
+            if frames is not None:
+                self.bytes -= frames.nbytes
+
+    def resize(self, budget: int) -> None:
+        """Change the budget, evicting entries until the cache fits."""
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def reset(self) -> None:
+        """Clear the hit, miss and eviction counters; entries are kept."""
+        self.hits = self.misses = self.evictions = 0
+
+    def snapshot(self) -> dict:
+        return {
+            'entries': len(self._assets),
+            'bytes': self.bytes,
+            'budget_bytes': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within budget. Caller holds _lock."""
+        while self.bytes > self.budget:
+            _, frames = self._assets.popitem(last=False)
+            self.bytes -= frames.nbytes
+            self.evictions += 1
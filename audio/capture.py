@@ -0,0 +1,278 @@
+import threading
+import numpy as np
+
+from typing import Optional, Tuple
+
+from .conversion import StreamConverter
+from .waiters import AsyncWaiters
+
+
+class CaptureBuffer:
+    """
+    Preallocated circular buffer of captured frames (frames x channels).
+
+    The audio callback is the only writer: each block is copied in with at
+    most two contiguous copies and the oldest frames are overwritten, so the
+    callback never waits on consumers. Any number of CaptureReader instances
+    pull frames at their own pace, each with its own position in the stream.
+    Frames are addressed by their absolute index since capture started.
+    """
+
+    def __init__(self, capacity: int, channels: int, dtype=np.float32):
+        self._buffer = np.zeros((capacity, channels), dtype=dtype)
+        self._write_pos = 0
+        self._data_ready = threading.Condition()
+        self._async_waiters = AsyncWaiters()
+        self.closed = False
+        self.overflows = 0
+        self.dropped_frames = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.shape[0]
+
+    @property
+    def frames_written(self) -> int:
+        """Absolute index of the next frame to be captured."""
+        return self._write_pos
+
+    @property
+    def oldest_frame(self) -> int:
+        """Absolute index of the oldest frame still held in the buffer."""
+        return max(0, self._write_pos - self.capacity)
+
+    def write(self, block: np.ndarray) -> None:
+        """Append a captured block, overwriting the oldest frames. Callback thread only."""
+        frames = block.shape[0]
+        if frames > self.capacity:
+            self._write_pos += frames - self.capacity
+            block = block[-self.capacity:]
+            frames = self.capacity
+
+        start = self._write_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        self._buffer[start:start + first] = block[:first]
+        self._buffer[:frames - first] = block[first:]
+        self._write_pos += frames
+
+        if self._data_ready.acquire(blocking=False):
+            self._data_ready.notify_all()
+            self._data_ready.release()
+        self._async_waiters.notify_all()
+
+    def close(self) -> None:
+        """Wake up all waiting readers; no more frames will arrive."""
+        with self._data_ready:
+            self.closed = True
+            self._data_ready.notify_all()
+        self._async_waiters.notify_all()
+
+    def views(self, start: int, stop: int) -> Tuple[np.ndarray, ...]:
+        """
+        Return frames [start, stop) as one or two views into the buffer.
+
+        The views are overwritten once the stream runs capacity frames past
+        start; copy them if they have to outlive that.
+
+        Raises:
+            IndexError: If the range is not held in the buffer.
+        """
+        if start < self.oldest_frame or stop > self._write_pos or start > stop:
+            raise IndexError(f"Frames [{start}, {stop}) are not in the capture buffer "
+                             f"[{self.oldest_frame}, {self._write_pos})")
+        begin = start % self.capacity
+        end = begin + stop - start
+        if end <= self.capacity:
+            return (self._buffer[begin:end],)
+        return self._buffer[begin:], self._buffer[:end - self.capacity]
+
+    def wait(self, frame: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until frame has been captured.
+
+        Returns:
+            True if it is available, False on timeout or when the buffer was closed.
+        """
+        with self._data_ready:
+            self._data_ready.wait_for(lambda: self._write_pos >= frame or self.closed, timeout)
+            return self._write_pos >= frame
+
+    async def wait_async(self, frame: int) -> bool:
+        """Coroutine version of wait without a timeout; use asyncio.wait_for to bound it."""
+        await self._async_waiters.wait_for(lambda: self._write_pos >= frame or self.closed)
+        return self._write_pos >= frame
+
+    def reader(self, start: Optional[int] = None) -> "CaptureReader":
+        """Create a reader positioned at frame start (defaults to the live edge)."""
+        return CaptureReader(self, self._write_pos if start is None else start)
+
+
+class CaptureReader:
+    """
+    Consumer position in a CaptureBuffer.
+
+    A reader that falls more than the buffer capacity behind loses the
+    overwritten frames: it jumps forward to half a buffer behind the live
+    edge and counts the loss in overflows and dropped_frames, both its own
+    and the buffer's totals over all readers.
+    """
+
+    def __init__(self, buffer: CaptureBuffer, position: int):
+        self.position = position
+        self.overflows = 0
+        self.dropped_frames = 0
+        self._buffer = buffer
+        self._scratch: Optional[np.ndarray] = None
+
+    @property
+    def available(self) -> int:
+        """Frames captured but not yet read."""
+        return self._buffer.frames_written - max(self.position, self._buffer.oldest_frame)
+
+    def read(self, frames: int, timeout: Optional[float] = None, copy: bool = True) -> Optional[np.ndarray]:
+        """
+        Block until the next frames frames are captured and return them.
+
+        Args:
+            frames: Number of frames to return
+            timeout: Maximum time to wait in seconds. None means wait indefinitely.
+            copy: False returns a view into the capture buffer when the frames are
+                  contiguous, and otherwise a scratch array reused by the next read.
+                  Either way the data is only valid until the next read.
+
+        Returns:
+            Array of shape (frames, channels), or None on timeout or when capture stopped.
+        """
+        while True:
+            self._skip_overwritten()
+            stop = self.position + frames
+            if not self._buffer.wait(stop, timeout):
+                return None
+            if self._buffer.oldest_frame > self.position:
+                continue
+
+            try:
+                views = self._buffer.views(self.position, stop)
+            except IndexError:
+                # The callback overwrote the start since the check above.
+                continue
+            if len(views) == 1 and not copy:
+                block = views[0]
+            else:
+                block = self._output(frames, views[0].shape[1], views[0].dtype, copy)
+                np.concatenate(views, out=block)
+
+            if self._buffer.oldest_frame > self.position:
+                continue
+            self.position = stop
+            return block
+
+    async def read_async(self, frames: int, copy: bool = True) -> Optional[np.ndarray]:
+        """
+        Coroutine version of read: waits without blocking the event loop.
+
+        Returns:
+            Array of shape (frames, channels), or None when capture stopped.
+        """
+        while True:
+            block = self.read(frames, timeout=0, copy=copy)
+            if block is not None or self._buffer.closed:
+                return block
+            await self._buffer.wait_async(self.position + frames)
+
+    def _output(self, frames: int, channels: int, dtype, copy: bool) -> np.ndarray:
+        if copy:
+            return np.empty((frames, channels), dtype=dtype)
+        if self._scratch is None or self._scratch.shape != (frames, channels):
+            self._scratch = np.empty((frames, channels), dtype=dtype)
+        return self._scratch
+
+    def _skip_overwritten(self) -> None:
+        oldest = self._buffer.oldest_frame
+        if self.position < oldest:
+            resume = max(oldest, self._buffer.frames_written - self._buffer.capacity // 2)
+            self.overflows += 1
+            self.dropped_frames += resume - self.position
+            self._buffer.overflows += 1
+            self._buffer.dropped_frames += resume - self.position
+            self.position = resume
+
+
+class ConvertingReader:
+    """
+    Capture consumer that receives the stream in another layout.
+
+    Wraps a CaptureReader and converts what it reads with a StreamConverter
+    in the consumer's thread, so the audio callback keeps copying native
+    blocks only. Converted frames are queued until a read can return exactly
+    the requested number, which keeps blocks a fixed size even when the rate
+    ratio does not divide the capture block.
+    """
+
+    def __init__(self, reader: CaptureReader, converter: StreamConverter):
+        self._reader = reader
+        self._converter = converter
+        plan = converter.plan
+        self._pending = np.zeros((0, plan.output_channels), dtype=converter.output_format)
+
+    @property
+    def available(self) -> int:
+        """Captured frames (at the capture rate) not yet read."""
+        return self._reader.available
+
+    @property
+    def overflows(self) -> int:
+        return self._reader.overflows
+
+    @property
+    def dropped_frames(self) -> int:
+        return self._reader.dropped_frames
+
+    def read(self, frames: int, timeout: Optional[float] = None, copy: bool = True) -> Optional[np.ndarray]:
+        """
+        Block until frames converted frames are available and return them.
+
+        Args:
+            frames: Number of frames to return, at the output rate
+            timeout: Maximum time to wait for each captured chunk in seconds,
+                     None waits indefinitely. Frames converted before a timeout
+                     are kept for the next read.
+            copy: Accepted for symmetry with CaptureReader; converted blocks are
+                  always new arrays.
+
+        Returns:
+            Array of shape (frames, output_channels), or None on timeout or when capture stopped.
+        """
+        while self._pending.shape[0] < frames:
+            block = self._reader.read(self._input_frames(frames), timeout, copy=False)
+            if block is None:
+                return None
+            self._append(block)
+        return self._take(frames)
+
+    async def read_async(self, frames: int, copy: bool = True) -> Optional[np.ndarray]:
+        """
+        Coroutine version of read: waits without blocking the event loop.
+
+        Returns:
+            Array of shape (frames, output_channels), or None when capture stopped.
+        """
+        while self._pending.shape[0] < frames:
+            block = await self._reader.read_async(self._input_frames(frames), copy=False)
+            if block is None:
+                return None
+            self._append(block)
+        return self._take(frames)
+
+    def _input_frames(self, frames: int) -> int:
+        """Captured frames needed for the converted frames still missing, rounded up."""
+        plan = self._converter.plan
+        missing = frames - self._pending.shape[0]
+        return max(1, -(-missing * plan.input_rate // plan.output_rate))
+
+    def _append(self, block: np.ndarray) -> None:
+        self._pending = np.concatenate([self._pending, self._converter.process(block)])
+
+    def _take(self, frames: int) -> np.ndarray:
+        block, self._pending = self._pending[:frames], self._pending[frames:]
+        return block
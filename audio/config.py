@@ -0,0 +1,45 @@
+import os
+
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+env_path = Path(__file__).parent / ".env"
+_env_loaded = False
+
+
+def env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a configuration variable, loading audio/.env on first use."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
+        _env_loaded = True
+    return os.getenv(name, default)
+
+
+class Setting:
+    """
+    Class attribute read from the environment on first access.
+
+    Importing the package then neither loads .env nor parses any variable.
+    The first access replaces the descriptor with the parsed value on the
+    owning class, so later reads are plain attribute lookups, and the
+    attribute can still be assigned or patched like any other.
+    """
+
+    def __init__(self, name: str, default: Optional[str], parse: Callable[[Optional[str]], Any] = str):
+        self.env_name = name
+        self.default = default
+        self.parse = parse
+
+    def __set_name__(self, owner, attribute: str) -> None:
+        self.attribute = attribute
+
+    def __get__(self, instance, owner) -> Any:
+        value = self.parse(env(self.env_name, self.default))
+        setattr(owner, self.attribute, value)
+        return value
+
+
+def optional_str(value: Optional[str]) -> Optional[str]:
+    return value or None
@@ -0,0 +1,187 @@
+import numpy as np
+
+from typing import Optional
+from functools import lru_cache
+from dataclasses import dataclass
+
+from .resampler import StreamingResampler, polyphase_filter, rate_factors
+
+PLAN_CACHE_SIZE = 64
+INT24 = np.dtype('V3')
+
+_INT24_BLOCK = 16384
+_PCM_FORMATS = {'int24': INT24}
+_PCM_SCALES = {
+    np.dtype(format): np.float32(2.0 ** (1 - 8 * np.dtype(format).itemsize))
+    for format in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32)
+}
+
+
+def pcm_format(format) -> np.dtype:
+    """Resolve a sample format (numpy type, dtype, name or 'int24') to a dtype."""
+    return _PCM_FORMATS.get(format) or np.dtype(format)
+
+
+def normalize_pcm(data, format, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decode interleaved PCM samples into float32 in the range [-1.0, 1.0).
+
+    Integer samples are scaled by 2**-(bits - 1) with ufuncs writing straight into
+    the output, so no temporaries are allocated; unsigned samples are offset
+    binary. Packed little-endian 24-bit samples are first aligned to the top of a
+    32-bit word inside the output buffer itself (the host is assumed to be
+    little-endian, as on ARM and x86) and then scaled in place block by block,
+    which bounds the overlap copy numpy makes to _INT24_BLOCK samples. float32 input is returned as a read-only
+    view when no output buffer is given, and float64 is narrowed in one copy.
+
+    Args:
+        data: Bytes or any buffer holding the samples
+        format: Sample format, see pcm_format
+        out: Optional float32 buffer with one element per sample
+
+    Returns:
+        1-D float32 array of samples.
+    """
+    format = pcm_format(format)
+    if format == INT24:
+        samples = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+    else:
+        samples = np.frombuffer(data, dtype=format)
+        if out is None and format == np.float32:
+            return samples
+    if out is None:
+        out = np.empty(samples.shape[0], dtype=np.float32)
+
+    if format == INT24:
+        words = out.view(np.uint8).reshape(-1, 4)
+        words[:, 0] = 0
+        words[:, 1:] = samples
+        aligned = out.view(np.int32)
+        for start in range(0, out.shape[0], _INT24_BLOCK):
+            block = slice(start, start + _INT24_BLOCK)
+            np.multiply(aligned[block], _PCM_SCALES[np.dtype(np.int32)], out=out[block], casting='unsafe')
+    elif format.kind in 'iu':
+        np.multiply(samples, _PCM_SCALES[format], out=out, casting='unsafe')
+        if format.kind == 'u':
+            np.subtract(out, np.float32(1.0), out=out)
+    else:
+        np.copyto(out, samples, casting='same_kind')
+    return out
+
+
+@dataclass(frozen=True)
+class ConversionPlan:
+    """Everything needed to convert one input layout to the mixer layout."""
+
+    format: np.dtype
+    input_channels: int
+    input_rate: int
+    output_channels: int
+    output_rate: int
+    channel_matrix: Optional[np.ndarray]
+    up: int
+    down: int
+    phases: Optional[np.ndarray]
+    taps: int
+
+    @property
+    def resamples(self) -> bool:
+        return self.input_rate != self.output_rate
+
+
+def conversion_plan(format, input_channels: int, input_rate: int,
+                    output_channels: int, output_rate: int) -> ConversionPlan:
+    """
+    Return the memoized conversion plan for an input/output layout.
+
+    Plans are kept in an LRU cache of PLAN_CACHE_SIZE entries; see
+    conversion_plan_info for hit and miss counters.
+    """
+    return _cached_plan(pcm_format(format), input_channels, input_rate, output_channels, output_rate)
+
+
+def conversion_plan_info():
+    """Hit/miss/size counters of the conversion plan cache."""
+    return _cached_plan.cache_info()
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _cached_plan(format: np.dtype, input_channels: int, input_rate: int,
+                 output_channels: int, output_rate: int) -> ConversionPlan:
+    up, down = rate_factors(input_rate, output_rate)
+    phases, taps = polyphase_filter(up, down) if input_rate != output_rate else (None, 0)
+    return ConversionPlan(
+        format=format,
+        input_channels=input_channels,
+        input_rate=input_rate,
+        output_channels=output_channels,
+        output_rate=output_rate,
+        channel_matrix=channel_matrix(input_channels, output_channels),
+        up=up,
+        down=down,
+        phases=phases,
+        taps=taps,
+    )
+
+
+class StreamConverter:
+    """
+    Converts a stream of (frames x channels) blocks to another rate, channel
+    count and sample format.
+
+    Samples are decoded to float32, mixed with the channel matrix of the
+    conversion plan and resampled by a StreamingResampler whose filter state
+    carries over between blocks, so consecutive blocks join like one
+    continuous signal. Integer output is clipped to full scale. The number of
+    output frames per block varies with the rate ratio; callers that need
+    fixed-size blocks assemble them from the output.
+    """
+
+    def __init__(self, format, input_channels: int, input_rate: int,
+                 output_channels: int, output_rate: int, output_format=np.float32):
+        self.plan = conversion_plan(format, input_channels, input_rate, output_channels, output_rate)
+        self.output_format = np.dtype(output_format)
+        self._resampler = StreamingResampler.from_plan(self.plan) if self.plan.resamples else None
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Convert the next block of the stream.
+
+        Args:
+            block: Array of shape (frames, input_channels) in the input format
+
+        Returns:
+            Array of shape (output_frames, output_channels) in the output format
+        """
+        plan = self.plan
+        audio_data = normalize_pcm(np.ascontiguousarray(block), plan.format).reshape(-1, plan.input_channels)
+        if plan.channel_matrix is not None:
+            audio_data = audio_data @ plan.channel_matrix
+        if self._resampler is not None:
+            audio_data = self._resampler.process(audio_data)
+        if self.output_format == np.float32:
+            return audio_data
+        audio_data = np.clip(audio_data, -1.0, 1.0)
+        return (audio_data * np.iinfo(self.output_format).max).astype(self.output_format)
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def channel_matrix(input_channels: int, output_channels: int) -> Optional[np.ndarray]:
+    """
+    Mixing matrix of shape (input_channels, output_channels), or None when the
+    layouts already match.
+
+    Mono is duplicated to stereo and stereo is averaged down to mono; other
+    layouts keep the first channels and pad the rest with silence.
+    """
+    if input_channels == output_channels:
+        return None
+
+    if input_channels == 1 and output_channels == 2:
+        matrix = np.ones((1, 2), dtype=np.float32)
+    elif input_channels == 2 and output_channels == 1:
+        matrix = np.full((2, 1), 0.5, dtype=np.float32)
+    else:
+        matrix = np.eye(input_channels, output_channels, dtype=np.float32)
+    matrix.setflags(write=False)
+    return matrix
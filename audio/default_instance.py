@@ -0,0 +1,58 @@
+import threading
+
+from functools import update_wrapper
+
+_default_lock = threading.Lock()
+
+
+class DefaultInstance(type):
+    """
+    Metaclass of classes whose class-level API acts on a shared default instance.
+
+    Methods decorated with default_method run on the default instance when
+    called on the class, so Out.write(...) keeps working next to
+    Out(device='Speaker').write(...). State the class itself does not define
+    is read, assigned and deleted on the default instance too, so Out._sources
+    is the default output's sources. The default instance is created with no
+    arguments on first use, not at import.
+    """
+
+    def default(cls):
+        """Return the default instance, creating it on first use."""
+        instance = cls._default_instance
+        if instance is None:
+            with _default_lock:
+                if cls._default_instance is None:
+                    cls._default_instance = cls()
+                instance = cls._default_instance
+        return instance
+
+    def __getattr__(cls, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(cls.default(), name)
+
+    def __setattr__(cls, name: str, value) -> None:
+        if name.startswith('__') or any(name in klass.__dict__ for klass in cls.__mro__):
+            super().__setattr__(name, value)
+        else:
+            setattr(cls.default(), name, value)
+
+    def __delattr__(cls, name: str) -> None:
+        if name in cls.__dict__:
+            super().__delattr__(name)
+        else:
+            delattr(cls.default(), name)
+
+
+class default_method:
+    """Method that is bound to the default instance when looked up on the class."""
+
+    def __init__(self, function):
+        self.function = function
+        update_wrapper(self, function)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            instance = owner.default()
+        return self.function.__get__(instance, owner)
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time as _time
+import weakref
+import sounddevice as sd
+
+from typing import Dict, List, Optional, Tuple
+
+from .config import Setting
+
+INPUT = 'input'
+OUTPUT = 'output'
+
+
+class Devices:
+    """
+    Shared, cached view of the audio devices used by In and Out.
+
+    sd.query_devices enumerates every ALSA/PulseAudio device, which takes
+    hundreds of milliseconds on the Jetson. The list is queried once and kept
+    until refresh is called or DEFAULT_AUDIO_DEVICE_REFRESH_SECONDS have
+    passed (0, the default, keeps it until refresh). Lookups by name are
+    memoized per direction, so reopening a stream costs a dictionary lookup.
+
+    PortAudio enumerates devices only when it is initialized, so re-querying
+    alone never shows a device plugged in since. A reload therefore
+    re-initializes PortAudio first, which is only possible while no stream
+    is open: streams are registered with track, and while one of them is
+    open the reload keeps PortAudio's existing list.
+    """
+
+    _refresh_seconds = Setting('DEFAULT_AUDIO_DEVICE_REFRESH_SECONDS', '0', float)
+    _devices: Optional[List[dict]] = None
+    _names: List[str] = []
+    _lookups: Dict[Tuple[str, str], Optional[int]] = {}
+    _queried_at = 0.0
+    _lock: threading.Lock = threading.Lock()
+    _streams: "weakref.WeakSet" = weakref.WeakSet()
+
+    @classmethod
+    def list(cls) -> List[dict]:
+        """Return the cached device list, querying PortAudio if needed."""
+        with cls._lock:
+            return cls._load()
+
+    @classmethod
+    def find(cls, device_name: Optional[str], kind: str = INPUT) -> Optional[int]:
+        """
+        Get device index from device name.
+
+        Args:
+            device_name: Name or case-insensitive partial name of the audio device
+            kind: 'input' or 'output'; devices without channels in that direction are skipped
+
+        Returns:
+            Index of the first matching device, or None for the default device
+        """
+        if device_name is None:
+            return None
+
+        key = (kind, device_name.lower())
+        with cls._lock:
+            devices = cls._load()
+            if key in cls._lookups:
+                return cls._lookups[key]
+            index = cls._lookups[key] = cls._match(devices, *key)
+
+        if index is None:
+            logging.warning(f"Device '{device_name}' not found, using default")
+        else:
+            logging.info(f"Selected audio {kind} device: {devices[index]['name']} (index: {index})")
+        return index
+
+    @classmethod
+    def info(cls, device_name: Optional[str], kind: str = INPUT) -> Optional[dict]:
+        """Return the cached entry of the device find selects, or None for the default device."""
+        index = cls.find(device_name, kind)
+        return None if index is None else cls.list()[index]
+
+    @classmethod
+    def refresh(cls) -> None:
+        """
+        Drop the cached device list, e.g. after a device was plugged in or removed.
+
+        The next lookup re-initializes PortAudio to enumerate the devices anew if
+        no stream is open; otherwise devices connected since PortAudio started are
+        not seen until all streams are closed and refresh is called again.
+        """
+        with cls._lock:
+            cls._devices = None
+            cls._lookups = {}
+
+    @classmethod
+    def track(cls, stream):
+        """Register an opened stream, so PortAudio is not re-initialized under it, and return it."""
+        cls._streams.add(stream)
+        return stream
+
+    @classmethod
+    def _load(cls) -> List[dict]:
+        """Return the device list, re-querying it when missing or expired. Caller holds _lock."""
+        now = _time.monotonic()
+        expired = cls._refresh_seconds > 0 and now - cls._queried_at > cls._refresh_seconds
+        if cls._devices is None or expired:
+            if cls._queried_at:
+                cls._reinitialize()
+            cls._devices = [dict(device_info) for device_info in sd.query_devices()]  # type: ignore
+            cls._names = [str(device_info['name']).lower() for device_info in cls._devices]
+            cls._lookups = {}
+            cls._queried_at = now
+        return cls._devices
+
+    @classmethod
+    def _reinitialize(cls) -> None:
+        """Restart PortAudio so it enumerates devices again, unless a stream is open. Caller holds _lock."""
+        if any(not stream.closed for stream in list(cls._streams)):
+            logging.info("Audio streams are open, device list not re-enumerated")
+            return
+        sd._terminate()
+        sd._initialize()
+
+    @classmethod
+    def _match(cls, devices: List[dict], kind: str, name: str) -> Optional[int]:
+        channels_key = f"max_{kind}_channels"
+        for idx, device_name in enumerate(cls._names):
+            if name in device_name and int(devices[idx].get(channels_key, 0)) > 0:
+                return idx
+        return None
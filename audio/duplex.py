@@ -0,0 +1,119 @@
+import numpy as np
+import sounddevice as sd
+
+from typing import Optional
+
+from .capture import CaptureBuffer
+from .devices import INPUT, OUTPUT, Devices
+from .in_audio import In
+from .out_audio import Out
+
+# PortAudio status flag bits (paInputUnderflow | paInputOverflow, and the output ones with paPrimingOutput).
+_INPUT_FLAGS = 0x1 | 0x2
+_OUTPUT_FLAGS = 0x4 | 0x8 | 0x10
+
+
+class Duplex:
+    """
+    Full-duplex audio: capture and playback on a single sd.Stream.
+
+    One callback copies each captured block into the input session's capture
+    buffer and mixes the output's sources into the block played in the same
+    period, so both directions share one clock and no buffering sits between
+    two separate streams. input is an In session and output an Out instance,
+    used exactly as standalone ones (read, frames, write, play, ...), except
+    that the device and lifecycle are managed here.
+
+    Captured frame n and played frame n belong to the same callback. The
+    mixed output is also kept in a playback buffer, and reference returns the
+    output that was audible while given input frames were recorded, which is
+    the signal an echo canceller subtracts.
+
+    Args:
+        input_device: Input device name or partial name (defaults to DEFAULT_AUDIO_IN_DEVICE)
+        output_device: Output device name or partial name (defaults to DEFAULT_AUDIO_OUT_DEVICE)
+        sample_rate: Rate of both directions (defaults to DEFAULT_AUDIO_OUT_RATE)
+        input_channels: Captured channels (defaults to DEFAULT_AUDIO_IN_CHANNELS)
+        output_channels: Played channels (defaults to DEFAULT_AUDIO_OUT_CHANNELS)
+        frame_length: Frames per block of both directions (defaults to DEFAULT_AUDIO_IN_FRAME_LENGTH)
+        latency: PortAudio latency, 'low', 'high' or seconds
+    """
+
+    def __init__(self, input_device: Optional[str] = None, output_device: Optional[str] = None,
+                 sample_rate: Optional[int] = None, input_channels: Optional[int] = None,
+                 output_channels: Optional[int] = None, frame_length: Optional[int] = None, latency=None):
+        self.output = Out(device=output_device, rate=sample_rate, channels=output_channels, latency=latency)
+        self.input = In(device=input_device, sample_rate=self.output._rate, channels=input_channels,
+                        frame_length=frame_length)
+        self.round_trip_frames = 0
+        self._latency = latency
+        self._stream: Optional[sd.Stream] = None
+        self._playback: Optional[CaptureBuffer] = None
+
+    def __enter__(self) -> "Duplex":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Open and start the duplex stream. Does nothing if it is already running."""
+        if self._stream is not None:
+            return
+        session, output = self.input, self.output
+        session._configure()
+        session._create_capture()
+        self._playback = CaptureBuffer(session._capture.capacity, output._channels, np.dtype(output._format))
+        self._stream = Devices.track(sd.Stream(
+            samplerate=output._rate,
+            blocksize=session._frame_length,
+            channels=(session._channels, output._channels),
+            dtype=(session._format, output._format),
+            device=(Devices.find(session._device, INPUT), Devices.find(output._device, OUTPUT)),
+            latency=self._latency,
+            callback=self._callback,
+        ))
+        # Both sides see the shared stream as their own, so Out does not open another one.
+        session._stream = output._stream = self._stream
+        self._stream.start()
+
+    def stop(self) -> None:
+        """Stop and close the stream; readers of the input see the end of capture."""
+        if self._stream is None:
+            return
+        stream, self._stream = self._stream, None
+        self.input._stream = self.output._stream = None
+        stream.stop()
+        stream.close()
+        self.input.stop()
+
+    def reference(self, start: int, frames: int) -> np.ndarray:
+        """
+        Return the output that was playing while input frames [start, start + frames) were captured.
+
+        Output from before the stream started is silence. The alignment uses the
+        latest round trip reported by PortAudio: the time from the input's ADC
+        capture to the output's DAC playback of the same block.
+
+        Raises:
+            IndexError: If that output has not been played yet or was overwritten.
+        """
+        begin = start - self.round_trip_frames
+        reference = np.zeros((frames, self.output._channels), dtype=np.dtype(self.output._format))
+        first = max(begin, 0)
+        if first < begin + frames:
+            np.concatenate(self._playback.views(first, begin + frames), out=reference[first - begin:])
+        return reference
+
+    def _callback(self, indata, outdata, frames, time, status) -> None:
+        """Capture and play one block. Runs on the PortAudio thread."""
+        input_status = output_status = None
+        if status:
+            input_status = sd.CallbackFlags(status._flags & _INPUT_FLAGS)
+            output_status = sd.CallbackFlags(status._flags & _OUTPUT_FLAGS)
+        self.input._capture_callback(indata, frames, time, input_status)
+        self.output._callback(outdata, frames, time, output_status)
+        self._playback.write(outdata)
+        if time is not None:
+            self.round_trip_frames = round((time.outputBufferDacTime - time.inputBufferAdcTime) * self.output._rate)
@@ -1,75 +1,484 @@
-import os
 import logging
+import threading
+import time as _time
 import numpy as np
 
-from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional, Tuple, Union
 from numpy.typing import NDArray
 import sounddevice as sd
 
-from dotenv import load_dotenv
+from .config import Setting
+from .default_instance import DefaultInstance, default_method
+from .capture import CaptureBuffer, CaptureReader, ConvertingReader
+from .conversion import StreamConverter
+from .devices import INPUT, Devices
+from .stats import CallbackStats
+from .vad import SpeechGate, speech_segments
 
-env_path = Path(__file__).parent / ".env"
-load_dotenv(env_path)
 
-class In:
+class In(metaclass=DefaultInstance):
+    """
+    Audio input: a capture session on one device.
+
+    Every instance runs its own stream, capture buffer and counters, so
+    several microphones (or one device at several rates) are captured side by
+    side without sharing state. The class-level API (In.read, In.frames, ...)
+    acts on a default session on the DEFAULT_AUDIO_IN_* device, created on
+    first use. Sessions are context managers that start capture on entry and
+    stop it on exit.
+
+    Args:
+        device: Input device name or partial name (defaults to DEFAULT_AUDIO_IN_DEVICE)
+        sample_rate: Sample rate in Hz (defaults to DEFAULT_AUDIO_IN_RATE, or to the
+                     device's default rate when a target layout is set)
+        channels: Number of audio channels (defaults to DEFAULT_AUDIO_IN_CHANNELS, or to
+                  all of the device's input channels when a target layout is set)
+        format: Data format, int16 or float32 (defaults to DEFAULT_AUDIO_IN_FORMAT)
+        frame_length: Frames per audio block and default read size
+                      (defaults to DEFAULT_AUDIO_IN_FRAME_LENGTH)
+        buffer_seconds: Capture buffer length (defaults to DEFAULT_AUDIO_IN_BUFFER_SECONDS)
+        target_rate, target_channels, target_format: Layout in which read, frames and
+            stream return audio when it differs from the device's (defaults to the
+            capture layout). The device is opened at sample_rate, channels and format,
+            and the conversion runs in the consumer's thread, not in the callback.
+    """
+
     int16 = np.int16
     float32 = np.float32
 
-    _default_frame_length = int(os.getenv('DEFAULT_AUDIO_IN_FRAME_LENGTH', '1536'))
-    _default_selected_device = os.getenv('DEFAULT_AUDIO_IN_DEVICE', 'pulse' ) 
-    _default_sample_rate = int(os.getenv('DEFAULT_AUDIO_IN_RATE', '16000'))
-    _default_channels = int(os.getenv('DEFAULT_AUDIO_IN_CHANNELS', '1'))
-    _default_format = os.getenv('DEFAULT_AUDIO_IN_FORMAT', 'float32')
-    _stream: Optional[sd.InputStream] = None
-    
-    @classmethod
-    def read(cls, callback,
+    _default_frame_length = Setting('DEFAULT_AUDIO_IN_FRAME_LENGTH', '1536', int)
+    _default_selected_device = Setting('DEFAULT_AUDIO_IN_DEVICE', 'pulse')
+    _default_sample_rate = Setting('DEFAULT_AUDIO_IN_RATE', '16000', int)
+    _default_channels = Setting('DEFAULT_AUDIO_IN_CHANNELS', '1', int)
+    _default_format = Setting('DEFAULT_AUDIO_IN_FORMAT', 'float32')
+    _default_buffer_seconds = Setting('DEFAULT_AUDIO_IN_BUFFER_SECONDS', '5', float)
+    _default_vad_threshold_db = Setting('DEFAULT_AUDIO_IN_VAD_THRESHOLD_DB', '-45', float)
+    _default_vad_hangover = Setting('DEFAULT_AUDIO_IN_VAD_HANGOVER_SECONDS', '0.3', float)
+    _default_vad_pre_roll = Setting('DEFAULT_AUDIO_IN_VAD_PRE_ROLL_SECONDS', '0.2', float)
+    _default_instance: Optional["In"] = None
+
+    def __init__(self, device: Optional[str] = None,
+                 sample_rate: Optional[int] = None,
+                 channels: Optional[int] = None,
+                 format: Optional[str] = None,
+                 frame_length: Optional[int] = None,
+                 buffer_seconds: Optional[float] = None,
+                 target_rate: Optional[int] = None,
+                 target_channels: Optional[int] = None,
+                 target_format: Optional[str] = None):
+        cls = type(self)
+        self._settings = {
+            'frame_length': frame_length or cls._default_frame_length,
+            'device': device or cls._default_selected_device,
+            'sample_rate': sample_rate,
+            'channels': channels,
+            'format': format or cls._default_format,
+            'buffer_seconds': buffer_seconds or cls._default_buffer_seconds,
+            'target_rate': target_rate,
+            'target_channels': target_channels,
+            'target_format': target_format,
+        }
+        self._configure()
+        self._stream: Optional[sd.InputStream] = None
+        self._capture: Optional[CaptureBuffer] = None
+        self._reader: Optional[Union[CaptureReader, ConvertingReader]] = None
+        self._callback_stats = CallbackStats()
+        self.speech_active = threading.Event()
+
+    def __enter__(self) -> "In":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        return f"In(device={self._device!r}, sample_rate={self._sample_rate}, channels={self._channels})"
+    
+    @default_method
+    def read(self, callback=None,
              frame_length: Optional[int] = None, 
              device: Optional[str] = None,
              sample_rate: Optional[int] = None,
              channels: Optional[int] = None,
-             format: Optional[str] = None):
+             format: Optional[str] = None,
+             timeout: Optional[float] = None,
+             target_rate: Optional[int] = None,
+             target_channels: Optional[int] = None,
+             target_format: Optional[str] = None) -> Optional[NDArray]:
         """
         Read audio frames from the microphone.
         
+        With a callback, the stream hands every block to it on the audio thread.
+        Without one, capture runs into the capture buffer (see start) and the call
+        blocks until the next frame_length frames are available and returns them;
+        successive calls return consecutive frames.
+        
         Args:
             callback: Function to call with audio data
-            frame_length: Number of frames to read
-            device: Input device name (defaults to DEFAULT_AUDIO_IN_DEVICE)
-            sample_rate: Sample rate in Hz (defaults to DEFAULT_AUDIO_IN_RATE)
-            channels: Number of audio channels (defaults to DEFAULT_AUDIO_IN_CHANNELS)
-            format: Data format (int16 or float32, defaults to DEFAULT_AUDIO_IN_FORMAT)
-        """
-        frame_length = frame_length or cls._default_frame_length
-        device = device or cls._default_selected_device
-        sample_rate = sample_rate or cls._default_sample_rate
-        channels = channels or cls._default_channels
-        format = format or cls._default_format
-        device_index = cls._get_device_index(device)
-        
-        cls._stream = sd.InputStream(
-            samplerate=sample_rate,
-            channels=channels,
-            dtype=format,
-            device=device_index,
-            blocksize=frame_length,
-            callback=callback,
-        )
+            frame_length: Number of frames to read, at the target rate when converting
+            device, sample_rate, channels, format: Override the session's settings
+                                                   for the stream this call starts
+            timeout: Maximum time to wait for frames in seconds, None waits indefinitely
+            target_rate, target_channels, target_format: Override the session's target
+                layout for the capture this call starts (see In). Callbacks always
+                receive the device's blocks unconverted.
+            
+        Returns:
+            Without a callback, an array of shape (frame_length, channels), or None
+            on timeout or when capture was stopped.
+        
+        A callback stream replaces whatever stream the session was running, which is
+        stopped and closed first.
+        """
+        if callback is None:
+            if self._capture is None:
+                self.start(frame_length, device, sample_rate, channels, format,
+                           target_rate=target_rate, target_channels=target_channels, target_format=target_format)
+            return self._reader.read(frame_length or self._block_length(self._target_rate), timeout)
+        
+        if self._stream is not None:
+            self.stop()
+        self._configure(frame_length, device, sample_rate, channels, format)
+        self._stream = self._open_stream(callback)
+        self._stream.start()
+    
+    @default_method
+    def start(self, frame_length: Optional[int] = None,
+              device: Optional[str] = None,
+              sample_rate: Optional[int] = None,
+              channels: Optional[int] = None,
+              format: Optional[str] = None,
+              buffer_seconds: Optional[float] = None,
+              target_rate: Optional[int] = None,
+              target_channels: Optional[int] = None,
+              target_format: Optional[str] = None) -> None:
+        """
+        Start capturing into a preallocated capture buffer for read and frames.
+        
+        The audio callback only copies each block into the buffer, which keeps
+        the last buffer_seconds of audio; consumers pull frames at their own pace
+        off the audio thread. Does nothing if capture is already running; a
+        callback stream started by read is stopped and closed first.
+        
+        Args:
+            frame_length, device, sample_rate, channels, format, buffer_seconds,
+            target_rate, target_channels, target_format:
+                Override the session's settings (see In) until capture is stopped
+        """
+        if self._capture is not None:
+            return
+        if self._stream is not None:
+            self.stop()
+        
+        self._configure(frame_length, device, sample_rate, channels, format, buffer_seconds,
+                        target_rate, target_channels, target_format)
+        self._create_capture()
+        self._stream = self._open_stream(self._capture_callback)
+        self._stream.start()
+    
+    @default_method
+    def frames(self, frame_length: Optional[int] = None, copy: bool = True,
+               timeout: Optional[float] = None,
+               target_rate: Optional[int] = None,
+               target_channels: Optional[int] = None,
+               target_format: Optional[str] = None) -> Iterator[NDArray]:
+        """
+        Iterate over captured audio blocks from now on, starting capture if needed.
+        
+        Every iterator keeps its own position and conversion, so several consumers
+        can read the same stream in different layouts. The iteration ends when
+        capture stops or a block takes longer than timeout to arrive.
+        
+        Args:
+            frame_length: Frames per block (defaults to the capture block size, scaled
+                          to the target rate)
+            copy: False yields arrays that are only valid until the next block is requested
+            timeout: Maximum time to wait for each block in seconds, None waits indefinitely
+            target_rate, target_channels, target_format: Layout of the blocks
+                (defaults to the session's target layout, see In)
+            
+        Yields:
+            Arrays of shape (frame_length, channels)
+        """
+        if self._capture is None:
+            self.start(frame_length)
+        reader = self._new_reader(None, target_rate, target_channels, target_format)
+        frame_length = frame_length or self._block_length(target_rate or self._target_rate)
+        while True:
+            block = reader.read(frame_length, timeout, copy)
+            if block is None:
+                return
+            yield block
+    
+    @default_method
+    async def stream(self, frame_length: Optional[int] = None, copy: bool = True,
+                     target_rate: Optional[int] = None,
+                     target_channels: Optional[int] = None,
+                     target_format: Optional[str] = None) -> AsyncIterator[NDArray]:
+        """
+        Asynchronously iterate over captured audio blocks from now on.
+        
+        The asyncio counterpart of frames: the event loop is woken from the audio
+        callback when a block arrives, without polling or helper threads. The
+        iteration ends when capture stops.
+        
+        Args:
+            frame_length: Frames per block (defaults to the capture block size, scaled
+                          to the target rate)
+            copy: False yields arrays that are only valid until the next block is requested
+            target_rate, target_channels, target_format: Layout of the blocks
+                (defaults to the session's target layout, see In)
+            
+        Yields:
+            Arrays of shape (frame_length, channels)
+        """
+        if self._capture is None:
+            self.start(frame_length)
+        reader = self._new_reader(None, target_rate, target_channels, target_format)
+        frame_length = frame_length or self._block_length(target_rate or self._target_rate)
+        while True:
+            block = await reader.read_async(frame_length, copy)
+            if block is None:
+                return
+            yield block
+    
+    @default_method
+    def time(self, frames: bool = False):
+        """
+        Read the capture clock: the position of the next frame to be captured.
+
+        The clock counts frames at the capture rate from when capture started
+        and is the index used by history.
 
-        cls._stream.start()
-    
-    @classmethod
-    def stop(cls) -> None:
-        """Cleanup on exit."""
-        if cls._stream is not None:
-            cls._stream.stop()
-            cls._stream.close()
-            cls._stream = None
+        Args:
+            frames: Return the frame index instead of seconds
+
+        Returns:
+            Seconds (float) or frames (int) since capture started, 0 when it is not running.
+        """
+        captured = self._capture.frames_written if self._capture is not None else 0
+        if frames:
+            return captured
+        return captured / self._sample_rate
+    
+    @default_method
+    def history(self, seconds: Optional[float] = None, start=None,
+                copy: bool = False) -> Union[Tuple[NDArray, ...], NDArray]:
+        """
+        Return recently captured audio straight from the capture buffer.
+        
+        The capture buffer keeps the last buffer_seconds of audio in the capture
+        layout whether or not anyone reads it, so a wake word detector can fetch
+        the audio from before its trigger without keeping blocks of its own.
+        
+        Args:
+            seconds: Return the last seconds of audio, or all that is held if less
+            start: Return audio from this point up to now instead: a frame index (int)
+                   or seconds (float) on the capture clock, see time
+            copy: Return one new array instead of views
+            
+        Returns:
+            One or two views of shape (frames, channels) in stream order, valid until
+            the capture runs buffer_seconds past them, or one array with copy=True.
+            Nothing is held while capture is not running.
+        
+        Raises:
+            IndexError: If start is older than the buffer holds, or was overwritten
+                        while being copied.
+        """
+        capture = self._capture
+        if capture is None:
+            return np.zeros((0, self._channels), dtype=np.dtype(self._format)) if copy else ()
+        stop = capture.frames_written
+        if start is None:
+            held = stop - capture.oldest_frame
+            start = stop - (held if seconds is None else min(held, round(seconds * self._sample_rate)))
+        elif not isinstance(start, (int, np.integer)):
+            start = round(start * self._sample_rate)
+        
+        views = capture.views(start, stop)
+        if not copy:
+            return views
+        frames = np.concatenate(views)
+        if capture.oldest_frame > start:
+            raise IndexError(f"Frames from {start} were overwritten while being copied")
+        return frames
+    
+    @default_method
+    def speech(self, frame_length: Optional[int] = None,
+               timeout: Optional[float] = None,
+               threshold_db: Optional[float] = None,
+               hangover: Optional[float] = None,
+               pre_roll: Optional[float] = None,
+               target_rate: Optional[int] = None,
+               target_channels: Optional[int] = None,
+               target_format: Optional[str] = None) -> Iterator[Iterator[NDArray]]:
+        """
+        Iterate over speech segments from now on, starting capture if needed.
+        
+        Blocks are gated by a SpeechGate on the consumer's thread: silence is
+        read and dropped here, so the caller only wakes up for speech. Each
+        segment is an iterator over its blocks, starting with up to pre_roll
+        seconds before the onset and ending hangover seconds after the last
+        speech block. speech_active is set while a segment is open.
+        
+        Args:
+            frame_length, timeout, target_rate, target_channels, target_format: As for frames
+            threshold_db: Minimum block level in dBFS (defaults to DEFAULT_AUDIO_IN_VAD_THRESHOLD_DB)
+            hangover: Seconds a segment stays open after speech stops
+                      (defaults to DEFAULT_AUDIO_IN_VAD_HANGOVER_SECONDS)
+            pre_roll: Seconds of audio kept before the onset (defaults to DEFAULT_AUDIO_IN_VAD_PRE_ROLL_SECONDS)
+            
+        Yields:
+            Iterators of arrays of shape (frame_length, channels)
+        """
+        if self._capture is None:
+            self.start(frame_length)
+        cls = type(self)
+        gate = SpeechGate(
+            target_rate or self._target_rate or self._sample_rate,
+            threshold_db=cls._default_vad_threshold_db if threshold_db is None else threshold_db,
+            hangover=cls._default_vad_hangover if hangover is None else hangover,
+            pre_roll=cls._default_vad_pre_roll if pre_roll is None else pre_roll,
+            active=self.speech_active,
+        )
+        blocks = self.frames(frame_length, timeout=timeout, target_rate=target_rate,
+                             target_channels=target_channels, target_format=target_format)
+        yield from speech_segments(blocks, gate)
+    
+    @default_method
+    def _capture_callback(self, indata, frames, time, status) -> None:
+        """Copy each captured block into the capture buffer."""
+        started = _time.perf_counter()
+        if status:
+            logging.warning(f"Audio input status: {status}")
+        self._capture.write(indata)
+        self._callback_stats.record(_time.perf_counter() - started, frames, self._sample_rate, status)
+    
+    @default_method
+    def stats(self, reset: bool = False) -> dict:
+        """
+        Snapshot of capture performance counters.
+        
+        Args:
+            reset: Clear the callback counters after reading them
+            
+        Returns:
+            Dictionary with:
+              callback: callbacks and frames captured, mean/max callback time against
+                        the block budget with a histogram, and PortAudio overflow counts
+              capture: frames captured, milliseconds not yet returned by read, and the
+                       overflows and dropped frames of consumers that fell behind
+        """
+        callback = self._callback_stats.snapshot()
+        if reset:
+            self._callback_stats.reset()
+        capture, reader = self._capture, self._reader
+        if capture is None:
+            return {'callback': callback, 'capture': None}
+        return {
+            'callback': callback,
+            'capture': {
+                'frames_captured': capture.frames_written,
+                'buffer_ms': capture.capacity / self._sample_rate * 1000,
+                'unread_ms': reader.available / self._sample_rate * 1000,
+                'overflows': capture.overflows,
+                'dropped_frames': capture.dropped_frames,
+            },
+        }
+    
+    @default_method
+    def _configure(self, frame_length=None, device=None, sample_rate=None, channels=None, format=None,
+                   buffer_seconds=None, target_rate=None, target_channels=None, target_format=None) -> None:
+        """Set up the next stream from the session's settings and the per-call overrides."""
+        settings = self._settings
+        self._frame_length = frame_length or settings['frame_length']
+        self._device = device or settings['device']
+        self._format = format or settings['format']
+        self._buffer_seconds = buffer_seconds or settings['buffer_seconds']
+        self._target_rate = target_rate or settings['target_rate']
+        self._target_channels = target_channels or settings['target_channels']
+        self._target_format = target_format or settings['target_format']
+        self._sample_rate = sample_rate or settings['sample_rate']
+        self._channels = channels or settings['channels']
+        if not (self._sample_rate and self._channels):
+            self._native_layout()
+    
+    @default_method
+    def _native_layout(self) -> None:
+        """
+        Fill in the rate and channel count not given: the device's own when a target
+        layout is set, so it is opened without resampling in PulseAudio or ALSA, and
+        DEFAULT_AUDIO_IN_RATE/CHANNELS otherwise.
+        """
+        cls = type(self)
+        info = None
+        if self._target_rate or self._target_channels or self._target_format:
+            info = Devices.info(self._device, INPUT)
+        if not self._sample_rate:
+            rate = info and info.get('default_samplerate')
+            self._sample_rate = int(rate) if rate else cls._default_sample_rate
+        if not self._channels:
+            channels = info and info.get('max_input_channels')
+            self._channels = int(channels) if channels else cls._default_channels
+    
+    @default_method
+    def _create_capture(self) -> None:
+        """Allocate the capture buffer for the configured stream, with a reader at its start."""
+        capacity = max(int(self._buffer_seconds * self._sample_rate), 2 * self._frame_length)
+        self._capture = CaptureBuffer(capacity, self._channels, np.dtype(self._format))
+        self._reader = self._new_reader(0)
+    
+    @default_method
+    def _new_reader(self, start: Optional[int], target_rate=None, target_channels=None,
+                    target_format=None) -> Union[CaptureReader, ConvertingReader]:
+        """
+        Return a reader of the capture buffer from frame start (None for now on),
+        converting to the target layout when it differs from the captured one.
+        """
+        reader = self._capture.reader(start=start)
+        rate = target_rate or self._target_rate or self._sample_rate
+        channels = target_channels or self._target_channels or self._channels
+        format = np.dtype(target_format or self._target_format or self._format)
+        if (rate, channels, format) == (self._sample_rate, self._channels, np.dtype(self._format)):
+            return reader
+        converter = StreamConverter(self._format, self._channels, self._sample_rate, channels, rate, format)
+        return ConvertingReader(reader, converter)
+    
+    @default_method
+    def _block_length(self, rate: Optional[int]) -> int:
+        """Capture block size expressed in frames at rate (None for the capture rate)."""
+        if not rate:
+            return self._frame_length
+        return max(1, round(self._frame_length * rate / self._sample_rate))
+    
+    @default_method
+    def _open_stream(self, callback) -> sd.InputStream:
+        return Devices.track(sd.InputStream(
+            samplerate=self._sample_rate,
+            channels=self._channels,
+            dtype=self._format,
+            device=self._get_device_index(self._device),
+            blocksize=self._frame_length,
+            callback=callback,
+        ))
+    
+    @default_method
+    def stop(self) -> None:
+        """Stop and close the stream and capture buffer; the session can be started again."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+            self._reader = None
         logging.info("Microphone terminated gracefully")
     
-    @classmethod
-    def _get_device_index(cls, device_name: Optional[str]) -> Optional[int]:
+    @default_method
+    def _get_device_index(self, device_name: Optional[str]) -> Optional[int]:
         """
         Get device index from device name.
         
@@ -79,18 +488,4 @@ class In:
         Returns:
             Device index or None for default device
         """
-        if device_name is None:
-            return None
-            
-        devices = sd.query_devices()
-        for idx, device_info in enumerate(devices):
-            name = str(device_info['name'])  # type: ignore
-            max_input = int(device_info['max_input_channels'])  # type: ignore
-            
-            if device_name.lower() in name.lower():
-                if max_input > 0:
-                    logging.info(f"Selected audio input device: {name} (index: {idx})")
-                    return idx
-        
-        logging.warning(f"Device '{device_name}' not found, using default")
-        return None
+        return Devices.find(device_name, INPUT)
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class Mixer:
+    """
+    Output stage of the audio callback, working entirely in preallocated memory.
+
+    accumulator hands out a zeroed float32 block for the sources to be added
+    onto: the device buffer itself when the stream is float32, otherwise a
+    persistent scratch buffer. write then limits the mix in place and stores
+    it in the device buffer, converting with ufuncs that write straight into
+    their destination. Scratch buffers are only reallocated when the block
+    layout changes or a larger block arrives, so the cost per block does not
+    depend on the source count beyond one in-place add per source.
+    """
+
+    def __init__(self):
+        self._scratch = np.zeros((0, 0), dtype=np.float32)
+        self._work = np.zeros((0, 0), dtype=np.float32)
+
+    def accumulator(self, outdata: np.ndarray) -> np.ndarray:
+        """Return a zeroed float32 block of outdata's shape to mix into."""
+        if outdata.dtype == np.float32:
+            mixed = outdata
+        else:
+            self._scratch = self._fit(self._scratch, outdata.shape)
+            mixed = self._scratch[:outdata.shape[0]]
+        mixed.fill(0)
+        return mixed
+
+    def write(self, mixed: np.ndarray, outdata: np.ndarray, limit: float = 0.0) -> None:
+        """
+        Bring mixed into [-1.0, 1.0] and store it in outdata.
+
+        Args:
+            mixed: Block returned by accumulator, modified in place
+            outdata: Device buffer (float32 or a signed integer format)
+            limit: Soft limiter threshold in (0, 1); 0 hard-clips instead
+        """
+        if limit and (mixed.max() > limit or mixed.min() < -limit):
+            self._soft_limit(mixed, limit)
+        mixed.clip(-1.0, 1.0, out=mixed)
+        if mixed is not outdata:
+            np.multiply(mixed, np.iinfo(outdata.dtype).max, out=mixed)
+            np.copyto(outdata, mixed, casting='unsafe')
+
+    def _soft_limit(self, mixed: np.ndarray, limit: float) -> None:
+        """
+        Compress samples above limit with a tanh knee.
+
+        Below the threshold the signal is untouched; above it the excess is
+        mapped through limit + (1 - limit) * tanh(excess / (1 - limit)), which
+        joins with unit slope and approaches full scale asymptotically.
+        """
+        headroom = 1.0 - limit
+        self._work = self._fit(self._work, mixed.shape)
+        over = np.abs(mixed, out=self._work[:mixed.shape[0]])
+        np.subtract(over, limit, out=over)
+        np.maximum(over, 0.0, out=over)
+        # mixed -= sign(mixed) * (over - headroom * tanh(over / headroom)), computed in place.
+        np.copysign(over, mixed, out=over)
+        np.subtract(mixed, over, out=mixed)
+        np.divide(over, headroom, out=over)
+        np.tanh(over, out=over)
+        np.multiply(over, headroom, out=over)
+        np.add(mixed, over, out=mixed)
+
+    @staticmethod
+    def _fit(buffer: np.ndarray, shape) -> np.ndarray:
+        """Return buffer if it holds at least shape[0] frames of shape[1] channels, else a new one."""
+        if buffer.shape[0] < shape[0] or buffer.shape[1] != shape[1]:
+            buffer = np.zeros(shape, dtype=np.float32)
+        return buffer
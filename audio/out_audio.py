@@ -1,46 +1,416 @@
-import os
 import logging
+import queue
+import sys
 import atexit
-import inspect
-import base64
+import itertools
 import numpy as np
 import threading
+import time as _time
+import weakref
 import sounddevice as sd
 
-from typing import Optional
-from collections import defaultdict
-from scipy import signal
-from pathlib import Path
+from typing import Any, Coroutine, Deque, Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-from dotenv import load_dotenv
+from .assets import AssetCache
+from .config import Setting, optional_str
+from .default_instance import DefaultInstance, default_method
+from .conversion import INT24, conversion_plan, normalize_pcm, pcm_format
+from .resampler import StreamingResampler
+from .devices import OUTPUT, Devices
+from .mixer import Mixer
+from .source import BLOCK, DROP_NEWEST, RAISE, Source
+from .stats import CallbackStats, DurationStats
+from .waiters import AsyncWaiters
+from .wav import WavFile
 
-env_path = Path(__file__).parent / ".env"
-load_dotenv(env_path)
 
-class Out:
+class Out(metaclass=DefaultInstance):
+    """
+    Audio output: mixes any number of sources into one device stream.
+
+    Every instance drives its own device with its own stream, mixer, sources
+    and lock, so several outputs play concurrently without contending. The
+    class-level API (Out.write, Out.open_source, ...) acts on a default
+    instance on the DEFAULT_AUDIO_OUT_* device, created on first use.
+
+    Args:
+        device: Device name or partial name, None for the system default
+                (defaults to DEFAULT_AUDIO_OUT_DEVICE)
+        rate: Output sample rate in Hz (defaults to DEFAULT_AUDIO_OUT_RATE)
+        channels: Output channel count (defaults to DEFAULT_AUDIO_OUT_CHANNELS)
+        format: Device sample format, Out.float32 or Out.int16
+                (defaults to DEFAULT_AUDIO_OUT_FORMAT)
+        latency: PortAudio latency, 'low', 'high' or seconds (defaults to the
+                 device's high latency)
+    """
+
+    uint8 = np.uint8
     int16 = np.int16
+    int24 = INT24
+    int32 = np.int32
     float32 = np.float32
+    float64 = np.float64
 
-    _playback_finished: threading.Event = threading.Event()
-    _default_channels = int(os.getenv('DEFAULT_AUDIO_OUT_CHANNELS', '2'))
-    _default_rate = int(os.getenv('DEFAULT_AUDIO_OUT_RATE', '44100'))
-    _default_format = float32 if os.getenv('DEFAULT_AUDIO_OUT_FORMAT', 'float32') == 'float32' else int16
-    _sources = defaultdict(list)
-    _lock: threading.Lock = threading.Lock()
-    _stream: Optional[sd.OutputStream] = None
+    _default_channels = Setting('DEFAULT_AUDIO_OUT_CHANNELS', '2', int)
+    _default_rate = Setting('DEFAULT_AUDIO_OUT_RATE', '44100', int)
+    _default_format = Setting('DEFAULT_AUDIO_OUT_FORMAT', 'float32',
+                              lambda value: np.float32 if value == 'float32' else np.int16)
+    _default_device = Setting('DEFAULT_AUDIO_OUT_DEVICE', None, optional_str)
+    _default_conversion_workers = Setting('DEFAULT_AUDIO_OUT_WORKERS', '0', int)
+    _default_limiter = Setting('DEFAULT_AUDIO_OUT_LIMITER', '0', float)
+    _default_asset_cache_mb = Setting('DEFAULT_AUDIO_OUT_ASSET_CACHE_MB', '64', float)
+    _async_buffer_seconds = Setting('DEFAULT_AUDIO_OUT_ASYNC_BUFFER_SECONDS', '0.5', float)
+    _file_read_ahead_seconds = Setting('DEFAULT_AUDIO_OUT_FILE_READ_AHEAD_SECONDS', '1.0', float)
+    _source_ids = itertools.count(1)
+    _default_instance: Optional["Out"] = None
+    _instances: "weakref.WeakSet[Out]" = weakref.WeakSet()
 
-    @classmethod
-    def write(cls, data: bytes, format = _default_format, channels = _default_channels, rate = _default_rate) -> None:
-        """Play audio data."""
-        cls._initiate_stream()
-        source_id = cls._get_source_id()
-        audio_data = cls._process_data(data, format, channels, rate)
-        with cls._lock:
-            cls._sources[source_id].append(audio_data)
-            cls._playback_finished.clear()
+    def __init__(self, device: Optional[str] = None, rate: Optional[int] = None, channels: Optional[int] = None,
+                 format = None, latency=None):
+        cls = type(self)
+        self._device = device if device is not None else cls._default_device
+        self._rate = rate or cls._default_rate
+        self._channels = channels or cls._default_channels
+        self._format = format or cls._default_format
+        self._latency = latency
+        self._limiter = cls._default_limiter
+        self._conversion_workers = cls._default_conversion_workers
+        self._asset_cache_mb = cls._default_asset_cache_mb
 
-    @classmethod
-    def wait_until_finished(cls, timeout: Optional[float] = None) -> bool:
+        self._lock = threading.Lock()
+        self._stream: Optional[sd.OutputStream] = None
+        self._sources: Dict[str, Source] = {}
+        self._active_sources: Dict[str, Source] = {}
+        self._pending_sources: Deque[Source] = deque()
+        self._playback_finished = threading.Event()
+        self._playback_finished.set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._async_waiters = AsyncWaiters()
+        self._mixer = Mixer()
+        self._frames_mixed = 0
+        self._callback_stats = CallbackStats()
+        self._conversion_stats = DurationStats()
+        self._stats_lock = threading.Lock()
+        self._assets: Optional[AssetCache] = None
+        self._space_available = threading.Condition()
+        self._blocked_writers = 0
+        cls._instances.add(self)
+
+    def __repr__(self) -> str:
+        return f"Out(device={self._device!r}, rate={self._rate}, channels={self._channels})"
+
+    @default_method
+    def write(self, data, format = None, channels: Optional[int] = None, rate: Optional[int] = None,
+              copy: bool = True, at=None) -> None:
+        """
+        Play audio data.
+
+        Args:
+            data: bytes, a NumPy array or any buffer-protocol object (e.g. memoryview)
+            format: Sample format (defaults to the dtype of an array or typed buffer; raw
+                    bytes, including byte-typed buffers such as memoryview(bytes), are
+                    read in the output format)
+            channels: Number of channels (defaults to the second dimension of a 2-D array,
+                      else the output channel count)
+            rate: Sample rate in Hz (defaults to the output rate)
+            copy: False hands the data over to the mixer: float32 frames already at the
+                  output rate and channel count are then played in place without any
+                  copy, so the caller must not modify them afterwards.
+            at: Start playback exactly on this point of the stream clock (see time):
+                an int is a frame index, a float is in seconds. Without it the audio
+                follows what the source has queued, or starts right away. Audio
+                scheduled for a moment that has passed starts right away. Scheduled
+                writes to one source have to be in time order.
+
+        Writes are grouped into one source per calling line, so consecutive chunks
+        written from the same place play back to back. Use open_source to get an
+        explicit handle per logical stream instead.
+
+        With conversion workers enabled (see set_conversion_workers) the raw data is
+        queued and converted on a worker thread, and this call returns immediately.
+        Writes from the same source are still played in the order they were made.
+        """
+        source = self._call_site_source(self._get_source_id())
+        try:
+            self._write_source(source, data, format, channels, rate, copy, at)
+        finally:
+            with self._lock:
+                source.writers -= 1
+
+    @default_method
+    def write_async(self, data, format = None, channels: Optional[int] = None, rate: Optional[int] = None,
+                    copy: bool = True, at=None) -> Coroutine[Any, Any, None]:
+        """
+        Play audio data from a coroutine, with backpressure.
+
+        Takes the same arguments as write. Once the data is queued, waits until the
+        source has less than DEFAULT_AUDIO_OUT_ASYNC_BUFFER_SECONDS of audio left,
+        so a producer awaiting each write stays just ahead of playback. The event
+        loop is woken from the audio callback; no thread is used for waiting.
+
+        The calling line is identified when write_async is called, not when the
+        returned coroutine runs, so writes wrapped in asyncio.create_task or gather
+        still get one source per call site.
+        """
+        return self._write_call_site_async(self._get_source_id(), data, format, channels, rate, copy, at)
+
+    @default_method
+    async def _write_call_site_async(self, source_id: str, data, format, channels, rate, copy, at) -> None:
+        source = self._call_site_source(source_id)
+        try:
+            await self._write_source_async(source, data, format, channels, rate, copy, at)
+        finally:
+            with self._lock:
+                source.writers -= 1
+
+    @default_method
+    def preload(self, key, data, format = None, channels: Optional[int] = None, rate: Optional[int] = None) -> None:
+        """
+        Convert audio once and keep it for play.
+
+        The data is decoded, remixed and resampled to the output layout up front and
+        stored read-only in the asset cache, which evicts the least recently played
+        assets beyond DEFAULT_AUDIO_OUT_ASSET_CACHE_MB (see set_asset_cache_size).
+
+        Args:
+            key: Any hashable name for the asset; preloading a key again replaces it
+            data, format, channels, rate: As for write
+
+        Raises:
+            ValueError: If the converted asset alone is larger than the cache.
+        """
+        data, format, channels, rate = self._input_layout(data, format, channels, rate)
+        frames = self._process_data(data, format, channels, rate)
+        if np.may_share_memory(frames, data if isinstance(data, np.ndarray) else np.frombuffer(data, np.uint8)):
+            frames = frames.copy()
+        self._get_assets().put(key, np.ascontiguousarray(frames))
+
+    @default_method
+    def play(self, key, at=None) -> None:
+        """
+        Play a preloaded asset.
+
+        The cached frames are queued as a read-only view, so a replay does no
+        conversion or copying; its only cost is being mixed. Plays are grouped
+        into sources by calling line like writes.
+
+        Args:
+            key: Key the asset was preloaded under
+            at: Start time on the stream clock, as for write
+
+        Raises:
+            KeyError: If no asset is cached under key (never preloaded or evicted).
+        """
+        source = self._call_site_source(self._get_source_id())
+        try:
+            self._play_source(source, key, at)
+        finally:
+            with self._lock:
+                source.writers -= 1
+
+    @default_method
+    def play_file(self, path, at=None, read_ahead: Optional[float] = None) -> Source:
+        """
+        Stream a WAV file from disk.
+
+        The PCM payload is memory-mapped and converted in chunks on a feeder
+        thread that keeps read_ahead seconds queued ahead of the mixer, so
+        playback starts after the first chunk and memory use does not grow
+        with the length of the file.
+
+        Args:
+            path: WAV file (8/16/24/32-bit integer or 32/64-bit float PCM)
+            at: Start time on the stream clock, as for write
+            read_ahead: Seconds of converted audio to keep queued
+                        (defaults to DEFAULT_AUDIO_OUT_FILE_READ_AHEAD_SECONDS)
+
+        Returns:
+            The Source playing the file. Closing it stops reading the file once
+            the audio already queued has played.
+
+        Raises:
+            ValueError: If the file is not a WAV file in a supported encoding.
+        """
+        wav = WavFile(path)
+        read_ahead = self._file_read_ahead_seconds if read_ahead is None else read_ahead
+        start_frame = None if at is None else self._start_frame(at)
+        source = self.open_source(wav.path.stem)
+        source.feeding = True
+        self._initiate_stream()
+        threading.Thread(target=self._feed_file, args=(source, wav, start_frame, read_ahead),
+                         name=f"audio-file-{source.id}", daemon=True).start()
+        return source
+
+    @default_method
+    def time(self, frames: bool = False):
+        """
+        Read the stream clock: the position of the next block to be mixed.
+
+        The clock counts output frames from when the stream opened and is the
+        reference for write(..., at=...). Everything mixed reaches the speaker
+        after the same device latency, so sources scheduled on this clock stay
+        aligned to the sample.
+
+        Args:
+            frames: Return the frame index instead of seconds
+
+        Returns:
+            Seconds (float) or frames (int) since the stream opened.
+        """
+        if frames:
+            return self._frames_mixed
+        return self._frames_mixed / self._rate
+
+    @default_method
+    async def drain(self) -> None:
+        """
+        Wait until all audio sources finish playing; the asyncio counterpart of
+        wait_until_finished. Use asyncio.wait_for to bound the wait.
+        """
+        await self._async_waiters.wait_for(self._is_idle)
+
+    @default_method
+    def open_source(self, name: Optional[str] = None, max_backlog_ms: Optional[float] = None,
+                    max_backlog_bytes: Optional[int] = None, policy: str = BLOCK) -> Source:
+        """
+        Open an explicit playback source.
+
+        Every handle is mixed as its own stream, independently of where it is
+        written from. Closing a handle lets its queued audio finish playing.
+
+        Args:
+            name: Optional label used as prefix of the source id
+            max_backlog_ms: Most audio the source may have queued, in milliseconds
+            max_backlog_bytes: Most audio the source may have queued, in bytes of
+                               converted (float32) frames; the smaller limit applies
+            policy: What a write that does not fit does (see audio.source):
+                    'block' waits for the mixer to make room (a write longer than
+                    the whole limit waits for the queue to empty), 'drop_oldest'
+                    discards the oldest queued audio, 'drop_newest' discards what
+                    does not fit of the write, and 'raise' raises queue.Full.
+                    Writes to a bounded source are converted in the writing thread.
+
+        Returns:
+            Source handle with write and close methods; also a context manager.
+            Its backlog_ms property tells producers how much audio is queued.
+
+        Raises:
+            ValueError: If policy is not one of the above.
+        """
+        limits = []
+        if max_backlog_ms is not None:
+            limits.append(int(max_backlog_ms * self._rate / 1000))
+        if max_backlog_bytes is not None:
+            limits.append(max_backlog_bytes // (self._channels * np.dtype(np.float32).itemsize))
+        max_frames = min(limits) if limits else None
+        with self._lock:
+            self._prune_sources()
+            source_id = f"{name or 'source'}-{next(self._source_ids)}"
+            source = Source(source_id, self._channels, owner=self, max_frames=max_frames, policy=policy)
+            self._sources[source_id] = source
+        return source
+
+    @default_method
+    def set_device(self, device: Optional[str]) -> None:
+        """
+        Select the output device. An open stream is reopened on the new device
+        and queued audio carries on playing there.
+
+        Args:
+            device: Device name or partial name, None for the system default
+        """
+        with self._lock:
+            self._device = device
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+            self._initiate_stream()
+
+    @default_method
+    def close(self) -> None:
+        """
+        Stop playback and release the device: close the stream, discard queued
+        audio, shut down the conversion workers and forget this output. Writers
+        blocked on a full source return. Closing the default output makes the
+        class-level API create a fresh one on next use.
+        """
+        cls = type(self)
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            sources = list(self._sources.values())
+            self._sources.clear()
+            self._active_sources.clear()
+            self._pending_sources.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for source in sources:
+            source.close()
+        with self._space_available:
+            self._space_available.notify_all()
+        self._async_waiters.notify_all()
+        self._playback_finished.set()
+        cls._instances.discard(self)
+        if cls._default_instance is self:
+            cls._default_instance = None
+
+    def __enter__(self) -> "Out":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @default_method
+    def set_limiter(self, threshold: float) -> None:
+        """
+        Enable the soft limiter on the mixed output.
+
+        Args:
+            threshold: Level in (0, 1) above which peaks are smoothly compressed so the
+                       mix never hard-clips. 0 hard-clips at full scale instead (the
+                       default, overridable with DEFAULT_AUDIO_OUT_LIMITER).
+        """
+        if not 0.0 <= threshold < 1.0:
+            raise ValueError(f"Limiter threshold must be in [0, 1), got {threshold}")
+        self._limiter = threshold
+
+    @default_method
+    def set_asset_cache_size(self, megabytes: float) -> None:
+        """
+        Set the memory budget of preloaded assets, evicting the least recently
+        played ones until they fit.
+
+        Args:
+            megabytes: Budget in MiB (defaults to DEFAULT_AUDIO_OUT_ASSET_CACHE_MB)
+        """
+        self._asset_cache_mb = megabytes
+        self._get_assets().resize(int(megabytes * 2**20))
+
+    @default_method
+    def set_conversion_workers(self, workers: int) -> None:
+        """
+        Set the number of background conversion threads.
+
+        Args:
+            workers: Thread pool size. 0 converts synchronously in write (the default,
+                     overridable with DEFAULT_AUDIO_OUT_WORKERS).
+        """
+        with self._lock:
+            previous = self._executor
+            self._conversion_workers = workers
+            self._executor = None
+        if previous is not None:
+            previous.shutdown(wait=True)
+
+    @default_method
+    def wait_until_finished(self, timeout: Optional[float] = None) -> bool:
         """
         Block until all audio sources finish playing.
         
@@ -50,170 +420,397 @@ class Out:
         Returns:
             True if playback finished, False if timeout occurred.
         """
-        return cls._playback_finished.wait(timeout=timeout)
+        deadline = None if timeout is None else _time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - _time.monotonic())
+            if not self._playback_finished.wait(timeout=remaining):
+                return False
+            if self._is_idle():
+                return True
+            self._playback_finished.clear()
 
-    @classmethod
-    def _callback(cls, outdata, frames, time, status):
-        """Mix and play audio from all sources."""
+    @default_method
+    def stats(self, reset: bool = False) -> dict:
+        """
+        Snapshot of playback performance counters.
+
+        Args:
+            reset: Clear the callback and conversion counters after reading them
+
+        Returns:
+            Dictionary with:
+              callback: callbacks and frames mixed, mean/max callback time against the
+                        block budget (frames / rate) and a histogram of callback time as
+                        a fraction of that budget, plus PortAudio underflow/overflow counts
+              conversion: writes converted, frames produced and mean/max time spent
+                          converting them (in write or on the conversion workers)
+              sources: milliseconds of audio queued per source id
+              assets: preloaded asset count, bytes used against the budget, and
+                      play hits, misses and evictions
+        """
+        with self._lock:
+            sources = {source_id: len(source) / self._rate * 1000
+                       for source_id, source in self._sources.items()}
+        with self._stats_lock:
+            conversion = self._conversion_stats.snapshot()
+            if reset:
+                self._conversion_stats.reset()
+        callback = self._callback_stats.snapshot()
+        assets = self._get_assets().snapshot()
+        if reset:
+            self._callback_stats.reset()
+            self._assets.reset()
+        return {'callback': callback, 'conversion': conversion, 'sources': sources, 'assets': assets}
+
+    @default_method
+    def _is_idle(self) -> bool:
+        with self._lock:
+            self._prune_sources()
+            return all(source.idle for source in self._sources.values())
+
+    @default_method
+    def _prune_sources(self) -> None:
+        """
+        Forget closed handles, and call-site sources no write is using, once their
+        audio has played, so their buffers are freed when the mixer retires them.
+        Caller holds _lock.
+        """
+        for source_id in [source_id for source_id, source in self._sources.items()
+                          if (source.closed or source.implicit and not source.writers) and source.idle]:
+            del self._sources[source_id]
+
+    @default_method
+    def _call_site_source(self, source_id: str) -> Source:
+        """Return the implicit source of a calling line, registering a write on it."""
+        with self._lock:
+            self._prune_sources()
+            source = self._sources.get(source_id)
+            if source is None:
+                source = self._sources[source_id] = Source(source_id, self._channels, owner=self, implicit=True)
+            source.writers += 1
+        return source
+
+    @default_method
+    def _write_source(self, source: Source, data, format, channels, rate, copy: bool = True, at=None) -> None:
+        if source.closed:
+            raise ValueError(f"Audio source {source.id} is closed")
+        
+        data, format, channels, rate = self._input_layout(data, format, channels, rate)
+        start_frame = None if at is None else self._start_frame(at)
+        self._initiate_stream()
+        with self._lock:
+            executor = self._get_executor() if source.max_frames is None else None
+        
+        if executor is None:
+            self._convert_and_enqueue(source, data, format, channels, rate, copy, start_frame)
+            return
+        
+        if copy and not isinstance(data, bytes):
+            data = data.copy()
+        self._playback_finished.clear()
+        if source.submit((data, format, channels, rate, copy, start_frame)):
+            executor.submit(self._convert_submitted, source)
+
+    @default_method
+    def _play_source(self, source: Source, key, at=None) -> None:
+        if source.closed:
+            raise ValueError(f"Audio source {source.id} is closed")
+        frames = self._get_assets().get(key)
+        if frames is None:
+            raise KeyError(f"No preloaded audio asset {key!r}")
+        start_frame = None if at is None else self._start_frame(at)
+        self._initiate_stream()
+        self._enqueue(source, frames, False, start_frame)
+
+    @staticmethod
+    def _is_byte_buffer(data) -> bool:
+        try:
+            return memoryview(data).format in ('B', 'b', 'c')
+        except TypeError:
+            return False
+
+    @default_method
+    def _input_layout(self, data, format, channels, rate):
+        """
+        Fill in the format, channels and rate of written data from the array or the defaults.
+
+        Buffers of bytes (bytes, bytearray, or a memoryview or other buffer with item
+        format 'B', 'b' or 'c') are raw PCM in the given or the output format. Typed
+        buffers and NumPy arrays carry their own sample format and layout.
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            raw = not isinstance(data, np.ndarray) and self._is_byte_buffer(data)
+            data = np.ascontiguousarray(data)
+            if raw:
+                data = data.reshape(-1).view(np.uint8)
+            else:
+                format = data.dtype if format is None else format
+                channels = channels or (data.shape[1] if data.ndim == 2 else None)
+        format = self._format if format is None else format
+        channels = channels or self._channels
+        rate = rate or self._rate
+        return data, format, channels, rate
+
+    @default_method
+    def _output_frames(self, data, format, channels, rate) -> int:
+        """Upper bound of the frames data converts to at the output rate."""
+        frames = memoryview(data).nbytes // (channels * pcm_format(format).itemsize)
+        return -(-frames * self._rate // rate)
+
+    @default_method
+    async def _write_source_async(self, source: Source, data, format, channels, rate, copy: bool = True,
+                                  at=None) -> None:
+        if source.max_frames is not None and source.policy == BLOCK:
+            data, format, channels, rate = self._input_layout(data, format, channels, rate)
+            frames = self._output_frames(data, format, channels, rate)
+            await self._async_waiters.wait_for(lambda: source.has_room(frames) or source.closed)
+        self._write_source(source, data, format, channels, rate, copy, at)
+        limit = int(self._async_buffer_seconds * self._rate)
+        await self._async_waiters.wait_for(lambda: len(source) <= limit and not source.converting)
+
+    @default_method
+    def _callback(self, outdata, frames, time, status):
+        """
+        Mix and play audio from all sources.
+
+        Runs on the PortAudio thread and never takes a lock: new sources arrive
+        through _pending_sources and frames through each source's own queue.
+        """
+        started = _time.perf_counter()
         if status:
             logging.warning(f"Audio callback status: {status}")
+        self._mix(outdata, frames)
+        self._frames_mixed += frames
+        if self._blocked_writers and self._space_available.acquire(blocking=False):
+            self._space_available.notify_all()
+            self._space_available.release()
+        self._async_waiters.notify_all()
+        self._callback_stats.record(_time.perf_counter() - started, frames, self._rate, status)
+
+    @default_method
+    def _mix(self, outdata, frames) -> None:
+        """Mix the queued frames of all sources into outdata without allocating."""
+        while self._pending_sources:
+            source = self._pending_sources.popleft()
+            source.retired = False
+            self._active_sources[source.id] = source
+
+        if not self._active_sources:
+            outdata.fill(0)
+            self._playback_finished.set()
+            return
         
-        with cls._lock:
-            if not cls._sources:
-                outdata.fill(0)
-                cls._playback_finished.set()
+        mixed = self._mixer.accumulator(outdata)
+        drained = None
+        
+        position = self._frames_mixed
+        for source in self._active_sources.values():
+            source.add_into(mixed, position)
+            if not len(source):
+                # Retire before re-checking: a concurrent write either lands
+                # in time to be seen here or sees retired and re-registers.
+                source.retired = True
+                if len(source):
+                    source.retired = False
+                elif drained is None:
+                    drained = [source.id]
+                else:
+                    drained.append(source.id)
+        
+        if drained is not None:
+            for source_id in drained:
+                del self._active_sources[source_id]
+
+        if not self._active_sources and not self._pending_sources:
+            self._playback_finished.set()
+        
+        self._mixer.write(mixed, outdata, self._limiter)
+
+    @default_method
+    def _convert_and_enqueue(self, source: Source, data, format, channels, rate, copy: bool = True,
+                             start_frame: Optional[int] = None) -> None:
+        with source.lock:
+            started = _time.perf_counter()
+            plan = conversion_plan(format, channels, rate, self._channels, self._rate)
+            resampler = source.resampler(plan) if plan.resamples else None
+            audio_data = self._process_data(data, format, channels, rate, resampler)
+            elapsed = _time.perf_counter() - started
+            self._enqueue(source, audio_data, copy, start_frame)
+        with self._stats_lock:
+            self._conversion_stats.add(elapsed, audio_data.shape[0])
+
+    @default_method
+    def _enqueue(self, source: Source, audio_data: np.ndarray, copy: bool, start_frame: Optional[int]) -> None:
+        """Queue converted frames on source and hand it to the mixer if it was retired."""
+        if source.max_frames is not None:
+            audio_data = self._make_room(source, audio_data)
+            if audio_data is None:
                 return
-            
-            mixed = np.zeros((frames, cls._default_channels), dtype=np.float32)
-            sources_to_remove = []
-            
-            for source_id, chunks in cls._sources.items():
-                if not chunks:
-                    sources_to_remove.append(source_id)
+        self._playback_finished.clear()
+        source.enqueue(audio_data, copy, start_frame)
+        if source.retired:
+            self._pending_sources.append(source)
+
+    @default_method
+    def _make_room(self, source: Source, audio_data: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Apply a bounded source's backlog policy to frames about to be queued.
+
+        Returns:
+            The frames to queue, or None if the source was closed while blocked.
+        """
+        frames = audio_data.shape[0]
+        limit = source.max_frames
+        if source.backlog + frames <= limit:
+            return audio_data
+        if source.policy == BLOCK:
+            with self._space_available:
+                self._blocked_writers += 1
+                try:
+                    self._space_available.wait_for(lambda: source.has_room(frames) or source.closed)
+                finally:
+                    self._blocked_writers -= 1
+            return None if source.closed else audio_data
+        if source.policy == RAISE:
+            raise queue.Full(f"Audio source {source.id} has {source.backlog} frames queued, "
+                             f"{frames} more exceed its limit of {limit}")
+        if source.policy == DROP_NEWEST:
+            keep = max(limit - source.backlog, 0)
+            source.dropped_frames += frames - keep
+            return audio_data[:keep] if keep else None
+        if frames > limit:
+            source.dropped_frames += frames - limit
+            audio_data = audio_data[frames - limit:]
+            frames = limit
+        excess = source.backlog + frames - limit
+        if excess > 0:
+            source.discard_oldest(excess)
+            source.dropped_frames += excess
+        return audio_data
+
+    @default_method
+    def _convert_submitted(self, source: Source) -> None:
+        """Worker task: convert a source's submitted writes in order until none are left."""
+        while (write := source.next_submitted()) is not None:
+            try:
+                self._convert_and_enqueue(source, *write)
+            except Exception:
+                logging.exception(f"Audio conversion failed for source {source.id}")
+
+    @default_method
+    def _feed_file(self, source: Source, wav: WavFile, start_frame: Optional[int], read_ahead: float) -> None:
+        """Feeder thread of play_file: convert the file chunk by chunk, staying read_ahead ahead."""
+        chunk_frames = max(1, int(read_ahead / 4 * wav.rate))
+        limit = int(read_ahead * self._rate)
+        position = 0
+        try:
+            while position < wav.frames and not source.closed:
+                if len(source) > limit:
+                    _time.sleep(read_ahead / 8)
                     continue
-                
-                frames_needed = frames
-                source_audio = []
-                
-                while frames_needed > 0 and chunks:
-                    chunk = chunks[0]
-                    chunk_frames = len(chunk)
-                    
-                    if chunk_frames <= frames_needed:
-                        source_audio.append(chunk)
-                        chunks.pop(0)
-                        frames_needed -= chunk_frames
-                    else:
-                        source_audio.append(chunk[:frames_needed])
-                        chunks[0] = chunk[frames_needed:]
-                        frames_needed = 0
-                
-                if source_audio:
-                    source_data = np.concatenate(source_audio)
-                    if len(source_data) < frames:
-                        padding = np.zeros((frames - len(source_data), cls._default_channels), dtype=np.float32)
-                        source_data = np.concatenate([source_data, padding])
-                    
-                    mixed += source_data
-                
-                if not chunks:
-                    sources_to_remove.append(source_id)
-            
-            for source_id in sources_to_remove:
-                del cls._sources[source_id]
+                with wav.read(position, chunk_frames) as chunk:
+                    self._convert_and_enqueue(source, chunk, wav.format, wav.channels, wav.rate,
+                                             start_frame=start_frame)
+                start_frame = None
+                position += chunk_frames
+                wav.release(position)
+        except Exception:
+            logging.exception(f"Audio file playback failed for {wav.path}")
+        finally:
+            source.feeding = False
+            source.close()
+            wav.close()
 
-            if not cls._sources:
-                cls._playback_finished.set()
-            
-            mixed = np.clip(mixed, -1.0, 1.0)
-            mixed = cls._convert_format(mixed, cls._default_format)
-            
-            outdata[:] = mixed
+    @default_method
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        if self._executor is None and self._conversion_workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=self._conversion_workers,
+                                               thread_name_prefix="audio-convert")
+        return self._executor
 
-    @classmethod
-    def _initiate_stream(cls):
-        if cls._stream is not None:
+    @default_method
+    def _get_assets(self) -> AssetCache:
+        if self._assets is None:
+            with self._lock:
+                if self._assets is None:
+                    self._assets = AssetCache(int(self._asset_cache_mb * 2**20))
+        return self._assets
+
+    @default_method
+    def _initiate_stream(self):
+        if self._stream is not None:
             return 
 
-        with cls._lock:
-            if cls._stream is not None:
+        with self._lock:
+            if self._stream is not None:
                 return
             
-            cls._stream = sd.OutputStream(
-                samplerate=cls._default_rate,
-                channels=cls._default_channels,
-                dtype=cls._default_format,
-                callback=cls._callback
-            )
+            self._stream = Devices.track(sd.OutputStream(
+                samplerate=self._rate,
+                channels=self._channels,
+                dtype=self._format,
+                device=Devices.find(self._device, OUTPUT),
+                latency=self._latency,
+                callback=self._callback
+            ))
 
-            cls._stream.start()
+            self._stream.start()
 
-    @classmethod
-    def _process_data(cls, data: bytes, format, channels, rate) -> np.ndarray:
+    @default_method
+    def _process_data(self, data, format, channels, rate,
+                      resampler: Optional[StreamingResampler] = None) -> np.ndarray:
         """
         Process raw audio data into normalized float32 array.
         
-        Converts from input format/channels/rate to float32/_default_channels/_default_rate.
+        Converts from input format/channels/rate to float32 at the output channel count and rate.
         Output is always float32 in range [-1.0, 1.0] for efficient mixing.
+        A streaming resampler carries filter state over from the previous chunk
+        of the same source; without one the chunk is resampled on its own.
         """
-        audio_data = np.frombuffer(data, dtype=format)
-        
-        if np.issubdtype(format, np.integer):
-            audio_data = audio_data.astype(np.float32)
-            max_val = float(np.iinfo(format).max)
-            audio_data = np.where(audio_data > 0, audio_data / max_val, audio_data / (max_val + 1))
-        else:
-            audio_data = audio_data.astype(np.float32)
-        
-        if channels > 1:
-            audio_data = audio_data.reshape(-1, channels)
-        else:
-            audio_data = audio_data.reshape(-1, 1)
-        
-        audio_data = cls._convert_channels(audio_data, channels, cls._default_channels)
-        if rate != cls._default_rate:
-            audio_data = cls._resample(audio_data, rate, cls._default_rate)
+        plan = conversion_plan(format, channels, rate, self._channels, self._rate)
+        audio_data = normalize_pcm(data, plan.format).reshape(-1, channels)
+        if plan.channel_matrix is not None:
+            audio_data = audio_data @ plan.channel_matrix
+        if resampler is not None:
+            audio_data = resampler.process(audio_data)
+        elif plan.resamples:
+            audio_data = self._resample(audio_data, rate, self._rate)
         
         return audio_data
     
-    @classmethod
-    def _convert_channels(cls, audio_data: np.ndarray, input_channels: int, output_channels: int) -> np.ndarray:
-        """Convert between different channel configurations."""
-        if input_channels == output_channels:
-            return audio_data
-        
-        if input_channels == 1 and output_channels == 2:
-            return np.repeat(audio_data, 2, axis=1)
-        
-        if input_channels == 2 and output_channels == 1:
-            return np.mean(audio_data, axis=1, keepdims=True)
-        
-        if input_channels > output_channels:
-            return audio_data[:, :output_channels]
-        else:
-            n_samples = audio_data.shape[0]
-            result = np.zeros((n_samples, output_channels), dtype=audio_data.dtype)
-            result[:, :input_channels] = audio_data
-            return result
-
-    @classmethod
-    def _resample(cls, audio_data: np.ndarray, input_rate: int, output_rate: int) -> np.ndarray:
-        """Resample using scipy for better quality."""
+    @default_method
+    def _resample(self, audio_data: np.ndarray, input_rate: int, output_rate: int) -> np.ndarray:
+        """Resample a complete buffer with a delay-compensated polyphase filter."""
         if input_rate == output_rate:
             return audio_data
         
-        n_samples_input = audio_data.shape[0]
-        n_channels = audio_data.shape[1]
-        n_samples_output = int(n_samples_input * output_rate / input_rate)
-        
-        resampled = np.zeros((n_samples_output, n_channels), dtype=audio_data.dtype)
-        
-        for ch in range(n_channels):
-            resampled[:, ch] = signal.resample(audio_data[:, ch], n_samples_output)
-        
-        return resampled
+        n_samples_output = int(audio_data.shape[0] * output_rate / input_rate)
+        channels = audio_data.shape[1]
+        plan = conversion_plan(np.float32, channels, input_rate, channels, output_rate)
+        resampler = StreamingResampler.from_plan(plan, delay_compensated=True)
+        resampled = np.concatenate([resampler.process(audio_data), resampler.flush()])
+        return resampled[:n_samples_output]
 
-    @classmethod
-    def _convert_format(cls, audio_data: np.ndarray, output_format) -> np.ndarray:
-        """Convert audio to output format (int16 or float32)."""
-        if output_format == np.float32:
-            return audio_data
-        else:
-            audio_data = np.clip(audio_data, -1.0, 1.0)
-            return (audio_data * np.iinfo(cls.int16).max).astype(np.int16)
+    @default_method
+    def _start_frame(self, at) -> int:
+        """Convert an at= value (frame index or seconds) to a frame index."""
+        if isinstance(at, (int, np.integer)):
+            return int(at)
+        return round(at * self._rate)
 
-    @classmethod
-    def _get_source_id(cls) -> str:
-        """Get unique source ID."""
-        stack = inspect.stack()
-        caller = stack[2]
-        source_string = f"{caller.filename}:{caller.lineno}"
-        return base64.b64encode(source_string.encode('utf-8')).decode('utf-8')
+    @default_method
+    def _get_source_id(self) -> str:
+        """Identify the caller of write by file and line, without reading any source files."""
+        caller = sys._getframe(2)
+        return f"{caller.f_code.co_filename}:{caller.f_lineno}"
 
     @classmethod
     def _cleanup(cls) -> None:
         """Cleanup on exit."""
+        for output in list(cls._instances):
+            if output._executor is not None:
+                output._executor.shutdown(wait=False, cancel_futures=True)
         logging.info("Speakers terminated gracefully")
 
 # Register cleanup function to run on exit
-atexit.register(Out._cleanup)
\ No newline at end of file
+atexit.register(Out._cleanup)
@@ -0,0 +1,123 @@
+import numpy as np
+
+from math import gcd
+from typing import Optional, Tuple
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+
+_HALF_LENGTH = 10
+_KAISER_BETA = 5.0
+
+
+def rate_factors(input_rate: int, output_rate: int) -> Tuple[int, int]:
+    """Return the reduced (up, down) factors for converting input_rate to output_rate."""
+    divisor = gcd(input_rate, output_rate)
+    return output_rate // divisor, input_rate // divisor
+
+
+@lru_cache(maxsize=32)
+def polyphase_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """
+    Design the anti-aliasing filter for an up/down pair and split it into phases.
+
+    The filter is the Kaiser-windowed low-pass FIR used by scipy.signal.resample_poly.
+    Each of the up phases is reversed to line up with an ascending window of input
+    frames ending at the current one. Results are shared, so they are read-only.
+    SciPy is only imported here, so processes that never resample don't load it.
+
+    Returns:
+        (phases, taps) where phases has shape (up, taps_per_phase) and taps is
+        the length of the prototype filter.
+    """
+    from scipy import signal
+
+    max_rate = max(up, down)
+    length = 2 * _HALF_LENGTH * max_rate + 1
+    taps = signal.firwin(length, 1.0 / max_rate, window=('kaiser', _KAISER_BETA)) * up
+
+    taps_per_phase = -(-length // up)
+    padded = np.zeros(taps_per_phase * up)
+    padded[:length] = taps
+    phases = np.ascontiguousarray(padded.reshape(taps_per_phase, up).T[:, ::-1], dtype=np.float32)
+    phases.setflags(write=False)
+    return phases, length
+
+
+class StreamingResampler:
+    """
+    Stateful rational polyphase resampler for (frames x channels) float32 audio.
+
+    Successive process calls behave like one call on the concatenated input:
+    the last input frames are kept as filter history, so streamed chunks join
+    without discontinuities. All channels are filtered in a single vectorized
+    call and work is done in blocks of at most _block_frames input frames, so
+    memory stays bounded regardless of the chunk size.
+
+    By default the filter is causal and every input frame yields its outputs
+    immediately, at the cost of a fixed group delay of a few samples. With
+    delay_compensated=True outputs are aligned with the input instead, and
+    the trailing lookahead is released by flush.
+    """
+
+    _block_frames = 8192
+
+    def __init__(self, input_rate: int, output_rate: int, channels: int, delay_compensated: bool = False,
+                 filter: Optional[Tuple[np.ndarray, int]] = None):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up, self.down = rate_factors(input_rate, output_rate)
+
+        self._phases, taps = filter if filter is not None else polyphase_filter(self.up, self.down)
+        self._taps_per_phase = self._phases.shape[1]
+        self._offset = (taps - 1) // 2 if delay_compensated else 0
+        self._history = np.zeros((self._taps_per_phase - 1, channels), dtype=np.float32)
+        self._input_frames = 0
+        self._output_frames = 0
+
+    @classmethod
+    def from_plan(cls, plan, delay_compensated: bool = False) -> "StreamingResampler":
+        """Create a resampler for the output channels of a ConversionPlan, using its filter."""
+        return cls(plan.input_rate, plan.output_rate, plan.output_channels, delay_compensated,
+                   filter=(plan.phases, plan.taps))
+
+    def process(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Resample the next chunk of a stream.
+
+        Args:
+            audio_data: float32 array of shape (frames, channels)
+
+        Returns:
+            float32 array of shape (output_frames, channels)
+        """
+        blocks = [
+            self._process_block(audio_data[start:start + self._block_frames])
+            for start in range(0, audio_data.shape[0], self._block_frames)
+        ]
+        if len(blocks) == 1:
+            return blocks[0]
+        if not blocks:
+            return np.zeros((0, self._history.shape[1]), dtype=np.float32)
+        return np.concatenate(blocks)
+
+    def flush(self) -> np.ndarray:
+        """Release the outputs still waiting on lookahead by feeding silence."""
+        pad_frames = -(-self._offset // self.up) + 1
+        return self.process(np.zeros((pad_frames, self._history.shape[1]), dtype=np.float32))
+
+    def _process_block(self, block: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate([self._history, block.astype(np.float32, copy=False)])
+        total_frames = self._input_frames + block.shape[0]
+        end = max(self._output_frames, (total_frames * self.up - 1 - self._offset) // self.down + 1)
+
+        positions = np.arange(self._output_frames, end, dtype=np.int64) * self.down + self._offset
+        window_starts = positions // self.up - self._input_frames
+        windows = sliding_window_view(buffer, self._taps_per_phase, axis=0)
+        taps = self._phases[positions % self.up][:, :, np.newaxis]
+        resampled = np.matmul(windows[window_starts], taps)[:, :, 0]
+
+        if self._history.shape[0]:
+            self._history = buffer[-self._history.shape[0]:].copy()
+        self._input_frames = total_frames
+        self._output_frames = end
+        return resampled
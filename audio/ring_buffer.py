@@ -0,0 +1,160 @@
+import numpy as np
+
+from typing import Optional
+
+
+class RingBuffer:
+    """
+    Growable circular buffer of audio frames (frames x channels).
+
+    Reads and writes touch at most two contiguous regions of the backing
+    array, so consuming a block never allocates. As long as writes fit in
+    the free space, one producer thread and one consumer thread may use the
+    buffer concurrently without locking: each side only advances its own
+    position after its copy is complete.
+
+    start_frame optionally pins the first frame to a stream frame for
+    scheduled playback; see Source.add_into.
+    """
+
+    _min_capacity = 1024
+
+    def __init__(self, channels: int, capacity: int = 0, dtype=np.float32):
+        self._buffer = np.zeros((self._round_capacity(capacity), channels), dtype=dtype)
+        self._read_pos = 0
+        self._write_pos = 0
+        self.start_frame: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._write_pos - self._read_pos
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.shape[0]
+
+    @property
+    def channels(self) -> int:
+        return self._buffer.shape[1]
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self)
+
+    def write(self, data: np.ndarray) -> None:
+        """Append frames, growing the backing array if they do not fit."""
+        frames = data.shape[0]
+        if len(self) + frames > self.capacity:
+            self._grow(len(self) + frames)
+
+        start = self._write_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        self._buffer[:frames - first] = data[first:]
+        self._write_pos += frames
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Copy up to len(out) frames into out and consume them.
+
+        Returns:
+            Number of frames copied. The rest of out is left untouched.
+        """
+        return self._consume(out, np.copyto)
+
+    def add_into(self, out: np.ndarray) -> int:
+        """
+        Add up to len(out) frames onto out and consume them.
+
+        This runs once per source and block in the mixer, so it is written out
+        rather than going through _consume.
+
+        Returns:
+            Number of frames mixed into out.
+        """
+        read_pos = self._read_pos
+        frames = min(out.shape[0], self._write_pos - read_pos)
+        capacity = self._buffer.shape[0]
+        start = read_pos % capacity
+        end = start + frames
+        if end <= capacity:
+            if frames == out.shape[0]:
+                np.add(out, self._buffer[start:end], out=out)
+            else:
+                np.add(out[:frames], self._buffer[start:end], out=out[:frames])
+        else:
+            first = capacity - start
+            np.add(out[:first], self._buffer[start:], out=out[:first])
+            np.add(out[first:frames], self._buffer[:end - capacity], out=out[first:frames])
+        self._read_pos = read_pos + frames
+        return frames
+
+    def skip(self, frames: int) -> int:
+        """Discard up to frames frames and return how many were dropped."""
+        frames = min(frames, len(self))
+        self._read_pos += frames
+        return frames
+
+    def clear(self) -> None:
+        self._read_pos = self._write_pos
+
+    def _consume(self, out: np.ndarray, operation) -> int:
+        frames = min(out.shape[0], len(self))
+        start = self._read_pos % self.capacity
+        first = min(frames, self.capacity - start)
+        operation(out[:first], self._buffer[start:start + first])
+        if frames > first:
+            operation(out[first:frames], self._buffer[:frames - first])
+        self._read_pos += frames
+        return frames
+
+    def _grow(self, required: int) -> None:
+        buffer = np.zeros((self._round_capacity(required), self.channels), dtype=self._buffer.dtype)
+        frames = self.read_into(buffer)
+        self._buffer = buffer
+        self._read_pos = 0
+        self._write_pos = frames
+
+    @classmethod
+    def _round_capacity(cls, frames: int) -> int:
+        capacity = cls._min_capacity
+        while capacity < frames:
+            capacity *= 2
+        return capacity
+
+
+class ArraySegment:
+    """
+    Queue segment that plays a caller-owned array in place, without copying it.
+
+    It never accepts writes, and it drops its reference to the array as soon as
+    the last frame has been read.
+    """
+
+    free = 0
+    capacity = 0
+
+    def __init__(self, frames: np.ndarray):
+        self._frames = frames
+        self._read_pos = 0
+        self.start_frame: Optional[int] = None
+
+    def __len__(self) -> int:
+        return 0 if self._frames is None else self._frames.shape[0] - self._read_pos
+
+    def add_into(self, out: np.ndarray) -> int:
+        """Add up to len(out) frames onto out and consume them."""
+        frames = min(out.shape[0], len(self))
+        if frames:
+            np.add(out[:frames], self._frames[self._read_pos:self._read_pos + frames], out=out[:frames])
+            self._read_pos += frames
+            if self._read_pos == self._frames.shape[0]:
+                self._frames = None
+        return frames
+
+    def skip(self, frames: int) -> int:
+        """Discard up to frames frames and return how many were dropped."""
+        frames = min(frames, len(self))
+        self._read_pos += frames
+        if frames and self._read_pos == self._frames.shape[0]:
+            self._frames = None
+        return frames
@@ -0,0 +1,256 @@
+import threading
+import numpy as np
+
+from typing import Any, Optional, Tuple
+from collections import deque
+
+from .resampler import StreamingResampler
+from .ring_buffer import ArraySegment, RingBuffer
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+RAISE = 'raise'
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, RAISE)
+
+
+class Source:
+    """
+    Playback source: an independent stream mixed by Out.
+
+    Handles are created by Out.open_source and written with write; Out.write
+    uses one implicit source per calling line, which Out forgets once it has
+    played everything and no write is in progress (writers counts those).
+
+    Internally a source is a single-producer/single-consumer frame queue.
+    Producers call enqueue, serialized by the per-source lock; the audio
+    callback is the only consumer and never takes a lock. Frames live in a
+    chain of segments: ring buffers that writes are copied into and, for
+    writes that hand over their array, segments referencing that array. When
+    the newest ring is full the producer appends a larger one instead of
+    resizing in place, and the consumer drops segments it has fully drained.
+    A scheduled write always starts a new segment stamped with the stream
+    frame it has to start on, so the consumer sees the data and its start
+    time together.
+
+    A source may be bounded to max_frames of backlog, with a policy applied
+    by Out when a write does not fit: BLOCK the writer until the mixer has
+    made room, DROP_OLDEST queued audio, DROP_NEWEST audio of the write, or
+    RAISE queue.Full. Dropping the oldest audio is requested by the producer
+    as an absolute read position that the consumer skips to on its next mix.
+    """
+
+    def __init__(self, source_id: str, channels: int, owner=None, max_frames: Optional[int] = None,
+                 policy: str = BLOCK, implicit: bool = False):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backlog policy {policy!r}, expected one of {POLICIES}")
+        self.id = source_id
+        self.retired = True
+        self.closed = False
+        self.feeding = False
+        self.implicit = implicit
+        self.writers = 0
+        self._owner = owner
+        self._channels = channels
+        self.lock = threading.RLock()
+        self._segments = deque([RingBuffer(channels)])
+        self._resampler: Optional[StreamingResampler] = None
+        self._submitted = deque()
+        self._submit_lock = threading.Lock()
+        self._converting = False
+        self._frames_written = 0
+        self._frames_read = 0
+        self._skip_to = 0
+        self.max_frames = max_frames
+        self.policy = policy
+        self.dropped_frames = 0
+
+    def __len__(self) -> int:
+        return self._frames_written - self._frames_read
+
+    def __enter__(self) -> "Source":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, data, format=None, channels: Optional[int] = None, rate: Optional[int] = None,
+              copy: bool = True, at=None) -> None:
+        """
+        Play audio data on this source; see Out.write for the parameters.
+
+        Raises:
+            ValueError: If the source has been closed.
+        """
+        self._owner._write_source(self, data, format, channels, rate, copy, at)
+
+    async def write_async(self, data, format=None, channels: Optional[int] = None, rate: Optional[int] = None,
+                          copy: bool = True, at=None) -> None:
+        """
+        Play audio data on this source with backpressure; see Out.write_async.
+
+        Raises:
+            ValueError: If the source has been closed.
+        """
+        await self._owner._write_source_async(self, data, format, channels, rate, copy, at)
+
+    def play(self, key, at=None) -> None:
+        """
+        Play a preloaded asset on this source; see Out.play.
+
+        Raises:
+            KeyError: If no asset is cached under key.
+            ValueError: If the source has been closed.
+        """
+        self._owner._play_source(self, key, at)
+
+    def close(self) -> None:
+        """Stop accepting writes; audio already queued keeps playing."""
+        self.closed = True
+
+    @property
+    def converting(self) -> bool:
+        """True while submitted writes are waiting for or undergoing conversion."""
+        return self._converting
+
+    @property
+    def backlog(self) -> int:
+        """Frames queued for playback, not counting frames about to be dropped."""
+        return self._frames_written - max(self._frames_read, self._skip_to)
+
+    @property
+    def backlog_ms(self) -> float:
+        """Milliseconds of audio queued; producers can pace themselves on it."""
+        return self.backlog / self._owner._rate * 1000
+
+    def has_room(self, frames: int) -> bool:
+        """True if frames more fit within max_frames, or nothing is queued at all."""
+        backlog = self.backlog
+        return self.max_frames is None or backlog + frames <= self.max_frames or not backlog
+
+    def discard_oldest(self, frames: int) -> None:
+        """Have the consumer drop the oldest frames queued before its next mix. Producer side."""
+        self._skip_to = min(max(self._frames_read, self._skip_to) + frames, self._frames_written)
+
+    @property
+    def idle(self) -> bool:
+        """True when nothing is queued, waiting for conversion or still to be read from a file."""
+        return not len(self) and not self._converting and not self.feeding
+
+    def submit(self, write: Tuple[Any, ...]) -> bool:
+        """
+        Queue a raw write for background conversion.
+
+        Returns:
+            True if no conversion task is running for this source and the
+            caller has to start one; writes are converted in submission order.
+        """
+        with self._submit_lock:
+            self._submitted.append(write)
+            if self._converting:
+                return False
+            self._converting = True
+            return True
+
+    def next_submitted(self) -> Optional[Tuple[Any, ...]]:
+        """Pop the oldest submitted write, or end the conversion task when none is left."""
+        with self._submit_lock:
+            if self._submitted:
+                return self._submitted.popleft()
+            self._converting = False
+            return None
+
+    def enqueue(self, audio_data: np.ndarray, copy: bool = True, start_frame: Optional[int] = None) -> None:
+        """
+        Queue float32 frames for playback. Safe to call from any thread.
+
+        Args:
+            audio_data: Frames of shape (frames, channels)
+            copy: False hands the array over: it is played in place and must not
+                  be modified afterwards.
+            start_frame: Stream frame the first frame has to play on. Frames queued
+                         without one follow the previous frames directly.
+        """
+        frames = audio_data.shape[0]
+        with self.lock:
+            if not copy:
+                segment = ArraySegment(audio_data)
+                segment.start_frame = start_frame
+                self._segments.append(segment)
+            else:
+                ring = self._segments[-1]
+                if start_frame is not None or ring.free < frames:
+                    # A scheduled segment holds its own write only; a full ring is outgrown.
+                    capacity = frames if start_frame is not None else max(frames, ring.capacity * 2)
+                    ring = RingBuffer(self._channels, capacity=capacity)
+                    ring.start_frame = start_frame
+                    ring.write(audio_data)
+                    self._segments.append(ring)
+                else:
+                    ring.write(audio_data)
+            self._frames_written += frames
+
+    def resampler(self, plan) -> StreamingResampler:
+        """
+        Return the stream resampler for the rate pair of a ConversionPlan, built from
+        the plan's filter and keeping its state across writes.
+        """
+        resampler = self._resampler
+        if resampler is None or (resampler.input_rate, resampler.output_rate) != (plan.input_rate, plan.output_rate):
+            resampler = self._resampler = StreamingResampler.from_plan(plan)
+        return resampler
+
+    def add_into(self, out: np.ndarray, position: int = 0) -> int:
+        """
+        Mix up to len(out) queued frames onto out. Consumer thread only.
+
+        Args:
+            out: Block to mix onto
+            position: Stream frame of out[0]. A segment scheduled for a later frame
+                      is mixed from that frame on, leaving the output before it
+                      untouched; one whose start has passed plays right away.
+
+        Returns:
+            Number of frames mixed.
+        """
+        if self._skip_to > self._frames_read:
+            self._skip(self._skip_to - self._frames_read)
+        segments = self._segments
+        if len(segments) == 1 and segments[0].start_frame is None:
+            mixed = segments[0].add_into(out)
+            self._frames_read += mixed
+            return mixed
+
+        frames = out.shape[0]
+        offset = 0
+        mixed = 0
+        while offset < frames:
+            segment = segments[0]
+            if segment.start_frame is not None:
+                delay = segment.start_frame - (position + offset)
+                if delay >= frames - offset:
+                    break
+                offset += max(delay, 0)
+                segment.start_frame = None
+            count = segment.add_into(out[offset:])
+            offset += count
+            mixed += count
+            if offset == frames or len(segments) == 1:
+                break
+            if not len(segment):
+                segments.popleft()
+        self._frames_read += mixed
+        return mixed
+
+    def _skip(self, frames: int) -> None:
+        """Consume frames without playing them. Consumer thread only."""
+        segments = self._segments
+        while frames:
+            segment = segments[0]
+            skipped = segment.skip(frames)
+            frames -= skipped
+            self._frames_read += skipped
+            if len(segments) == 1:
+                break
+            if not len(segment):
+                segments.popleft()
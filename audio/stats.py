@@ -0,0 +1,94 @@
+import bisect
+
+from typing import Dict, List
+
+# Upper bounds of the callback time histogram buckets, as fractions of the
+# block's real-time budget (frames / rate); a final bucket counts the rest.
+BUDGET_BUCKETS = (0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+class DurationStats:
+    """Count, total and maximum of a repeated timed operation."""
+
+    __slots__ = ('count', 'frames', 'total', 'max')
+
+    def __init__(self):
+        self.reset()
+
+    def add(self, seconds: float, frames: int = 0) -> None:
+        self.count += 1
+        self.frames += frames
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def reset(self) -> None:
+        self.count = 0
+        self.frames = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'frames': self.frames,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+        }
+
+
+class CallbackStats:
+    """
+    Counters for an audio callback.
+
+    record only updates integers and floats held in preallocated slots, so
+    calling it on the audio thread never allocates arrays or grows containers.
+    Readers take a snapshot from any thread; counters read mid-update may be
+    one block apart, which is fine for monitoring.
+    """
+
+    def __init__(self):
+        self.durations = DurationStats()
+        self.histogram: List[int] = [0] * (len(BUDGET_BUCKETS) + 1)
+        self.input_underflows = 0
+        self.input_overflows = 0
+        self.output_underflows = 0
+        self.output_overflows = 0
+        self.priming = 0
+        self.budget = 0.0
+
+    def record(self, seconds: float, frames: int, rate: int, status=None) -> None:
+        """Account one callback that took seconds to process frames at rate. Audio thread."""
+        self.durations.add(seconds, frames)
+        self.budget = frames / rate
+        self.histogram[bisect.bisect_left(BUDGET_BUCKETS, seconds / self.budget)] += 1
+        if status:
+            self.input_underflows += status.input_underflow
+            self.input_overflows += status.input_overflow
+            self.output_underflows += status.output_underflow
+            self.output_overflows += status.output_overflow
+            self.priming += status.priming_output
+
+    def reset(self) -> None:
+        self.durations.reset()
+        self.histogram[:] = [0] * len(self.histogram)
+        self.input_underflows = self.input_overflows = 0
+        self.output_underflows = self.output_overflows = 0
+        self.priming = 0
+
+    def snapshot(self) -> dict:
+        labels = [f"<={bound:g}" for bound in BUDGET_BUCKETS] + [f">{BUDGET_BUCKETS[-1]:g}"]
+        return {
+            'callbacks': self.durations.count,
+            'frames': self.durations.frames,
+            'mean_ms': self.durations.snapshot()['mean_ms'],
+            'max_ms': self.durations.max * 1000,
+            'budget_ms': self.budget * 1000,
+            'budget_histogram': dict(zip(labels, self.histogram)),
+            'input_underflows': self.input_underflows,
+            'input_overflows': self.input_overflows,
+            'output_underflows': self.output_underflows,
+            'output_overflows': self.output_overflows,
+            'priming': self.priming,
+        }
+
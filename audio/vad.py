@@ -0,0 +1,176 @@
+import math
+import threading
+import numpy as np
+
+from collections import deque
+from typing import Iterator, Optional, Tuple
+
+
+class SpeechGate:
+    """
+    Energy and spectral voice activity gate over fixed-size blocks.
+
+    Each block is reduced to three features: its level in dBFS, the rate of
+    zero crossings per sample and the spectral flatness of its power
+    spectrum (geometric over arithmetic mean, near 0 for voiced sounds and
+    near 0.56 for white noise). A block is speech when it is louder than
+    threshold_db and not noise-like, i.e. not both flatter than max_flatness
+    and crossing zero more often than max_zero_crossings, which lets hissy
+    fricatives through while rejecting broadband noise.
+
+    A segment opens on the first speech block, prefixed with up to pre_roll
+    seconds of the blocks before it so soft onsets are not cut, and stays
+    open for hangover seconds after the last speech block. The features are
+    computed in work buffers allocated on the first block; only the FFT
+    output is new per block.
+
+    Args:
+        rate: Sample rate of the blocks in Hz
+        threshold_db: Minimum block level in dBFS
+        hangover: Seconds a segment stays open after its last speech block
+        pre_roll: Seconds of audio before the onset included in a segment
+        max_flatness: Spectral flatness above which a block may be noise
+        max_zero_crossings: Zero-crossing rate above which a block may be noise
+        active: Event set while a segment is open (a new one by default)
+    """
+
+    def __init__(self, rate: int, threshold_db: float = -45.0, hangover: float = 0.3, pre_roll: float = 0.2,
+                 max_flatness: float = 0.45, max_zero_crossings: float = 0.4,
+                 active: Optional[threading.Event] = None):
+        self.rate = rate
+        self.threshold_db = threshold_db
+        self.hangover = hangover
+        self.pre_roll = pre_roll
+        self.max_flatness = max_flatness
+        self.max_zero_crossings = max_zero_crossings
+        self.active = active if active is not None else threading.Event()
+        self.active.clear()
+        self.features: Tuple[float, float, float] = (-math.inf, 0.0, 0.0)
+        self.blocks = 0
+        self.speech_blocks = 0
+        self.segments = 0
+        self._frames = 0
+        self._hangover_blocks = 0
+        self._remaining = 0
+        self._pre_roll: deque = deque()
+
+    @property
+    def duty_cycle(self) -> float:
+        """Fraction of the blocks seen so far that were speech."""
+        return self.speech_blocks / self.blocks if self.blocks else 0.0
+
+    def process(self, block: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Classify the next block and return the blocks to pass on.
+
+        Args:
+            block: Array of shape (frames, channels); it is kept for the pre-roll,
+                   so it must not be reused by the caller
+
+        Returns:
+            Nothing while the gate is closed, the pre-roll followed by block when a
+            segment opens, and block itself while the segment is open.
+        """
+        speech = self.is_speech(block)
+        self.blocks += 1
+        if speech:
+            self.speech_blocks += 1
+            self._remaining = self._hangover_blocks
+
+        if self.active.is_set():
+            if speech:
+                return (block,)
+            if self._remaining > 0:
+                self._remaining -= 1
+                return (block,)
+            self.active.clear()
+        elif speech:
+            self.active.set()
+            self.segments += 1
+            emitted = (*self._pre_roll, block)
+            self._pre_roll.clear()
+            return emitted
+
+        if self._pre_roll.maxlen:
+            self._pre_roll.append(block)
+        return ()
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        """Compute the features of block into features and classify it."""
+        if block.shape[0] != self._frames:
+            self._allocate(block.shape[0])
+        mono = self._mono
+        if block.shape[1] == 1:
+            np.copyto(mono, block[:, 0], casting='unsafe')
+        else:
+            np.mean(block, axis=1, dtype=np.float32, out=mono)
+        if block.dtype.kind in 'iu':
+            np.multiply(mono, np.float32(1 / np.iinfo(block.dtype).max), out=mono)
+
+        power = float(np.dot(mono, mono)) / self._frames
+        level_db = 10 * math.log10(power) if power > 0 else -math.inf
+
+        signs = self._signs
+        np.signbit(mono, out=signs)
+        np.not_equal(signs[1:], signs[:-1], out=self._crossings)
+        zero_crossings = int(np.count_nonzero(self._crossings)) / max(self._frames - 1, 1)
+
+        np.multiply(mono, self._window, out=mono)
+        spectrum = np.fft.rfft(mono)
+        density = np.abs(spectrum, out=self._density)
+        np.square(density, out=density)
+        np.add(density, np.float32(1e-12), out=density)
+        mean = float(density.mean())
+        flatness = math.exp(float(np.log(density, out=self._log_density).mean())) / mean
+
+        self.features = (level_db, zero_crossings, flatness)
+        if level_db < self.threshold_db:
+            return False
+        return not (flatness > self.max_flatness and zero_crossings > self.max_zero_crossings)
+
+    def close(self) -> None:
+        """End any open segment and clear the pre-roll."""
+        self.active.clear()
+        self._pre_roll.clear()
+
+    def _allocate(self, frames: int) -> None:
+        """Size the work buffers and block counts for blocks of frames frames."""
+        self._frames = frames
+        self._mono = np.empty(frames, dtype=np.float32)
+        self._signs = np.empty(frames, dtype=bool)
+        self._crossings = np.empty(max(frames - 1, 0), dtype=bool)
+        self._window = np.hanning(frames).astype(np.float32)
+        self._density = np.empty(frames // 2 + 1, dtype=np.float32)
+        self._log_density = np.empty_like(self._density)
+        self._hangover_blocks = math.ceil(self.hangover * self.rate / frames)
+        self._pre_roll = deque(self._pre_roll, maxlen=math.ceil(self.pre_roll * self.rate / frames))
+
+
+def speech_segments(blocks: Iterator[np.ndarray], gate: SpeechGate) -> Iterator[Iterator[np.ndarray]]:
+    """
+    Group a block stream into speech segments.
+
+    Yields one iterator per segment, which yields the segment's blocks and
+    ends when the gate closes. Silent blocks are consumed here and never
+    reach the caller; a segment that is not read to its end is skipped.
+    """
+    try:
+        for block in blocks:
+            emitted = gate.process(block)
+            if emitted:
+                segment = _segment(emitted, blocks, gate)
+                yield segment
+                for _ in segment:
+                    pass
+    finally:
+        gate.close()
+
+
+def _segment(emitted, blocks: Iterator[np.ndarray], gate: SpeechGate) -> Iterator[np.ndarray]:
+    yield from emitted
+    for block in blocks:
+        emitted = gate.process(block)
+        if not gate.active.is_set():
+            return
+        yield from emitted
+    gate.close()
@@ -0,0 +1,51 @@
+from typing import TYPE_CHECKING, Callable, List
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class AsyncWaiters:
+    """
+    Coroutines waiting on state changed by the audio thread.
+
+    Waiters park on a future of their own event loop; notify_all, called from
+    the audio callback or any other thread, wakes them with
+    loop.call_soon_threadsafe. No thread or polling timer is involved, and
+    notify_all costs nothing while nobody waits. asyncio itself is only
+    imported once a coroutine waits.
+    """
+
+    def __init__(self):
+        self._futures: List["asyncio.Future"] = []
+
+    async def wait_for(self, predicate: Callable[[], bool]) -> None:
+        """Wait until predicate returns True; it is re-evaluated on every notification."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while not predicate():
+            # Register before the re-check so a notification in between is not lost.
+            future = loop.create_future()
+            self._futures.append(future)
+            try:
+                if predicate():
+                    return
+                await future
+            finally:
+                self._futures.remove(future)
+
+    def notify_all(self) -> None:
+        """Wake all waiters. Safe to call from any thread."""
+        if not self._futures:
+            return
+        for future in tuple(self._futures):
+            try:
+                future.get_loop().call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # The waiter's loop has been closed.
+                pass
+
+
+def _wake(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,110 @@
+import mmap
+import struct
+import numpy as np
+
+from pathlib import Path
+
+from .conversion import INT24
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_SAMPLE_FORMATS = {
+    (_WAVE_FORMAT_PCM, 8): np.dtype(np.uint8),
+    (_WAVE_FORMAT_PCM, 16): np.dtype(np.int16),
+    (_WAVE_FORMAT_PCM, 24): INT24,
+    (_WAVE_FORMAT_PCM, 32): np.dtype(np.int32),
+    (_WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype(np.float32),
+    (_WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype(np.float64),
+}
+
+
+class WavFile:
+    """
+    Memory-mapped WAV file.
+
+    Only the RIFF header is parsed on open; read returns zero-copy views of
+    the mapped PCM payload, so the operating system pages samples in as they
+    are read. release hands pages that have been consumed back, which keeps
+    resident memory bounded by the read-ahead rather than the file length.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._released = 0
+        try:
+            self._parse()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __enter__(self) -> "WavFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def frames(self) -> int:
+        return self._data_size // self.frame_bytes
+
+    def read(self, start: int, frames: int) -> memoryview:
+        """
+        Return up to frames frames from frame start as a view of the mapping.
+
+        The view has to be released (it is a context manager) before close.
+        """
+        end = min(start + frames, self.frames)
+        offset = self._data_offset + start * self.frame_bytes
+        return memoryview(self._mmap)[offset:offset + max(end - start, 0) * self.frame_bytes]
+
+    def release(self, frame: int) -> None:
+        """Drop the mapped pages holding the frames before frame from memory."""
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        end = (self._data_offset + frame * self.frame_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+        if end > self._released:
+            self._mmap.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+            self._released = end
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _parse(self) -> None:
+        data = self._mmap
+        if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+            raise ValueError(f"{self.path} is not a WAV file")
+
+        has_format = False
+        position = 12
+        while position + 8 <= len(data):
+            chunk_id = data[position:position + 4]
+            chunk_size, = struct.unpack_from('<I', data, position + 4)
+            body = position + 8
+            if chunk_id == b'fmt ':
+                self._parse_format(data, body, chunk_size)
+                has_format = True
+            elif chunk_id == b'data':
+                if not has_format:
+                    raise ValueError(f"{self.path} has no format chunk before its data")
+                # Streaming writers leave the size unset; the data then runs to the end of the file.
+                self._data_offset = body
+                self._data_size = min(chunk_size, len(data) - body)
+                return
+            position = body + chunk_size + (chunk_size & 1)
+        raise ValueError(f"{self.path} has no data chunk")
+
+    def _parse_format(self, data, offset: int, size: int) -> None:
+        if size < 16:
+            raise ValueError(f"{self.path} has a truncated format chunk")
+        tag, self.channels, self.rate, _, self.frame_bytes, bits = struct.unpack_from('<HHIIHH', data, offset)
+        if tag == _WAVE_FORMAT_EXTENSIBLE and size >= 40:
+            # The sub-format GUID starts with the actual format tag.
+            tag, = struct.unpack_from('<H', data, offset + 24)
+        self.format = _SAMPLE_FORMATS.get((tag, bits))
+        if self.format is None:
+            raise ValueError(f"{self.path}: unsupported WAV encoding (format {tag:#06x}, {bits} bits)")
+        if not self.channels or self.frame_bytes != self.channels * self.format.itemsize:
+            raise ValueError(f"{self.path} has an inconsistent format chunk")
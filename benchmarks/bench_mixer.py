@@ -0,0 +1,65 @@
+"""
+Measure Out._callback block time for many concurrently queued sources.
+
+Reports mean, p99 and max block time against the real-time budget
+(frames / rate). Run from the repository root:
+
+    python benchmarks/bench_mixer.py --sources 32 --blocks 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from audio import Out
+from audio.source import Source
+
+
+def queue_sources(n_sources: int, chunk_frames: int, chunks: int) -> None:
+    chunk = np.full((chunk_frames, Out._default_channels), 0.01, dtype=np.float32)
+    for index in range(n_sources):
+        source = Source(f"bench-{index}", Out._default_channels)
+        for _ in range(chunks):
+            source.enqueue(chunk)
+        Out._pending_sources.append(source)
+
+
+def run(n_sources: int, frames: int, blocks: int, chunk_frames: int) -> dict:
+    chunks = frames * blocks // chunk_frames + 1
+    queue_sources(n_sources, chunk_frames, chunks)
+
+    outdata = np.zeros((frames, Out._default_channels), dtype=Out._default_format)
+    timings = np.empty(blocks, dtype=np.float64)
+    for block in range(blocks):
+        start = time.perf_counter()
+        Out._callback(outdata, frames, None, None)
+        timings[block] = time.perf_counter() - start
+
+    budget_ms = frames / Out._default_rate * 1000
+    timings_ms = timings * 1000
+    return {
+        "sources": n_sources,
+        "frames": frames,
+        "budget_ms": budget_ms,
+        "mean_ms": float(timings_ms.mean()),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+        "max_ms": float(timings_ms.max()),
+        "jitter_ms": float(timings_ms.std()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=512)
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--chunk-frames", type=int, default=256)
+    args = parser.parse_args()
+
+    result = run(args.sources, args.frames, args.blocks, args.chunk_frames)
+    for key, value in result.items():
+        print(f"{key:>10}: {value:.4f}" if isinstance(value, float) else f"{key:>10}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure PCM normalization throughput (MB/s of input) per sample format.
+
+Compares audio.conversion.normalize_pcm with the previous astype + np.where
+conversion. Run from the repository root:
+
+    python benchmarks/bench_pcm.py --seconds 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from audio.conversion import INT24, normalize_pcm
+
+FORMATS = [np.uint8, np.int16, INT24, np.int32, np.float32, np.float64]
+
+
+def make_pcm(format: np.dtype, samples: int) -> bytes:
+    rng = np.random.default_rng(0)
+    if format == INT24:
+        return rng.integers(0, 256, samples * 3, dtype=np.uint8).tobytes()
+    if format.kind == 'f':
+        return rng.uniform(-1, 1, samples).astype(format).tobytes()
+    info = np.iinfo(format)
+    return rng.integers(info.min, info.max, samples, dtype=format, endpoint=True).tobytes()
+
+
+def legacy_normalize(data: bytes, format: np.dtype) -> np.ndarray:
+    audio_data = np.frombuffer(data, dtype=format)
+    if np.issubdtype(format, np.integer):
+        audio_data = audio_data.astype(np.float32)
+        max_val = float(np.iinfo(format).max)
+        return np.where(audio_data > 0, audio_data / max_val, audio_data / (max_val + 1))
+    return audio_data.astype(np.float32)
+
+
+def throughput(convert, data: bytes, repeats: int) -> float:
+    convert()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        convert()
+    elapsed = (time.perf_counter() - start) / repeats
+    return len(data) / elapsed / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    samples = int(args.seconds * args.rate) * args.channels
+    print(f"{'format':>8} {'MB/s':>10} {'legacy MB/s':>12}")
+    for format in map(np.dtype, FORMATS):
+        data = make_pcm(format, samples)
+        out = np.empty(samples, dtype=np.float32)
+        current = throughput(lambda: normalize_pcm(data, format, out), data, args.repeats)
+        legacy = "-" if format == INT24 else f"{throughput(lambda: legacy_normalize(data, format), data, args.repeats):.1f}"
+        name = "int24" if format == INT24 else format.name
+        print(f"{name:>8} {current:>10.1f} {legacy:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Run the mixer, conversion and capture benchmarks and write the results as JSON.
+
+Covers Out._callback for 1-128 concurrent sources at several block sizes
+(block time against the real-time budget frames / rate), Out._process_data
+throughput per sample format and input rate, and the In capture callback.
+Run from the repository root:
+
+    python benchmarks/bench_suite.py --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/bench_suite.py --compare results/baseline.json
+
+With --compare, results are matched to the baseline by benchmark and
+parameters; any that got worse by more than --tolerance are listed and the
+exit status is 1.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from audio import In, Out
+from audio.capture import CaptureBuffer
+from audio.conversion import INT24
+from audio.resampler import StreamingResampler
+from bench_mixer import run as run_mixer
+from bench_pcm import FORMATS, make_pcm
+
+SOURCES = [1, 2, 4, 8, 16, 32, 64, 128]
+BLOCK_FRAMES = [128, 512, 1024]
+INPUT_RATES = [8000, 16000, 22050, 44100, 48000]
+CAPTURE_FRAMES = [256, 1536, 4096]
+
+# Metric compared against the baseline per benchmark, and whether higher is better.
+METRICS = {
+    "mixer": ("p99_ms", False),
+    "process_data": ("mb_per_s", True),
+    "capture_callback": ("median_us", False),
+}
+
+
+def bench_mixer(blocks: int) -> list:
+    results = []
+    for frames in BLOCK_FRAMES:
+        for n_sources in SOURCES:
+            Out._active_sources.clear()
+            Out._pending_sources.clear()
+            result = run_mixer(n_sources, frames, blocks, chunk_frames=256)
+            result["load"] = result["p99_ms"] / result["budget_ms"]
+            results.append({"benchmark": "mixer", **result})
+    Out._active_sources.clear()
+    return results
+
+
+def bench_process_data(seconds: float, chunk_frames: int, channels: int) -> list:
+    results = []
+    for input_rate in INPUT_RATES:
+        for format in map(np.dtype, FORMATS):
+            frames = int(seconds * input_rate)
+            chunk_bytes = chunk_frames * channels * format.itemsize
+            data = make_pcm(format, frames * channels)
+            chunks = [data[start:start + chunk_bytes] for start in range(0, len(data), chunk_bytes)]
+
+            resampler = None
+            if input_rate != Out._default_rate:
+                resampler = StreamingResampler(input_rate, Out._default_rate, Out._default_channels)
+            start = time.perf_counter()
+            for chunk in chunks:
+                Out._process_data(chunk, format, channels, input_rate, resampler)
+            elapsed = time.perf_counter() - start
+
+            results.append({
+                "benchmark": "process_data",
+                "format": "int24" if format == INT24 else format.name,
+                "input_rate": input_rate,
+                "output_rate": Out._default_rate,
+                "channels": channels,
+                "chunk_frames": chunk_frames,
+                "mb_per_s": len(data) / elapsed / 1e6,
+                "realtime_factor": seconds / elapsed,
+            })
+    return results
+
+
+def bench_capture(blocks: int) -> list:
+    results = []
+    channels = In._default_channels
+    for frames in CAPTURE_FRAMES:
+        In._sample_rate = In._default_sample_rate
+        In._capture = CaptureBuffer(int(In._default_buffer_seconds * In._default_sample_rate), channels,
+                                    np.dtype(In._default_format))
+        indata = np.zeros((frames, channels), dtype=In._default_format)
+        for _ in range(10):
+            In._capture_callback(indata, frames, None, None)
+        timings = np.empty(blocks, dtype=np.float64)
+        for block in range(blocks):
+            start = time.perf_counter()
+            In._capture_callback(indata, frames, None, None)
+            timings[block] = time.perf_counter() - start
+        In._capture = None
+
+        timings_us = timings * 1e6
+        results.append({
+            "benchmark": "capture_callback",
+            "frames": frames,
+            "budget_ms": frames / In._default_sample_rate * 1000,
+            "mean_us": float(timings_us.mean()),
+            "median_us": float(np.median(timings_us)),
+            "p99_us": float(np.percentile(timings_us, 99)),
+            "max_us": float(timings_us.max()),
+        })
+    return results
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "output_rate": Out._default_rate,
+        "output_channels": Out._default_channels,
+    }
+
+
+def result_key(result: dict) -> tuple:
+    metric = METRICS[result["benchmark"]][0]
+    return tuple(sorted((key, value) for key, value in result.items()
+                        if not isinstance(value, float) and key != metric))
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Return (result, baseline value, change) for every result worse than baseline by more than tolerance."""
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        metric, higher_is_better = METRICS[result["benchmark"]]
+        change = result[metric] / old[metric] - 1
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append((result, old[metric], change))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--blocks", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--chunk-frames", type=int, default=4096)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--only", choices=sorted(METRICS), action="append",
+                        help="run only this benchmark (repeatable)")
+    args = parser.parse_args()
+
+    selected = args.only or list(METRICS)
+    results = []
+    if "mixer" in selected:
+        results += bench_mixer(args.blocks)
+    if "process_data" in selected:
+        results += bench_process_data(args.seconds, args.chunk_frames, args.channels)
+    if "capture_callback" in selected:
+        results += bench_capture(args.blocks)
+
+    report = json.dumps({"meta": metadata(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for result, old, change in regressions:
+            metric = METRICS[result["benchmark"]][0]
+            print(f"REGRESSION {result_key(result)}: {metric} {old:.4g} -> {result[metric]:.4g} ({change:+.1%})",
+                  file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
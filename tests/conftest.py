@@ -1,6 +1,16 @@
 import pytest
 import numpy as np
 
+from unittest.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def portaudio_restart():
+    """Keep Devices from re-initializing PortAudio under the tests."""
+    with patch('sounddevice._terminate', create=True) as terminate, \
+            patch('sounddevice._initialize', create=True) as initialize:
+        yield terminate, initialize
+
 
 @pytest.fixture
 def sample_int16_audio():
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from audio.assets import AssetCache
+
+
+def _frames(n: int) -> np.ndarray:
+    return np.zeros((n, 2), dtype=np.float32)
+
+
+class TestAssetCache:
+    """Test the byte-budget LRU cache of preloaded audio."""
+
+    def test_get_returns_stored_array_read_only(self):
+        """Test that entries are shared, not copied, and cannot be modified."""
+        cache = AssetCache(budget=1 << 20)
+        frames = _frames(100)
+
+        cache.put('chime', frames)
+
+        assert cache.get('chime') is frames
+        assert not frames.flags.writeable
+        assert cache.bytes == frames.nbytes
+
+    def test_least_recently_played_is_evicted(self):
+        """Test that exceeding the budget drops the entry used longest ago."""
+        cache = AssetCache(budget=3 * 800)
+        for key in 'abc':
+            cache.put(key, _frames(100))
+        cache.get('a')
+
+        cache.put('d', _frames(100))
+
+        assert 'b' not in cache
+        assert all(key in cache for key in 'acd')
+        assert cache.evictions == 1
+        assert cache.bytes == 3 * 800
+
+    def test_replacing_key_updates_size(self):
+        """Test that preloading a key again replaces the entry and its byte count."""
+        cache = AssetCache(budget=1 << 20)
+        cache.put('tts', _frames(100))
+        cache.put('tts', _frames(10))
+
+        assert len(cache) == 1
+        assert cache.bytes == 80
+
+    def test_asset_larger_than_budget_raises(self):
+        """Test that an asset that can never fit is rejected."""
+        cache = AssetCache(budget=100)
+
+        with pytest.raises(ValueError):
+            cache.put('long', _frames(100))
+        assert len(cache) == 0
+
+    def test_resize_evicts_until_within_budget(self):
+        """Test that shrinking the budget evicts the oldest entries."""
+        cache = AssetCache(budget=1 << 20)
+        for key in 'abc':
+            cache.put(key, _frames(100))
+
+        cache.resize(800)
+
+        assert len(cache) == 1
+        assert cache.bytes == cache.budget == 800
+        assert 'c' in cache
+
+    def test_snapshot_counts_hits_and_misses(self):
+        """Test the hit/miss counters and their reset."""
+        cache = AssetCache(budget=1 << 20)
+        cache.put('chime', _frames(10))
+        cache.get('chime')
+        cache.get('chime')
+        cache.get('missing')
+
+        snapshot = cache.snapshot()
+        cache.reset()
+
+        assert (snapshot['hits'], snapshot['misses']) == (2, 1)
+        assert cache.snapshot()['hits'] == 0
+        assert len(cache) == 1
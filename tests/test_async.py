@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+
+from unittest.mock import patch
+from audio.out_audio import Out
+from audio.in_audio import In
+from audio.waiters import AsyncWaiters
+
+
+def _reset_out():
+    Out._sources.clear()
+    Out._active_sources.clear()
+    Out._pending_sources.clear()
+
+
+def _play(frames, delay=0.02):
+    """Run the output callback for the given number of frames on another thread."""
+    def run():
+        outdata = np.zeros((frames, Out._default_channels), dtype=Out._default_format)
+        Out._callback(outdata, frames, None, None)
+    timer = threading.Timer(delay, run)
+    timer.start()
+    return timer
+
+
+class TestAsyncWaiters:
+    """Test waking coroutines from other threads."""
+
+    @pytest.mark.asyncio
+    async def test_wait_for_returns_when_predicate_holds(self):
+        """Test that no notification is needed when the predicate is already true."""
+        await asyncio.wait_for(AsyncWaiters().wait_for(lambda: True), timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_notify_from_thread_wakes_waiter(self):
+        """Test that notify_all on another thread re-evaluates the predicate."""
+        waiters = AsyncWaiters()
+        state = {'ready': False}
+
+        def produce():
+            state['ready'] = True
+            waiters.notify_all()
+
+        threading.Timer(0.02, produce).start()
+        await asyncio.wait_for(waiters.wait_for(lambda: state['ready']), timeout=1.0)
+
+        assert waiters._futures == []
+
+
+class TestAsyncPlayback:
+    """Test the asyncio playback API."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+
+    @pytest.mark.asyncio
+    async def test_write_async_returns_while_below_buffer_limit(self):
+        """Test that a short write does not wait for playback."""
+        audio = np.zeros((256, 2), dtype=np.float32)
+
+        await asyncio.wait_for(Out.write_async(audio), timeout=1.0)
+
+        assert len(Out._sources) == 1
+
+    @pytest.mark.asyncio
+    async def test_write_async_waits_for_playback_above_limit(self):
+        """Test that write_async applies backpressure until the callback consumes audio."""
+        audio = np.zeros((1024, 2), dtype=np.float32)
+
+        with patch.object(Out, '_async_buffer_seconds', 0):
+            write = asyncio.ensure_future(Out.write_async(audio))
+            await asyncio.sleep(0.01)
+            assert not write.done()
+
+            _play(1024).join()
+            await asyncio.wait_for(write, timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_write_async_tasks_keep_their_call_sites(self):
+        """Test that writes run as tasks from different lines get separate sources."""
+        audio = np.zeros((256, 2), dtype=np.float32)
+
+        first = asyncio.create_task(Out.write_async(audio))
+        second = asyncio.create_task(Out.write_async(audio))
+        await asyncio.wait_for(asyncio.gather(first, second), timeout=1.0)
+
+        assert len(Out._sources) == 2
+        assert all(source_id.startswith(__file__) for source_id in Out._sources)
+
+    @pytest.mark.asyncio
+    async def test_source_write_async_uses_handle(self):
+        """Test that handles expose the same coroutine."""
+        source = Out.open_source('voice')
+
+        await source.write_async(np.zeros((16, 2), dtype=np.float32))
+
+        assert len(source) == 16
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_until_sources_finish(self):
+        """Test that drain resumes once the callback has played everything."""
+        Out.write(np.zeros((512, 2), dtype=np.float32))
+
+        drain = asyncio.ensure_future(Out.drain())
+        await asyncio.sleep(0.01)
+        assert not drain.done()
+
+        _play(512)
+        await asyncio.wait_for(drain, timeout=1.0)
+
+
+class TestAsyncCapture:
+    """Test the asyncio capture iterator."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Stop any capture left running."""
+        In.stop()
+        with patch('sounddevice.InputStream'):
+            yield
+        In.stop()
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_blocks_from_callback(self):
+        """Test that blocks delivered on the audio thread reach the event loop."""
+        In.start(frame_length=64, channels=1)
+        blocks = In.stream()
+        block = np.full((64, 1), 0.5, dtype=np.float32)
+
+        threading.Timer(0.02, In._capture_callback, (block, 64, None, None)).start()
+        received = await asyncio.wait_for(anext(blocks), timeout=1.0)
+
+        np.testing.assert_array_equal(received, block)
+
+    @pytest.mark.asyncio
+    async def test_stream_ends_when_capture_stops(self):
+        """Test that a waiting iterator finishes when capture is stopped."""
+        In.start(frame_length=64)
+        blocks = In.stream()
+
+        threading.Timer(0.02, In.stop).start()
+
+        assert [block async for block in blocks] == []
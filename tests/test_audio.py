@@ -1,9 +1,33 @@
+import gc
 import pytest
+import queue
+import threading
+import time
+import wave
+import weakref
 import numpy as np
 import sounddevice as sd
 from unittest.mock import Mock, patch, MagicMock
 from audio.out_audio import Out
 from audio.in_audio import In
+from audio.source import Source
+from audio.devices import Devices
+from audio.conversion import channel_matrix
+from audio.mixer import Mixer
+
+
+def _source(*chunks, source_id='test'):
+    """Build a playback source holding the given chunks."""
+    source = Source(source_id, chunks[0].shape[1])
+    for chunk in chunks:
+        source.enqueue(chunk)
+    return source
+
+
+def _reset_out():
+    Out._sources.clear()
+    Out._active_sources.clear()
+    Out._pending_sources.clear()
 
 
 class TestAudioProcessing:
@@ -50,7 +74,7 @@ class TestChannelConversion:
         """Test converting mono to stereo duplicates the channel."""
         mono = np.array([[1.0], [2.0], [3.0]], dtype=np.float32)
         
-        result = Out._convert_channels(mono, 1, 2)
+        result = mono @ channel_matrix(1, 2)
         
         assert result.shape == (3, 2)
         np.testing.assert_array_equal(result[:, 0], result[:, 1])
@@ -59,19 +83,15 @@ class TestChannelConversion:
         """Test converting stereo to mono averages channels."""
         stereo = np.array([[1.0, 3.0], [2.0, 4.0], [3.0, 5.0]], dtype=np.float32)
         
-        result = Out._convert_channels(stereo, 2, 1)
+        result = stereo @ channel_matrix(2, 1)
         
         assert result.shape == (3, 1)
         expected = np.array([[2.0], [3.0], [4.0]], dtype=np.float32)
         np.testing.assert_array_almost_equal(result, expected)
     
     def test_same_channels_no_conversion(self):
-        """Test that same channel count returns unchanged data."""
-        stereo = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
-        
-        result = Out._convert_channels(stereo, 2, 2)
-        
-        np.testing.assert_array_equal(result, stereo)
+        """Test that same channel count needs no mixing matrix."""
+        assert channel_matrix(2, 2) is None
 
 
 class TestResampling:
@@ -105,13 +125,22 @@ class TestResampling:
 
 
 class TestFormatConversion:
-    """Test format conversion between int16 and float32."""
+    """Test the mixer's conversion of the mix to the output format."""
+    
+    @staticmethod
+    def _write(audio, format):
+        mixer = Mixer()
+        outdata = np.zeros(audio.shape, dtype=format)
+        mixed = mixer.accumulator(outdata)
+        mixed += audio
+        mixer.write(mixed, outdata)
+        return outdata
     
     def test_float32_to_float32(self):
-        """Test that float32 returns unchanged."""
+        """Test that float32 is stored unchanged."""
         audio = np.array([[0.5, -0.5], [1.0, -1.0]], dtype=np.float32)
         
-        result = Out._convert_format(audio, Out.float32)
+        result = self._write(audio, Out.float32)
         
         np.testing.assert_array_equal(result, audio)
     
@@ -119,7 +148,7 @@ class TestFormatConversion:
         """Test conversion from float32 to int16."""
         audio = np.array([[0.0, 0.5], [-0.5, 1.0]], dtype=np.float32)
         
-        result = Out._convert_format(audio, Out.int16)
+        result = self._write(audio, Out.int16)
         
         assert result.dtype == np.int16
         assert result[0, 0] == 0
@@ -130,10 +159,9 @@ class TestFormatConversion:
         """Test that values outside [-1, 1] are clipped."""
         audio = np.array([[1.5, -1.5], [2.0, -2.0]], dtype=np.float32)
         
-        result = Out._convert_format(audio, Out.int16)
+        result = self._write(audio, Out.int16)
         
-        assert np.all(result <= 32767)
-        assert np.all(result >= -32768)
+        np.testing.assert_array_equal(result, [[32767, -32767], [32767, -32767]])
 
 
 class TestSourceTracking:
@@ -162,19 +190,92 @@ class TestSourceTracking:
         assert id_1 != id_2
 
 
+    def test_source_id_does_not_inspect_stack(self):
+        """Test that identifying the caller does not build full stack frame info."""
+        with patch('inspect.stack', side_effect=AssertionError("inspect.stack called")):
+            source_id = Out._get_source_id()
+        
+        assert ':' in source_id
+
+
+class TestSourceHandles:
+    """Test explicit playback source handles."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+    
+    def test_handles_written_from_same_line_stay_separate(self):
+        """Test that two handles never merge even when written from one call site."""
+        handles = [Out.open_source('tts'), Out.open_source('tts')]
+        
+        for handle in handles:
+            handle.write(np.zeros(200, dtype=np.float32).tobytes())
+        
+        assert handles[0].id != handles[1].id
+        assert all(len(handle) == 100 for handle in handles)
+        assert len(Out._pending_sources) == 2
+    
+    def test_handle_write_uses_given_format(self):
+        """Test that a handle converts with the format, channels and rate it is given."""
+        source = Out.open_source()
+        
+        source.write(np.zeros(480, dtype=np.int16).tobytes(), format=Out.int16, channels=1, rate=48000)
+        
+        assert len(source) == int(np.ceil(480 * Out._default_rate / 48000))
+    
+    def test_write_after_close_raises(self):
+        """Test that a closed handle rejects further writes."""
+        source = Out.open_source()
+        source.close()
+        
+        with pytest.raises(ValueError):
+            source.write(np.zeros(10, dtype=np.float32).tobytes())
+    
+    def test_context_manager_closes_and_queued_audio_still_plays(self):
+        """Test that leaving the context closes the handle but keeps its queued frames."""
+        with Out.open_source() as source:
+            source.write(np.full(512, 0.5, dtype=np.float32).tobytes())
+        outdata = np.zeros((256, 2), dtype=np.float32)
+        
+        Out._callback(outdata, 256, None, None)
+        
+        assert source.closed
+        np.testing.assert_array_almost_equal(outdata, 0.5)
+        assert source.id in Out._sources
+    
+    def test_closed_source_is_forgotten_after_it_drains(self):
+        """Test that closed handles are dropped once their audio has played."""
+        source = Out.open_source()
+        source.write(np.zeros(200, dtype=np.float32).tobytes())
+        source.close()
+        outdata = np.zeros((512, 2), dtype=np.float32)
+        
+        Out._callback(outdata, 512, None, None)
+        
+        assert Out.wait_until_finished(timeout=0.1) is True
+        assert source.id not in Out._sources
+
+
 class TestAudioWrite:
     """Test the main write method."""
     
     @pytest.fixture(autouse=True)
     def setup_teardown(self):
         """Reset Audio state before and after each test."""
-        Out._sources.clear()
+        _reset_out()
         if Out._stream is not None:
             Out._stream.stop()
             Out._stream.close()
             Out._stream = None
         yield
-        Out._sources.clear()
+        _reset_out()
         if Out._stream is not None:
             Out._stream.stop()
             Out._stream.close()
@@ -192,6 +293,25 @@ class TestAudioWrite:
         mock_stream_class.assert_called_once()
         mock_stream.start.assert_called_once()
     
+    @patch('sounddevice.OutputStream')
+    def test_drained_write_frees_its_ring(self, mock_stream_class):
+        """Test that a call-site source is forgotten once played, releasing its buffer."""
+        out = Out(rate=44100, channels=2)
+        out.write(np.zeros((60 * 44100, 2), dtype=np.float32))
+        (source,) = out._sources.values()
+        ring = weakref.ref(source._segments[-1])
+        assert ring().capacity >= 60 * 44100
+        del source
+        
+        outdata = np.zeros((4096, 2), dtype=np.float32)
+        while out._frames_mixed < 61 * 44100:
+            out._callback(outdata, 4096, None, None)
+        
+        assert out.wait_until_finished(timeout=0)
+        assert not out._sources and not out._active_sources
+        gc.collect()
+        assert ring() is None
+    
     @patch('sounddevice.OutputStream')
     def test_write_stores_processed_data(self, mock_stream_class):
         """Test that write stores processed audio data."""
@@ -203,8 +323,30 @@ class TestAudioWrite:
         
         assert len(Out._sources) > 0
         source_id = list(Out._sources.keys())[0]
-        assert len(Out._sources[source_id]) == 1
-        assert isinstance(Out._sources[source_id][0], np.ndarray)
+        assert isinstance(Out._sources[source_id], Source)
+        assert len(Out._sources[source_id]) == int(np.ceil(100 * Out._default_rate / 48000))
+    
+    @patch('sounddevice.OutputStream')
+    def test_streamed_writes_match_single_write(self, mock_stream_class):
+        """Test that resampling state carries across writes from the same source."""
+        mock_stream_class.return_value = MagicMock()
+        audio = np.random.rand(4800).astype(np.float32)
+        
+        def write_stream():
+            for start in range(0, 4800, 480):
+                Out.write(audio[start:start + 480].tobytes(), format=Out.float32, channels=1, rate=48000)
+        
+        write_stream()
+        streamed = Out._sources.pop(list(Out._sources)[0])
+        Out.write(audio.tobytes(), format=Out.float32, channels=1, rate=48000)
+        whole = Out._sources.pop(list(Out._sources)[0])
+        
+        assert len(streamed) == len(whole)
+        streamed_out = np.zeros((len(streamed), 2), dtype=np.float32)
+        whole_out = np.zeros((len(whole), 2), dtype=np.float32)
+        streamed.add_into(streamed_out)
+        whole.add_into(whole_out)
+        np.testing.assert_allclose(streamed_out, whole_out, atol=1e-6)
     
     @patch('sounddevice.OutputStream')
     def test_write_multiple_sources(self, mock_stream_class):
@@ -226,19 +368,177 @@ class TestAudioWrite:
         assert len(Out._sources) == 2
 
 
+def _finish_conversions():
+    """Wait for queued background conversions by replacing the worker pool."""
+    Out.set_conversion_workers(Out._conversion_workers)
+
+
+class TestArrayWrite:
+    """Test writing NumPy arrays and buffer-protocol objects."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+    
+    def test_handed_over_float32_frames_are_played_in_place(self):
+        """Test that float32 frames at the device layout are queued without a copy."""
+        frames = np.full((300, Out._default_channels), 0.25, dtype=np.float32)
+        source = Out.open_source()
+        
+        source.write(frames, copy=False)
+        
+        assert len(source) == 300
+        assert np.shares_memory(source._segments[-1]._frames, frames)
+        outdata = np.zeros((300, Out._default_channels), dtype=np.float32)
+        Out._callback(outdata, 300, None, None)
+        np.testing.assert_array_almost_equal(outdata, 0.25)
+    
+    def test_byte_memoryview_is_read_like_bytes(self):
+        """Test that a memoryview of raw PCM bytes is decoded in the output format, not as uint8."""
+        frames = np.full((100, 2), 0.25, dtype=np.float32)
+        source = Out.open_source()
+        
+        source.write(memoryview(frames.tobytes()), channels=2, rate=Out._rate)
+        
+        assert len(source) == 100
+        outdata = np.zeros((100, Out._channels), dtype=np.float32)
+        Out._callback(outdata, 100, None, None)
+        np.testing.assert_array_almost_equal(outdata, 0.25)
+    
+    def test_typed_memoryview_keeps_its_format(self):
+        """Test that a typed buffer is decoded by its own item format."""
+        samples = np.full(200, 16384, dtype=np.int16)
+        source = Out.open_source()
+        
+        source.write(memoryview(samples), channels=2, rate=Out._rate)
+        
+        assert len(source) == 100
+    
+    def test_copied_array_is_isolated_from_later_changes(self):
+        """Test that the default copy protects queued audio from caller mutation."""
+        frames = np.full((300, Out._default_channels), 0.25, dtype=np.float32)
+        source = Out.open_source()
+        
+        source.write(frames)
+        frames[:] = 1.0
+        outdata = np.zeros((300, Out._default_channels), dtype=np.float32)
+        Out._callback(outdata, 300, None, None)
+        
+        np.testing.assert_array_almost_equal(outdata, 0.25)
+    
+    def test_array_dtype_and_shape_define_format_and_channels(self):
+        """Test that int16 mono arrays are converted using their own dtype and shape."""
+        samples = np.full((480, 1), 16384, dtype=np.int16)
+        source = Out.open_source()
+        
+        source.write(samples, rate=48000)
+        
+        assert len(source) == int(np.ceil(480 * Out._default_rate / 48000))
+    
+    def test_memoryview_is_accepted(self):
+        """Test that buffer-protocol objects carry their item format."""
+        samples = np.full(200, 0.5, dtype=np.float32)
+        source = Out.open_source()
+        
+        source.write(memoryview(samples), channels=1)
+        
+        assert len(source) == 200
+    
+    def test_non_contiguous_array_is_played_correctly(self):
+        """Test that strided arrays are made contiguous before conversion."""
+        frames = np.zeros((200, 4), dtype=np.float32)
+        frames[:, ::2] = 0.5
+        source = Out.open_source()
+        
+        source.write(frames[:, ::2])
+        outdata = np.zeros((200, 2), dtype=np.float32)
+        Out._callback(outdata, 200, None, None)
+        
+        np.testing.assert_array_almost_equal(outdata, 0.5)
+
+
+class TestConversionWorkers:
+    """Test background conversion of written audio."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Enable a worker pool with a mocked stream and reset state afterwards."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'):
+            Out.set_conversion_workers(4)
+            yield
+            Out.set_conversion_workers(0)
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+    
+    def test_write_returns_before_conversion_finishes(self):
+        """Test that write only queues the raw data when workers are enabled."""
+        release = threading.Event()
+        original = Out._process_data.__func__
+        
+        def slow_process(cls, *args):
+            release.wait(2.0)
+            return original(cls, *args)
+        
+        with patch.object(Out, '_process_data', classmethod(slow_process)):
+            Out.write(np.zeros(200, dtype=np.float32).tobytes())
+            source = next(iter(Out._sources.values()))
+            
+            assert len(source) == 0
+            assert not source.idle
+            release.set()
+            assert Out.wait_until_finished(timeout=0) is False
+            _finish_conversions()
+        
+        assert len(source) == 100
+    
+    def test_writes_from_one_source_keep_submission_order(self):
+        """Test that chunks converted on several workers are queued in write order."""
+        chunks = [np.full(64, index / 100, dtype=np.float32) for index in range(50)]
+        
+        for chunk in chunks:
+            Out.write(chunk.tobytes(), format=Out.float32, channels=1, rate=Out._default_rate)
+        _finish_conversions()
+        
+        source = next(iter(Out._sources.values()))
+        out = np.zeros((len(source), 2), dtype=np.float32)
+        source.add_into(out)
+        np.testing.assert_array_almost_equal(out[:, 0], np.concatenate(chunks))
+    
+    def test_failed_conversion_is_logged_and_skipped(self, caplog):
+        """Test that a bad write is logged and does not stop later writes of the source."""
+        def write(data):
+            Out.write(data, format=Out.int16, channels=1, rate=Out._default_rate)
+        
+        write(b'\x00\x01\x02')
+        write(np.zeros(10, dtype=np.int16).tobytes())
+        _finish_conversions()
+        
+        source = next(iter(Out._sources.values()))
+        assert "Audio conversion failed" in caplog.text
+        assert len(source) == 10
+
+
 class TestAudioCallback:
     """Test the audio callback mixing logic."""
     
     @pytest.fixture(autouse=True)
     def setup_teardown(self):
         """Reset Audio state before and after each test."""
-        Out._sources.clear()
+        _reset_out()
         if Out._stream is not None:
             Out._stream.stop()
             Out._stream.close()
             Out._stream = None
         yield
-        Out._sources.clear()
+        _reset_out()
         if Out._stream is not None:
             Out._stream.stop()
             Out._stream.close()
@@ -256,13 +556,13 @@ class TestAudioCallback:
         """Test callback processes single source correctly."""
         frames = 512
         source_audio = np.ones((frames, 2), dtype=np.float32) * 0.5
-        Out._sources['test_source'] = [source_audio]
+        Out._active_sources['test_source'] = _source(source_audio, source_id='test_source')
         
         outdata = np.zeros((frames, 2), dtype=Out._default_format)
         Out._callback(outdata, frames, None, None)
         
         assert not np.all(outdata == 0)
-        assert len(Out._sources) == 0
+        assert len(Out._active_sources) == 0
     
     def test_callback_mixes_multiple_sources(self):
         """Test callback mixes multiple sources correctly."""
@@ -270,13 +570,13 @@ class TestAudioCallback:
         source1 = np.ones((frames, 2), dtype=np.float32) * 0.3
         source2 = np.ones((frames, 2), dtype=np.float32) * 0.2
         
-        Out._sources['source1'] = [source1]
-        Out._sources['source2'] = [source2]
+        Out._active_sources['source1'] = _source(source1, source_id='source1')
+        Out._active_sources['source2'] = _source(source2, source_id='source2')
         
         outdata = np.zeros((frames, 2), dtype=Out._default_format)
         Out._callback(outdata, frames, None, None)
         
-        assert len(Out._sources) == 0
+        assert len(Out._active_sources) == 0
     
     def test_callback_handles_partial_chunks(self):
         """Test callback handles chunks smaller than requested frames."""
@@ -284,26 +584,49 @@ class TestAudioCallback:
         chunk1 = np.ones((256, 2), dtype=np.float32) * 0.5
         chunk2 = np.ones((256, 2), dtype=np.float32) * 0.5
         
-        Out._sources['test'] = [chunk1, chunk2]
+        Out._active_sources['test'] = _source(chunk1, chunk2)
         
         outdata = np.zeros((frames, 2), dtype=Out._default_format)
         Out._callback(outdata, frames, None, None)
         
-        assert len(Out._sources) == 0
+        assert len(Out._active_sources) == 0
     
     def test_callback_preserves_remaining_chunk_data(self):
         """Test that callback preserves data when chunk is larger than frames."""
         frames = 256
         large_chunk = np.ones((512, 2), dtype=np.float32)
         
-        Out._sources['test'] = [large_chunk]
+        Out._active_sources['test'] = _source(large_chunk)
         
         outdata = np.zeros((frames, 2), dtype=Out._default_format)
         Out._callback(outdata, frames, None, None)
         
-        assert len(Out._sources) == 1
-        assert len(Out._sources['test']) == 1
-        assert Out._sources['test'][0].shape[0] == 256
+        assert len(Out._active_sources) == 1
+        assert len(Out._active_sources['test']) == 256
+    
+    def test_callback_does_not_block_on_writer_lock(self):
+        """Test that the callback mixes while an application thread holds the lock."""
+        frames = 512
+        Out._active_sources['test'] = _source(np.full((frames, 2), 0.5, dtype=np.float32))
+        outdata = np.zeros((frames, 2), dtype=np.float32)
+        
+        with Out._lock:
+            Out._callback(outdata, frames, None, None)
+        
+        np.testing.assert_array_almost_equal(outdata, 0.5)
+    
+    def test_callback_registers_pending_sources(self):
+        """Test that sources queued by writers are picked up by the callback."""
+        frames = 256
+        source = _source(np.full((frames * 2, 2), 0.25, dtype=np.float32))
+        Out._pending_sources.append(source)
+        outdata = np.zeros((frames, 2), dtype=np.float32)
+        
+        Out._callback(outdata, frames, None, None)
+        
+        assert Out._active_sources['test'] is source
+        assert not source.retired
+        np.testing.assert_array_almost_equal(outdata, 0.25)
     
     def test_callback_clipping_prevents_overflow(self):
         """Test that mixing multiple loud sources gets clipped."""
@@ -311,14 +634,381 @@ class TestAudioCallback:
         loud_source1 = np.ones((frames, 2), dtype=np.float32) * 0.9
         loud_source2 = np.ones((frames, 2), dtype=np.float32) * 0.9
         
-        Out._sources['source1'] = [loud_source1]
-        Out._sources['source2'] = [loud_source2]
+        Out._active_sources['source1'] = _source(loud_source1, source_id='source1')
+        Out._active_sources['source2'] = _source(loud_source2, source_id='source2')
         
         outdata = np.zeros((frames, 2), dtype=np.float32)
         Out._callback(outdata, frames, None, None)
         
         assert np.all(outdata >= -1.0)
         assert np.all(outdata <= 1.0)
+    
+    def test_callback_soft_limits_when_enabled(self):
+        """Test that the soft limiter keeps a loud mix below full scale."""
+        frames = 512
+        Out._active_sources['source1'] = _source(np.full((frames, 2), 0.6, dtype=np.float32), source_id='source1')
+        Out._active_sources['source2'] = _source(np.full((frames, 2), 0.6, dtype=np.float32), source_id='source2')
+        
+        outdata = np.zeros((frames, 2), dtype=np.float32)
+        with patch.object(Out, '_limiter', 0.8):
+            Out._callback(outdata, frames, None, None)
+        
+        assert np.all(outdata > 0.8)
+        assert np.all(outdata < 1.0)
+    
+    def test_set_limiter_rejects_invalid_threshold(self):
+        """Test that thresholds outside [0, 1) are rejected."""
+        with pytest.raises(ValueError):
+            Out.set_limiter(1.0)
+
+
+class TestScheduledPlayback:
+    """Test sample-accurate scheduling on the stream clock."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'), patch.object(Out, '_frames_mixed', 0):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+    
+    @staticmethod
+    def _render(blocks, frames=256):
+        output = []
+        for _ in range(blocks):
+            outdata = np.zeros((frames, Out._default_channels), dtype=np.float32)
+            Out._callback(outdata, frames, None, None)
+            output.append(outdata)
+        return np.concatenate(output)
+    
+    def test_time_advances_with_mixed_frames(self):
+        """Test that the stream clock counts frames handed to the device."""
+        self._render(3)
+        
+        assert Out.time(frames=True) == 768
+        assert Out.time() == pytest.approx(768 / Out._default_rate)
+    
+    def test_sources_scheduled_together_start_on_same_frame(self):
+        """Test that writes from different sources line up exactly, across block boundaries."""
+        click = np.ones((8, Out._default_channels), dtype=np.float32) * 0.25
+        Out.open_source('drums').write(click, at=300)
+        self._render(1)
+        Out.open_source('bass').write(click, at=300)
+        
+        output = self._render(2)
+        
+        assert np.flatnonzero(output[:, 0])[0] == 300 - 256
+        np.testing.assert_array_equal(output[44:52, 0], 0.5)
+    
+    def test_at_seconds_is_converted_with_output_rate(self):
+        """Test that a float start time is rounded to the nearest frame."""
+        Out.open_source().write(np.ones((4, Out._default_channels), dtype=np.float32) * 0.5,
+                                at=100 / Out._default_rate)
+        
+        output = self._render(1)
+        
+        assert np.flatnonzero(output[:, 0])[0] == 100
+    
+    def test_wait_covers_scheduled_audio(self):
+        """Test that a source waiting for its start time is not considered finished."""
+        Out.open_source().write(np.ones((4, Out._default_channels), dtype=np.float32), at=1000)
+        self._render(1)
+        
+        assert not Out.wait_until_finished(timeout=0.01)
+
+
+class TestPreload:
+    """Test preloaded assets played without conversion."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state, mock the output stream and use a fresh asset cache."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'), patch.object(Out, '_assets', None):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+
+    def test_play_queues_converted_asset_without_copy(self):
+        """Test that an asset is converted once and every play references the cached array."""
+        samples = np.array([0, 8192, -8192, 16384], dtype=np.int16)
+        Out.preload('chime', samples.tobytes(), format=Out.int16, channels=1)
+        conversions = Out._conversion_stats.count
+
+        for _ in range(3):
+            Out.play('chime')
+
+        source = next(iter(Out._sources.values()))
+        cached = Out._assets.get('chime')
+        assert Out._conversion_stats.count == conversions
+        assert all(segment._frames is cached for segment in list(source._segments)[1:])
+        assert len(source) == 12
+
+    def test_play_mixes_preloaded_frames(self):
+        """Test that a played asset sounds like the same data written directly."""
+        Out.preload('tone', np.full((64, 1), 0.25, dtype=np.float32))
+
+        Out.play('tone')
+        outdata = np.zeros((64, 2), dtype=np.float32)
+        Out._callback(outdata, 64, None, None)
+
+        np.testing.assert_array_equal(outdata, 0.25)
+
+    def test_preload_copies_caller_array(self):
+        """Test that the cache does not alias an array the caller may reuse."""
+        frames = np.full((16, 2), 0.5, dtype=np.float32)
+        Out.preload('tone', frames)
+        frames[:] = 0
+
+        np.testing.assert_array_equal(Out._assets.get('tone'), 0.5)
+
+    def test_source_play_and_scheduling(self):
+        """Test that explicit sources can play assets at a stream time."""
+        Out.preload('click', np.ones((4, 2), dtype=np.float32))
+
+        with patch.object(Out, '_frames_mixed', 0):
+            Out.open_source('ui').play('click', at=10)
+            outdata = np.zeros((32, 2), dtype=np.float32)
+            Out._callback(outdata, 32, None, None)
+
+        assert np.flatnonzero(outdata[:, 0]).tolist() == [10, 11, 12, 13]
+
+    def test_missing_asset_raises_and_counts_miss(self):
+        """Test that playing an unknown key is a KeyError recorded as a miss."""
+        with pytest.raises(KeyError):
+            Out.play('never-loaded')
+
+        assert Out.stats()['assets']['misses'] == 1
+
+
+class TestBoundedSources:
+    """Test per-source backlog limits and their policies."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+
+    @staticmethod
+    def _block(value, frames=100):
+        return np.full((frames, Out._default_channels), value, dtype=np.float32)
+
+    @staticmethod
+    def _play(frames):
+        outdata = np.zeros((frames, Out._default_channels), dtype=np.float32)
+        Out._callback(outdata, frames, None, None)
+        return outdata[:, 0]
+
+    def test_limit_in_ms_and_bytes(self):
+        """Test that both limits are converted to frames and the smaller one applies."""
+        by_ms = Out.open_source(max_backlog_ms=100)
+        both = Out.open_source(max_backlog_ms=100, max_backlog_bytes=800)
+
+        assert by_ms.max_frames == Out._default_rate // 10
+        assert both.max_frames == 800 // (Out._default_channels * 4)
+
+    def test_raise_policy(self):
+        """Test that a write that does not fit raises queue.Full and queues nothing."""
+        source = Out.open_source(max_backlog_bytes=200 * Out._default_channels * 4, policy='raise')
+        source.write(self._block(0.25, 150))
+
+        with pytest.raises(queue.Full):
+            source.write(self._block(0.25))
+        assert source.backlog == 150
+        assert source.backlog_ms == pytest.approx(150 / Out._default_rate * 1000)
+
+    def test_drop_newest_keeps_what_fits(self):
+        """Test that the part of a write beyond the limit is discarded."""
+        source = Out.open_source(max_backlog_bytes=150 * Out._default_channels * 4, policy='drop_newest')
+        source.write(self._block(0.25))
+        source.write(self._block(0.5))
+        source.write(self._block(0.75))
+
+        output = self._play(200)
+
+        assert source.dropped_frames == 150
+        np.testing.assert_array_equal(output, [0.25] * 100 + [0.5] * 50 + [0.0] * 50)
+
+    def test_drop_oldest_plays_latest_audio(self):
+        """Test that queued audio is discarded from the front so the newest fits."""
+        source = Out.open_source(max_backlog_bytes=150 * Out._default_channels * 4, policy='drop_oldest')
+        source.write(self._block(0.25))
+        source.write(self._block(0.5))
+        source.write(self._block(0.75, 400))
+
+        output = self._play(200)
+
+        assert source.dropped_frames == 450
+        np.testing.assert_array_equal(output, [0.75] * 150 + [0.0] * 50)
+
+    def test_block_waits_for_mixer(self):
+        """Test that a blocking writer resumes once the callback has made room."""
+        source = Out.open_source(max_backlog_bytes=150 * Out._default_channels * 4)
+        source.write(self._block(0.25))
+        writer = threading.Thread(target=source.write, args=(self._block(0.5),))
+        writer.start()
+        writer.join(0.05)
+        assert writer.is_alive()
+
+        self._play(64)
+        writer.join(1.0)
+
+        assert not writer.is_alive()
+        assert source.backlog == 136
+
+    def test_closing_releases_blocked_writer(self):
+        """Test that a writer blocked on a source that gets closed returns without queuing."""
+        source = Out.open_source(max_backlog_bytes=100 * Out._default_channels * 4)
+        source.write(self._block(0.25))
+        writer = threading.Thread(target=source.write, args=(self._block(0.5),))
+        writer.start()
+        writer.join(0.05)
+
+        source.close()
+        self._play(1)
+        writer.join(1.0)
+
+        assert not writer.is_alive()
+        assert source.backlog == 99
+
+
+class TestPlayFile:
+    """Test streaming playback of WAV files."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream'):
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+
+    @staticmethod
+    def _wav(path, samples: np.ndarray, channels: int = 2, rate: int = None):
+        with wave.open(str(path), 'wb') as f:
+            f.setnchannels(channels)
+            f.setsampwidth(2)
+            f.setframerate(rate or Out._default_rate)
+            f.writeframes(samples.astype(np.int16).tobytes())
+        return path
+
+    @staticmethod
+    def _wait_fed(source, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while source.feeding:
+            assert time.monotonic() < deadline, "file feeder did not finish"
+            time.sleep(0.01)
+
+    def test_plays_file_samples(self, tmp_path):
+        """Test that the file is played exactly, across chunk boundaries."""
+        samples = np.arange(-3000, 3000, dtype=np.int16)
+        source = Out.play_file(self._wav(tmp_path / 'clip.wav', samples), read_ahead=0.5)
+        self._wait_fed(source)
+
+        outdata = np.zeros((3000, 2), dtype=np.float32)
+        Out._callback(outdata, 3000, None, None)
+
+        np.testing.assert_array_equal(outdata.ravel(), samples / 32768.0)
+        assert source.closed and source.idle
+
+    def test_read_ahead_bounds_queued_audio(self, tmp_path):
+        """Test that the feeder stops converting once read_ahead seconds are queued."""
+        rate = Out._default_rate
+        source = Out.play_file(self._wav(tmp_path / 'long.wav', np.zeros(rate * 20, dtype=np.int16), 1),
+                               read_ahead=0.1)
+        time.sleep(0.2)
+
+        assert source.feeding
+        assert 0 < len(source) <= int(0.1 * rate) + int(0.025 * rate)
+        assert not Out.wait_until_finished(timeout=0.01)
+
+        source.close()
+        self._wait_fed(source)
+
+    def test_resamples_file_rate(self, tmp_path):
+        """Test that files at another rate are resampled to the output rate."""
+        path = self._wav(tmp_path / 'low.wav', np.zeros(2205, dtype=np.int16), 1, 22050)
+        source = Out.play_file(path, read_ahead=0.5)
+        self._wait_fed(source)
+
+        assert len(source) == 2205 * Out._default_rate // 22050
+
+    def test_invalid_file_raises_before_opening_source(self, tmp_path):
+        """Test that a bad file is reported to the caller."""
+        path = tmp_path / 'bad.wav'
+        path.write_bytes(b'not audio')
+
+        with pytest.raises(ValueError):
+            Out.play_file(path)
+        assert not Out._sources
+
+
+class TestStats:
+    """Test the playback and capture stats surfaces."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and counters, with mocked streams."""
+        _reset_out()
+        Out.stats(reset=True)
+        In.stop()
+        In.stats(reset=True)
+        with patch('sounddevice.OutputStream'), patch('sounddevice.InputStream'):
+            yield
+        _reset_out()
+        In.stop()
+        Out._stream = None
+        Out._playback_finished.set()
+    
+    def test_out_stats_count_callbacks_underflows_and_queue_depth(self):
+        """Test that callbacks, status flags, conversions and queued audio are reported."""
+        source = Out.open_source('voice')
+        source.write(np.zeros((Out._default_rate // 10, Out._default_channels), dtype=np.float32))
+        status = Mock(input_underflow=False, input_overflow=False, output_underflow=True,
+                      output_overflow=False, priming_output=False)
+        
+        outdata = np.zeros((512, Out._default_channels), dtype=Out._default_format)
+        Out._callback(outdata, 512, None, status)
+        stats = Out.stats()
+        
+        assert stats['callback']['callbacks'] == 1
+        assert stats['callback']['frames'] == 512
+        assert stats['callback']['output_underflows'] == 1
+        assert sum(stats['callback']['budget_histogram'].values()) == 1
+        assert stats['conversion']['count'] == 1
+        assert stats['sources'][source.id] == pytest.approx(100 - 512 / Out._default_rate * 1000)
+    
+    def test_out_stats_reset(self):
+        """Test that reset clears the counters after reading them."""
+        outdata = np.zeros((512, Out._default_channels), dtype=Out._default_format)
+        Out._callback(outdata, 512, None, None)
+        
+        assert Out.stats(reset=True)['callback']['callbacks'] == 1
+        assert Out.stats()['callback']['callbacks'] == 0
+    
+    def test_in_stats_report_capture_buffer(self):
+        """Test that capture callbacks and unread audio are reported."""
+        In.start(frame_length=160, sample_rate=16000, channels=1)
+        In._capture_callback(np.zeros((160, 1), dtype=np.float32), 160, None, None)
+        
+        stats = In.stats(reset=True)
+        
+        assert stats['callback']['callbacks'] == 1
+        assert stats['callback']['budget_ms'] == 10.0
+        assert stats['capture']['frames_captured'] == 160
+        assert stats['capture']['unread_ms'] == 10.0
+        assert stats['capture']['overflows'] == 0
 
 
 class TestStreamInitialization:
@@ -349,6 +1039,8 @@ class TestStreamInitialization:
             samplerate=Out._default_rate,
             channels=Out._default_channels,
             dtype=Out._default_format,
+            device=None,
+            latency=None,
             callback=Out._callback
         )
         mock_stream.start.assert_called_once()
@@ -364,6 +1056,149 @@ class TestStreamInitialization:
         Out._initiate_stream()
         
         mock_stream_class.assert_called_once()
+    
+    @patch('sounddevice.query_devices')
+    @patch('sounddevice.OutputStream')
+    def test_set_device_reopens_stream_on_device(self, mock_stream_class, mock_query_devices):
+        """Test that selecting a device reopens an open stream on that device."""
+        mock_query_devices.return_value = [
+            {'name': 'DJI Microphone', 'max_input_channels': 2, 'max_output_channels': 0},
+            {'name': 'Nothing Ear (open)', 'max_input_channels': 1, 'max_output_channels': 2}
+        ]
+        Devices.refresh()
+        Out._initiate_stream()
+        first_stream = Out._stream
+        
+        try:
+            Out.set_device('nothing ear')
+        finally:
+            Out._device = None
+            Devices.refresh()
+        
+        first_stream.close.assert_called_once()
+        assert mock_stream_class.call_args.kwargs['device'] == 1
+
+
+class TestOutputInstances:
+    """Test independent outputs next to the default instance."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset Audio state and mock the output stream."""
+        _reset_out()
+        with patch('sounddevice.OutputStream') as stream_class:
+            self.stream_class = stream_class
+            yield
+        _reset_out()
+        Out._stream = None
+        Out._playback_finished.set()
+
+    def test_class_api_acts_on_default_instance(self):
+        """Test that class-level calls and state go to one shared default output."""
+        default = Out.default()
+
+        Out.write(np.zeros((8, 2), dtype=np.float32))
+
+        assert Out.default() is default
+        assert Out._sources is default._sources
+        assert len(default._sources) == 1
+        assert Out._callback == default._callback
+
+    def test_class_assignment_sets_default_instance_state(self):
+        """Test that assigning instance state on the class does not shadow it."""
+        with patch.object(Out, '_limiter', 0.5):
+            assert Out.default()._limiter == 0.5
+            assert '_limiter' not in Out.__dict__
+        assert Out.default()._limiter == Out._default_limiter
+
+    def test_instances_have_own_stream_sources_and_mixer(self):
+        """Test that two outputs play separately on their own devices and layouts."""
+        earbuds = Out(device='earbuds', rate=16000, channels=1, latency='low')
+        speaker = Out(rate=48000)
+        tone = np.full((160, 1), 0.25, dtype=np.float32)
+
+        earbuds.write(tone, rate=16000)
+        speaker.open_source('alert').write(tone, rate=48000)
+
+        assert earbuds._sources.keys().isdisjoint(speaker._sources.keys())
+        assert not Out._sources
+        assert earbuds._mixer is not speaker._mixer and earbuds._lock is not speaker._lock
+        kwargs = [call.kwargs for call in self.stream_class.call_args_list]
+        assert [(k['samplerate'], k['channels'], k['latency']) for k in kwargs] == [(16000, 1, 'low'), (48000, 2, None)]
+        assert kwargs[0]['callback'] == earbuds._callback
+
+        outdata = np.zeros((160, 1), dtype=np.float32)
+        earbuds._callback(outdata, 160, None, None)
+        np.testing.assert_array_equal(outdata, 0.25)
+        assert earbuds.time(frames=True) == 160 and speaker.time(frames=True) == 0
+        assert len(next(iter(speaker._sources.values()))) == 160
+
+    def test_instance_converts_to_its_own_rate(self):
+        """Test that writes are resampled to the instance rate, not the default."""
+        earbuds = Out(rate=22050, channels=1)
+
+        earbuds.write(np.zeros((440, 1), dtype=np.float32), rate=44100)
+
+        assert len(next(iter(earbuds._sources.values()))) == 220
+
+    def test_close_releases_stream_workers_and_instance(self, portaudio_restart):
+        """Test that close frees the device so PortAudio can re-enumerate devices."""
+        terminate, _ = portaudio_restart
+        stream = self.stream_class.return_value
+        stream.closed = False
+        stream.close.side_effect = lambda: setattr(stream, 'closed', True)
+        earbuds = Out(device='earbuds', channels=1)
+        earbuds.set_conversion_workers(1)
+        earbuds.write(np.zeros((8, 1), dtype=np.float32))
+        earbuds._executor.submit(lambda: None).result()
+        executor = earbuds._executor
+
+        Devices._reinitialize()
+        terminate.assert_not_called()
+        earbuds.close()
+
+        stream.stop.assert_called_once()
+        stream.close.assert_called_once()
+        assert earbuds._stream is None and earbuds._executor is None
+        assert executor._shutdown
+        assert not earbuds._sources and earbuds.wait_until_finished(timeout=0)
+        assert earbuds not in Out._instances
+        Devices._reinitialize()
+        terminate.assert_called_once()
+
+    def test_close_releases_blocked_writer(self):
+        """Test that a writer waiting for room in a bounded source returns on close."""
+        earbuds = Out(channels=1)
+        source = earbuds.open_source(max_backlog_ms=1000 * 8 / earbuds._rate)
+        source.write(np.zeros((8, 1), dtype=np.float32))
+        writer = threading.Thread(target=source.write, args=(np.zeros((8, 1), dtype=np.float32),), daemon=True)
+        writer.start()
+        while not earbuds._blocked_writers:
+            time.sleep(0.001)
+
+        earbuds.close()
+
+        writer.join(timeout=1)
+        assert not writer.is_alive() and source.closed
+
+    def test_context_manager_closes_output(self):
+        """Test that leaving a with block closes the output."""
+        with Out(channels=1) as earbuds:
+            earbuds.write(np.zeros((8, 1), dtype=np.float32))
+            stream = earbuds._stream
+
+        stream.close.assert_called_once()
+        assert earbuds not in Out._instances
+
+    def test_closing_default_output_replaces_it_on_next_use(self):
+        """Test that the class-level API gets a fresh output after Out.close()."""
+        default = Out.default()
+        Out.write(np.zeros((8, 2), dtype=np.float32))
+
+        Out.close()
+
+        assert Out.default() is not default
+        assert not Out._sources and Out._stream is None
 
 
 class TestCleanup:
@@ -385,14 +1220,14 @@ class TestWaitUntilFinished:
     @pytest.fixture(autouse=True)
     def setup_teardown(self):
         """Reset Audio state before and after each test."""
-        Out._sources.clear()
+        _reset_out()
         Out._playback_finished.set()
         if Out._stream is not None:
             Out._stream.stop()
             Out._stream.close()
             Out._stream = None
         yield
-        Out._sources.clear()
+        _reset_out()
         Out._playback_finished.set()
         if Out._stream is not None:
             Out._stream.stop()
@@ -420,7 +1255,7 @@ class TestWaitUntilFinished:
         def finish_playback():
             time.sleep(0.1)
             with Out._lock:
-                Out._sources.clear()
+                _reset_out()
                 Out._playback_finished.set()
         
         import threading
@@ -439,7 +1274,7 @@ class TestWaitUntilFinished:
     def test_wait_returns_false_on_timeout(self):
         """Test that wait returns False when timeout occurs."""
         with Out._lock:
-            Out._sources['test'] = [np.zeros((48000, 2), dtype=np.float32)]
+            Out._sources['test'] = _source(np.zeros((48000, 2), dtype=np.float32))
             Out._playback_finished.clear()
         
         result = Out.wait_until_finished(timeout=0.1)
@@ -454,7 +1289,7 @@ class TestWaitUntilFinished:
         def finish_playback():
             time.sleep(0.1)
             with Out._lock:
-                Out._sources.clear()
+                _reset_out()
                 Out._playback_finished.set()
         
         Out._playback_finished.clear()
@@ -484,9 +1319,33 @@ class TestWaitUntilFinished:
         
         assert not Out._playback_finished.is_set()
     
+    @patch('sounddevice.OutputStream')
+    def test_write_after_source_drained_registers_again(self, mock_stream_class):
+        """Test that a source retired by the callback is re-registered on the next write."""
+        mock_stream_class.return_value = MagicMock()
+        audio_data = np.full((256, 2), 0.5, dtype=np.float32).tobytes()
+        outdata = np.zeros((512, 2), dtype=np.float32)
+        
+        for _ in range(2):
+            Out.write(audio_data)
+            Out._callback(outdata, 512, None, None)
+        
+            assert len(Out._active_sources) == 0
+            assert Out._playback_finished.is_set()
+            np.testing.assert_array_almost_equal(outdata[:256], 0.5)
+    
+    def test_wait_ignores_event_while_frames_are_queued(self):
+        """Test that a stale finished event does not end the wait while audio is queued."""
+        Out._sources['test'] = _source(np.zeros((512, 2), dtype=np.float32))
+        Out._playback_finished.set()
+        
+        result = Out.wait_until_finished(timeout=0.1)
+        
+        assert result is False
+    
     def test_event_is_set_when_callback_empties_sources(self):
         """Test that the event is set when callback empties all sources."""
-        Out._sources.clear()
+        _reset_out()
         Out._playback_finished.clear()
         
         outdata = np.zeros((512, 2), dtype=Out._default_format)
@@ -497,13 +1356,13 @@ class TestWaitUntilFinished:
     def test_event_is_set_after_last_source_finishes(self):
         """Test that event is set after the last source finishes in callback."""
         small_chunk = np.ones((256, 2), dtype=np.float32)
-        Out._sources['test'] = [small_chunk]
+        Out._active_sources['test'] = _source(small_chunk)
         Out._playback_finished.clear()
         
         outdata = np.zeros((512, 2), dtype=Out._default_format)
         Out._callback(outdata, 512, None, None)
         
-        assert len(Out._sources) == 0
+        assert len(Out._active_sources) == 0
         assert Out._playback_finished.is_set()
     
     @patch('sounddevice.OutputStream')
@@ -524,94 +1383,144 @@ class TestWaitUntilFinished:
         assert not Out._playback_finished.is_set()
 
 
+def _capture_stream(blocks=4):
+    """Build an InputStream stand-in that feeds its callback random blocks when started."""
+    def create(**kwargs):
+        stream = MagicMock()
+        stream.kwargs = kwargs
+        
+        def start():
+            shape = (kwargs['blocksize'], kwargs['channels'])
+            for _ in range(blocks):
+                block = (np.random.rand(*shape) * 1000).astype(kwargs['dtype'])
+                kwargs['callback'](block, shape[0], None, None)
+        
+        stream.start.side_effect = start
+        return stream
+    return create
+
+
 class TestAudioInput:
     """Test audio input reading from microphone."""
     
-    @patch('sounddevice.rec')
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Stop any capture left running and forget cached devices."""
+        In.stop()
+        Devices.refresh()
+        yield
+        In.stop()
+        Devices.refresh()
+    
+    @patch('sounddevice.InputStream', side_effect=_capture_stream())
     @patch('sounddevice.query_devices')
-    def test_read_default_parameters(self, mock_query_devices, mock_rec):
+    def test_read_default_parameters(self, mock_query_devices, mock_input_stream):
         """Test reading with default parameters."""
         mock_query_devices.return_value = [
             {'name': 'Built-in Microphone', 'max_input_channels': 2},
             {'name': 'Wireless Microphone RX', 'max_input_channels': 2}
         ]
-        expected_audio = np.random.rand(512, 2).astype(np.float32)
-        mock_rec.return_value = expected_audio
         
         result = In.read()
         
-        assert result.shape == (512, 2)
-        assert result.dtype == np.float32
-        mock_rec.assert_called_once()
-        assert mock_rec.call_args.kwargs['frames'] == 512
-        assert mock_rec.call_args.kwargs['samplerate'] == In._default_sample_rate
-        assert mock_rec.call_args.kwargs['channels'] == In._default_channels
-        assert mock_rec.call_args.kwargs['dtype'] == 'float32'
-        assert mock_rec.call_args.kwargs['blocking'] is True
-    
-    @patch('sounddevice.rec')
-    def test_read_custom_frame_length(self, mock_rec):
+        assert result.shape == (In._default_frame_length, In._default_channels)
+        assert result.dtype == np.dtype(In._default_format)
+        mock_input_stream.assert_called_once()
+        assert mock_input_stream.call_args.kwargs['blocksize'] == In._default_frame_length
+        assert mock_input_stream.call_args.kwargs['samplerate'] == In._default_sample_rate
+        assert mock_input_stream.call_args.kwargs['channels'] == In._default_channels
+        assert mock_input_stream.call_args.kwargs['dtype'] == In._default_format
+    
+    @patch('sounddevice.InputStream', side_effect=_capture_stream())
+    def test_read_custom_frame_length(self, mock_input_stream):
         """Test reading with custom frame length."""
-        expected_audio = np.random.rand(1024, 2).astype(np.float32)
-        mock_rec.return_value = expected_audio
-        
         result = In.read(frame_length=1024)
         
-        assert result.shape == (1024, 2)
-        mock_rec.assert_called_once()
-        assert mock_rec.call_args.kwargs['frames'] == 1024
+        assert result.shape[0] == 1024
+        assert mock_input_stream.call_args.kwargs['blocksize'] == 1024
     
-    @patch('sounddevice.rec')
-    def test_read_int16_format(self, mock_rec):
+    @patch('sounddevice.InputStream', side_effect=_capture_stream())
+    def test_read_int16_format(self, mock_input_stream):
         """Test reading with int16 format."""
-        expected_audio = np.random.randint(-32768, 32767, (512, 2), dtype=np.int16)
-        mock_rec.return_value = expected_audio
-        
-        result = In.read(format=In.int16)
+        result = In.read(format='int16')
         
         assert result.dtype == np.int16
-        mock_rec.assert_called_once()
-        assert mock_rec.call_args.kwargs['dtype'] == 'int16'
+        assert mock_input_stream.call_args.kwargs['dtype'] == 'int16'
     
-    @patch('sounddevice.rec')
-    def test_read_mono_channel(self, mock_rec):
-        """Test reading with mono channel."""
-        expected_audio = np.random.rand(512, 1).astype(np.float32)
-        mock_rec.return_value = expected_audio
-        
-        result = In.read(channels=1)
+    @patch('sounddevice.InputStream', side_effect=_capture_stream())
+    def test_read_stereo_channels(self, mock_input_stream):
+        """Test reading with two channels."""
+        result = In.read(frame_length=512, channels=2)
         
-        assert result.shape == (512, 1)
-        mock_rec.assert_called_once()
-        assert mock_rec.call_args.kwargs['channels'] == 1
+        assert result.shape == (512, 2)
+        assert mock_input_stream.call_args.kwargs['channels'] == 2
     
-    @patch('sounddevice.rec')
-    def test_read_custom_sample_rate(self, mock_rec):
+    @patch('sounddevice.InputStream', side_effect=_capture_stream())
+    def test_read_custom_sample_rate(self, mock_input_stream):
         """Test reading with custom sample rate."""
-        expected_audio = np.random.rand(512, 2).astype(np.float32)
-        mock_rec.return_value = expected_audio
-        
-        result = In.read(sample_rate=44100)
+        In.read(sample_rate=44100)
         
-        mock_rec.assert_called_once()
-        assert mock_rec.call_args.kwargs['samplerate'] == 44100
+        assert mock_input_stream.call_args.kwargs['samplerate'] == 44100
     
-    @patch('sounddevice.rec')
+    @patch('sounddevice.InputStream', side_effect=_capture_stream())
     @patch('sounddevice.query_devices')
-    def test_read_with_device_name(self, mock_query_devices, mock_rec):
+    def test_read_with_device_name(self, mock_query_devices, mock_input_stream):
         """Test reading with specific device name."""
         mock_query_devices.return_value = [
             {'name': 'Built-in Microphone', 'max_input_channels': 2},
             {'name': 'DJI_Technology_Co.__Ltd._Wireless_Microphone_RX', 'max_input_channels': 2},
             {'name': 'USB Webcam', 'max_input_channels': 1}
         ]
-        expected_audio = np.random.rand(512, 2).astype(np.float32)
-        mock_rec.return_value = expected_audio
         
-        result = In.read(device='DJI')
+        In.read(device='DJI')
+        
+        assert mock_input_stream.call_args.kwargs['device'] == 1
+    
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=3))
+    def test_read_returns_consecutive_frames(self, mock_input_stream):
+        """Test that successive reads return the captured stream in order without gaps."""
+        In.start(frame_length=256)
+        captured = In._capture.views(0, 3 * 256)[0].copy()
+        
+        first = In.read(frame_length=512)
+        second = In.read(frame_length=256)
+        
+        np.testing.assert_array_equal(np.concatenate([first, second]), captured)
+        assert In.read(frame_length=256, timeout=0.01) is None
+    
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_frames_yields_blocks_captured_after_start(self, mock_input_stream):
+        """Test that the frame iterator pulls blocks the callback delivers later."""
+        In.start(frame_length=128, channels=1)
+        blocks = In.frames(timeout=1.0)
+        
+        feeder = threading.Timer(0.05, In._capture_callback, (np.ones((128, 1), np.float32), 128, None, None))
+        feeder.start()
+        block = next(blocks)
+        feeder.join()
+        
+        np.testing.assert_array_equal(block, 1.0)
+    
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_frames_ends_when_capture_stops(self, mock_input_stream):
+        """Test that a waiting frame iterator finishes when capture is stopped."""
+        In.start(frame_length=128)
+        blocks = In.frames()
+        
+        threading.Timer(0.05, In.stop).start()
+        
+        assert list(blocks) == []
+    
+    @patch('sounddevice.InputStream')
+    def test_read_with_callback_streams_to_callback(self, mock_input_stream):
+        """Test that passing a callback keeps the push-based stream."""
+        callback = Mock()
+        
+        result = In.read(callback)
         
-        mock_rec.assert_called_once()
-        assert mock_rec.call_args.kwargs['device'] == 1
+        assert result is None
+        assert mock_input_stream.call_args.kwargs['callback'] is callback
+        assert In._capture is None
     
     @patch('sounddevice.query_devices')
     def test_get_device_index_found(self, mock_query_devices):
@@ -653,15 +1562,166 @@ class TestAudioInput:
         device_index = In._get_device_index(None)
         
         assert device_index is None
-    
-    @patch('sounddevice.rec')
-    def test_read_returns_ndarray(self, mock_rec):
-        """Test that read returns a numpy NDArray."""
-        expected_audio = np.random.rand(512, 2).astype(np.float32)
-        mock_rec.return_value = expected_audio
-        
-        result = In.read()
-        
-        assert isinstance(result, np.ndarray)
-        assert hasattr(result, 'shape')
-        assert hasattr(result, 'dtype')
+
+
+class TestCaptureSessions:
+    """Test independent capture sessions next to the default one."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Stop the default session and use a fixed device list."""
+        In.stop()
+        with patch('sounddevice.query_devices', return_value=[
+            {'name': 'DJI Mic 2', 'max_input_channels': 2, 'max_output_channels': 0},
+            {'name': 'USB Array', 'max_input_channels': 4, 'max_output_channels': 0},
+        ]):
+            Devices.refresh()
+            yield
+        In.stop()
+        Devices.refresh()
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=2))
+    def test_sessions_capture_side_by_side(self, mock_input_stream):
+        """Test that two sessions run their own streams and buffers with their own layouts."""
+        dji = In(device='DJI', sample_rate=48000, channels=2, frame_length=480)
+        array = In(device='USB Array', sample_rate=16000, channels=4, frame_length=160)
+
+        with dji, array:
+            assert dji.read().shape == (480, 2)
+            assert array.read().shape == (160, 4)
+            assert [s.kwargs['device'] for s in (dji._stream, array._stream)] == [0, 1]
+            assert dji.stats()['capture']['frames_captured'] == 960
+            assert In._stream is None
+
+        assert dji._stream is None and array._stream is None
+        assert mock_input_stream.call_count == 2
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_stop_closes_only_own_stream(self, mock_input_stream):
+        """Test that stopping one session leaves the other capturing."""
+        first, second = In(device='DJI'), In(device='USB Array')
+        first.start()
+        second.start()
+        first_stream, second_stream = first._stream, second._stream
+
+        first.stop()
+
+        first_stream.close.assert_called_once()
+        second_stream.close.assert_not_called()
+        assert second._capture is not None
+        second.stop()
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_second_callback_read_closes_previous_stream(self, mock_input_stream):
+        """Test that replacing a callback stream does not leak the first one."""
+        session = In(device='DJI')
+        session.read(callback=lambda *args: None)
+        first_stream = session._stream
+
+        session.read(callback=lambda *args: None, sample_rate=48000)
+
+        first_stream.stop.assert_called_once()
+        first_stream.close.assert_called_once()
+        assert session._stream is not first_stream
+        assert session._stream.kwargs['samplerate'] == 48000
+        session.stop()
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=4))
+    def test_target_layout_converts_after_capture(self, mock_input_stream):
+        """Test that the device opens natively and reads return the target layout."""
+        with In(device='DJI', sample_rate=48000, channels=2, format='int16', frame_length=480,
+                target_rate=16000, target_channels=1, target_format='float32') as session:
+            block = session.read()
+            frames = session.frames(target_format='int16', timeout=0)
+
+            assert (block.shape, block.dtype) == ((160, 1), np.float32)
+            kwargs = session._stream.kwargs
+            assert (kwargs['samplerate'], kwargs['channels'], kwargs['dtype']) == (48000, 2, 'int16')
+            assert next(frames, None) is None
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=2))
+    def test_target_layout_opens_device_natively(self, mock_input_stream):
+        """Test that with a target layout the device's own rate and channels are used unless given."""
+        with patch('sounddevice.query_devices', return_value=[
+            {'name': 'DJI Mic 2', 'max_input_channels': 2, 'max_output_channels': 0, 'default_samplerate': 48000.0},
+        ]):
+            Devices.refresh()
+            with In(device='DJI', frame_length=480, target_rate=16000, target_channels=1) as session:
+                block = session.read()
+                kwargs = session._stream.kwargs
+            plain = In(device='DJI')
+
+        assert (kwargs['samplerate'], kwargs['channels']) == (48000, 2)
+        assert block.shape == (160, 1)
+        assert (plain._sample_rate, plain._channels) == (In._default_sample_rate, In._default_channels)
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_speech_yields_gated_segments(self, mock_input_stream):
+        """Test that speech() drops silence and flags the open segment."""
+        session = In(device='DJI', sample_rate=16000, frame_length=160)
+        session.start()
+        tone = (0.3 * np.sin(np.arange(160) / 16000 * 2 * np.pi * 300)).astype(np.float32)[:, None]
+
+        def feed():
+            for block in (np.zeros((160, 1), dtype=np.float32), tone, tone):
+                session._capture_callback(block, 160, None, None)
+
+        threading.Timer(0.05, feed).start()
+        segment = next(session.speech(timeout=0.5, hangover=0, pre_roll=0))
+        assert [len(block) for block in segment] == [160, 160]
+        assert not session.speech_active.is_set()
+        session.stop()
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_history_returns_views_indexed_by_capture_clock(self, mock_input_stream):
+        """Test that history reads the capture buffer by duration, frame or time without copying."""
+        session = In(device='DJI', sample_rate=1000, frame_length=100, buffer_seconds=1)
+        assert session.history() == ()
+        session.start()
+        ramp = np.arange(1500, dtype=np.float32).reshape(-1, 1)
+        for block in np.split(ramp, 15):
+            session._capture_callback(block, 100, None, None)
+
+        last = session.history(0.3)
+        wrapped = session.history(start=900)
+        assert session.time(frames=True) == 1500 and session.time() == 1.5
+        assert len(last) == 1 and np.shares_memory(last[0], session._capture._buffer)
+        np.testing.assert_array_equal(last[0][:, 0], ramp[1200:, 0])
+        assert len(wrapped) == 2
+        np.testing.assert_array_equal(session.history(start=1.0, copy=True), ramp[1000:])
+        np.testing.assert_array_equal(session.history(5, copy=True), ramp[500:])
+        with pytest.raises(IndexError):
+            session.history(start=100)
+        session.stop()
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_buffered_read_closes_previous_callback_stream(self, mock_input_stream):
+        """Test that starting capture after a callback read does not leak the callback stream."""
+        session = In(device='DJI')
+        session.read(callback=lambda *args: None)
+        callback_stream = session._stream
+
+        assert session.read(timeout=0) is None
+        frames = session.frames(timeout=0)
+        assert next(frames, None) is None
+
+        callback_stream.stop.assert_called_once()
+        callback_stream.close.assert_called_once()
+        capture_stream = session._stream
+        assert capture_stream is not callback_stream
+        assert mock_input_stream.call_count == 2
+        session.stop()
+        capture_stream.close.assert_called_once()
+
+    @patch('sounddevice.InputStream', side_effect=_capture_stream(blocks=0))
+    def test_overrides_last_until_stop(self, mock_input_stream):
+        """Test that per-call settings do not change the session's configuration."""
+        session = In(sample_rate=22050)
+        session.start(sample_rate=8000)
+        assert session._stream.kwargs['samplerate'] == 8000
+        session.stop()
+
+        session.start()
+
+        assert session._stream.kwargs['samplerate'] == 22050
+        session.stop()
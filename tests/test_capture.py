@@ -0,0 +1,139 @@
+import numpy as np
+
+from audio.capture import CaptureBuffer, ConvertingReader
+from audio.conversion import StreamConverter
+
+
+def _blocks(count, frames=4, channels=1):
+    """Build consecutive ramp blocks so every frame holds its absolute index."""
+    ramp = np.arange(count * frames * channels, dtype=np.float32).reshape(-1, channels)
+    return np.split(ramp, count)
+
+
+class TestCaptureBuffer:
+    """Test the overwriting capture ring filled by the input callback."""
+
+    def test_views_wrap_into_two_segments(self):
+        """Test that a range spanning the wrap point comes back as two views."""
+        buffer = CaptureBuffer(8, 1)
+        for block in _blocks(3):
+            buffer.write(block)
+
+        views = buffer.views(6, 12)
+
+        assert len(views) == 2
+        np.testing.assert_array_equal(np.concatenate(views)[:, 0], np.arange(6, 12))
+
+    def test_write_overwrites_oldest_frames(self):
+        """Test that the buffer keeps only the newest capacity frames."""
+        buffer = CaptureBuffer(8, 1)
+        buffer.write(np.arange(20, dtype=np.float32).reshape(-1, 1))
+
+        assert buffer.frames_written == 20
+        assert buffer.oldest_frame == 12
+        np.testing.assert_array_equal(np.concatenate(buffer.views(12, 20))[:, 0], np.arange(12, 20))
+
+    def test_wait_returns_false_when_closed(self):
+        """Test that closing the buffer releases waiting readers."""
+        buffer = CaptureBuffer(8, 1)
+        buffer.close()
+
+        assert buffer.wait(1) is False
+
+
+class TestCaptureReader:
+    """Test independent consumers of the capture ring."""
+
+    def test_readers_keep_independent_positions(self):
+        """Test that two readers each see the full stream."""
+        buffer = CaptureBuffer(16, 2)
+        first, second = buffer.reader(), buffer.reader()
+        for block in _blocks(2, channels=2):
+            buffer.write(block)
+
+        np.testing.assert_array_equal(first.read(8), np.concatenate(_blocks(2, channels=2)))
+        np.testing.assert_array_equal(second.read(4), _blocks(2, channels=2)[0])
+        assert second.available == 4
+
+    def test_read_without_copy_returns_view_or_scratch(self):
+        """Test that copy=False avoids allocating for contiguous and wrapped ranges."""
+        buffer = CaptureBuffer(8, 1)
+        reader = buffer.reader()
+        for block in _blocks(2):
+            buffer.write(block)
+
+        view = reader.read(6, copy=False)
+        assert np.shares_memory(view, buffer._buffer)
+
+        for block in _blocks(3)[2:]:
+            buffer.write(block)
+        wrapped = reader.read(4, copy=False)
+        assert wrapped is reader._scratch
+        np.testing.assert_array_equal(wrapped[:, 0], np.arange(6, 10))
+
+    def test_reader_that_falls_behind_counts_overflow(self):
+        """Test that overwritten frames are skipped and counted."""
+        buffer = CaptureBuffer(8, 1)
+        reader = buffer.reader()
+        for block in _blocks(5):
+            buffer.write(block)
+
+        block = reader.read(2)
+
+        assert reader.overflows == 1
+        assert reader.dropped_frames == 16
+        np.testing.assert_array_equal(block[:, 0], [16, 17])
+
+    def test_overwrite_during_read_counts_overflow(self):
+        """Test that frames overwritten between the checks and the copy are counted, not raised."""
+        buffer = CaptureBuffer(16, 1)
+        reader = buffer.reader(start=0)
+        for block in _blocks(3):
+            buffer.write(block)
+        views = buffer.views
+        
+        def overwrite_first(start, stop):
+            buffer.views = views
+            buffer.write(np.arange(12, 20, dtype=np.float32).reshape(-1, 1))
+            return views(start, stop)
+        buffer.views = overwrite_first
+
+        block = reader.read(4)
+
+        assert reader.overflows == 1
+        assert reader.dropped_frames == 12
+        np.testing.assert_array_equal(block[:, 0], [12, 13, 14, 15])
+
+    def test_read_times_out_without_data(self):
+        """Test that a read returns None when no frames arrive in time."""
+        reader = CaptureBuffer(8, 1).reader()
+
+        assert reader.read(4, timeout=0.01) is None
+
+
+class TestConvertingReader:
+    """Test consumers that read the capture in another layout."""
+
+    def test_blocks_have_fixed_size_across_capture_blocks(self):
+        """Test that converted reads return exactly the requested frames."""
+        buffer = CaptureBuffer(4096, 2)
+        reader = ConvertingReader(buffer.reader(), StreamConverter(np.float32, 2, 48000, 1, 16000))
+        for _ in range(6):
+            buffer.write(np.full((441, 2), 0.5, dtype=np.float32))
+
+        blocks = [reader.read(160, timeout=0) for _ in range(5)]
+
+        assert [block.shape for block in blocks] == [(160, 1)] * 5
+        assert reader.read(160, timeout=0) is None
+        assert reader.available == 6 * 441 - 5 * 480
+
+    def test_frames_converted_before_timeout_are_kept(self):
+        """Test that a read that times out does not lose the frames it converted."""
+        buffer = CaptureBuffer(64, 1)
+        reader = ConvertingReader(buffer.reader(), StreamConverter(np.float32, 1, 8000, 2, 8000))
+        buffer.write(np.arange(6, dtype=np.float32).reshape(-1, 1))
+
+        assert reader.read(8, timeout=0.01) is None
+        buffer.write(np.arange(6, 10, dtype=np.float32).reshape(-1, 1))
+
+        np.testing.assert_array_equal(reader.read(8, timeout=0)[:, 1], np.arange(8))
@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from audio import config
+from audio.config import Setting
+
+
+class TestSetting:
+    """Test lazily resolved configuration attributes."""
+
+    def test_setting_is_parsed_on_first_access_and_cached(self, monkeypatch):
+        """Test that the variable is read once and the value replaces the descriptor."""
+        monkeypatch.setenv('AUDIO_TEST_RATE', '48000')
+
+        class Config:
+            rate = Setting('AUDIO_TEST_RATE', '44100', int)
+
+        assert Config.rate == 48000
+        monkeypatch.setenv('AUDIO_TEST_RATE', '8000')
+        assert Config.rate == 48000
+        assert Config.__dict__['rate'] == 48000
+
+    def test_setting_falls_back_to_default(self, monkeypatch):
+        """Test that unset variables use the default."""
+        monkeypatch.delenv('AUDIO_TEST_CHANNELS', raising=False)
+
+        class Config:
+            channels = Setting('AUDIO_TEST_CHANNELS', '2', int)
+
+        assert Config.channels == 2
+
+    def test_env_file_is_loaded_once(self, monkeypatch):
+        """Test that .env is only parsed on the first lookup."""
+        monkeypatch.setattr(config, '_env_loaded', False)
+
+        with patch('dotenv.load_dotenv') as mock_load_dotenv:
+            config.env('AUDIO_TEST_UNSET')
+            config.env('AUDIO_TEST_UNSET')
+
+        mock_load_dotenv.assert_called_once_with(config.env_path)
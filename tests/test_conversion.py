@@ -0,0 +1,177 @@
+import numpy as np
+import pytest
+
+from unittest.mock import patch
+
+from audio import conversion
+from audio.conversion import (INT24, StreamConverter, channel_matrix, conversion_plan, conversion_plan_info,
+                              normalize_pcm)
+from audio.resampler import StreamingResampler, polyphase_filter
+
+
+class TestConversionPlan:
+    """Test the memoized conversion plan cache."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        conversion._cached_plan.cache_clear()
+        yield
+        conversion._cached_plan.cache_clear()
+
+    def test_repeated_lookup_hits_cache(self):
+        """Test that the same layout returns the same plan and counts a hit."""
+        first = conversion_plan(np.int16, 1, 22050, 2, 44100)
+        second = conversion_plan('int16', 1, 22050, 2, 44100)
+
+        assert first is second
+        info = conversion_plan_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_plan_holds_factors_taps_and_channel_matrix(self):
+        """Test that a resampling plan carries precomputed factors, taps and mapping."""
+        plan = conversion_plan(np.int16, 1, 24000, 2, 44100)
+
+        assert (plan.up, plan.down) == (147, 80)
+        assert plan.phases is polyphase_filter(147, 80)[0]
+        assert plan.channel_matrix.shape == (1, 2)
+        assert plan.resamples
+
+    def test_resampler_from_plan_uses_its_filter(self):
+        """Test that resamplers built from a plan share its taps instead of designing their own."""
+        plan = conversion_plan(np.int16, 1, 24000, 2, 44100)
+
+        with patch('audio.resampler.polyphase_filter', side_effect=AssertionError("filter designed")):
+            resampler = StreamingResampler.from_plan(plan)
+
+        assert resampler._phases is plan.phases
+        assert resampler._history.shape[1] == 2
+
+    def test_same_rate_plan_has_no_filter(self):
+        """Test that plans without a rate change skip filter design."""
+        plan = conversion_plan(np.float32, 2, 44100, 2, 44100)
+
+        assert plan.phases is None
+        assert plan.channel_matrix is None
+        assert not plan.resamples
+
+    def test_least_recently_used_plan_is_evicted(self):
+        """Test that the cache stays bounded and evicts the oldest entry."""
+        first = conversion_plan(np.int16, 1, 8000, 2, 44100)
+        for rate in range(8001, 8001 + conversion.PLAN_CACHE_SIZE):
+            conversion_plan(np.int16, 1, rate, 2, rate)
+
+        assert conversion_plan_info().currsize == conversion.PLAN_CACHE_SIZE
+        assert conversion_plan(np.int16, 1, 8000, 2, 44100) is not first
+
+
+class TestChannelMatrix:
+    """Test channel mapping matrices."""
+
+    def test_mono_to_stereo_duplicates(self):
+        """Test that mono is copied to both stereo channels."""
+        np.testing.assert_array_equal(channel_matrix(1, 2), [[1.0, 1.0]])
+
+    def test_stereo_to_mono_averages(self):
+        """Test that stereo is averaged down to mono."""
+        np.testing.assert_array_equal(channel_matrix(2, 1), [[0.5], [0.5]])
+
+    def test_other_layouts_keep_leading_channels(self):
+        """Test that wider or narrower layouts keep the first channels and pad with silence."""
+        audio = np.array([[1.0, 2.0, 3.0]], dtype=np.float32)
+
+        np.testing.assert_array_equal(audio @ channel_matrix(3, 2), [[1.0, 2.0]])
+        np.testing.assert_array_equal(audio @ channel_matrix(3, 4), [[1.0, 2.0, 3.0, 0.0]])
+
+    def test_matrices_are_read_only(self):
+        """Test that shared cached matrices cannot be modified in place."""
+        with pytest.raises(ValueError):
+            channel_matrix(1, 2)[0, 0] = 2.0
+
+
+class TestNormalizePcm:
+    """Test PCM sample decoding into float32."""
+
+    def test_int16_scales_to_unit_range(self):
+        """Test that int16 full scale maps to [-1.0, 1.0)."""
+        data = np.array([0, 16384, -16384, 32767, -32768], dtype=np.int16).tobytes()
+
+        result = normalize_pcm(data, np.int16)
+
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [0.0, 0.5, -0.5, 32767 / 32768, -1.0])
+
+    def test_uint8_is_offset_binary(self):
+        """Test that 8-bit unsigned PCM is centered on 128."""
+        data = np.array([128, 0, 255, 192], dtype=np.uint8).tobytes()
+
+        result = normalize_pcm(data, np.uint8)
+
+        np.testing.assert_allclose(result, [0.0, -1.0, 127 / 128, 0.5])
+
+    def test_int32_scales_to_unit_range(self):
+        """Test that int32 samples are scaled by 2**-31."""
+        data = np.array([0, 2 ** 30, -2 ** 31], dtype=np.int32).tobytes()
+
+        result = normalize_pcm(data, np.int32)
+
+        np.testing.assert_allclose(result, [0.0, 0.5, -1.0])
+
+    def test_packed_int24_matches_unpacked_values(self):
+        """Test that packed little-endian 24-bit samples decode across block boundaries."""
+        values = np.random.default_rng(0).integers(-2 ** 23, 2 ** 23, conversion._INT24_BLOCK + 5)
+        data = b''.join(int(value).to_bytes(3, 'little', signed=True) for value in values)
+
+        result = normalize_pcm(data, 'int24')
+
+        np.testing.assert_allclose(result, values / 2 ** 23, atol=1e-7)
+
+    def test_float32_without_output_is_a_view(self):
+        """Test that float32 input is not copied when no output buffer is given."""
+        data = np.array([0.25, -0.5], dtype=np.float32).tobytes()
+
+        result = normalize_pcm(data, np.float32)
+
+        assert not result.flags.writeable
+        np.testing.assert_array_equal(result, [0.25, -0.5])
+
+    def test_float64_is_written_into_given_output(self):
+        """Test that float64 input is narrowed straight into the output buffer."""
+        data = np.array([0.25, -0.5], dtype=np.float64).tobytes()
+        out = np.zeros(2, dtype=np.float32)
+
+        result = normalize_pcm(data, np.float64, out)
+
+        assert result is out
+        np.testing.assert_array_equal(out, [0.25, -0.5])
+
+    def test_int24_format_name_is_recognized_by_plans(self):
+        """Test that the int24 format can be used for conversion plans."""
+        plan = conversion_plan('int24', 1, 48000, 2, 48000)
+
+        assert plan.format == INT24
+
+
+class TestStreamConverter:
+    """Test block-by-block conversion of a captured stream."""
+
+    def test_blocks_join_like_one_conversion(self):
+        """Test that converting in blocks matches converting the whole stream at once."""
+        stereo = (np.random.rand(4800, 2) * 20000 - 10000).astype(np.int16)
+        whole = StreamingResampler(48000, 16000, 1).process(stereo.astype(np.float32).mean(axis=1, keepdims=True)
+                                                            / 32768)
+        converter = StreamConverter(np.int16, 2, 48000, 1, 16000)
+
+        blocks = np.concatenate([converter.process(block) for block in np.split(stereo, [700, 1536, 3000])])
+
+        assert blocks.dtype == np.float32
+        np.testing.assert_allclose(blocks, whole, atol=1e-6)
+
+    def test_integer_output_is_clipped_to_full_scale(self):
+        """Test that float input beyond full scale saturates int16 output."""
+        converter = StreamConverter(np.float32, 1, 16000, 1, 16000, np.int16)
+
+        result = converter.process(np.array([[0.5], [1.5], [-2.0]], dtype=np.float32))
+
+        assert result.dtype == np.int16
+        np.testing.assert_array_equal(result[:, 0], [16383, 32767, -32767])
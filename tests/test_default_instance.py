@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+from audio.default_instance import DefaultInstance, default_method
+
+
+class Counter(metaclass=DefaultInstance):
+    created = 0
+    _default_instance = None
+
+    def __init__(self, step: int = 1):
+        type(self).created += 1
+        self.step = step
+        self.total = 0
+
+    @default_method
+    def add(self) -> int:
+        self.total += self.step
+        return self.total
+
+
+class TestDefaultInstance:
+    """Test class-level access to a lazily created default instance."""
+
+    def setup_method(self):
+        Counter._default_instance = None
+        Counter.created = 0
+
+    def test_default_created_on_first_use_only(self):
+        """Test that the default instance is created lazily, once."""
+        assert Counter.created == 0
+
+        Counter.add()
+        Counter.add()
+
+        assert Counter.created == 1
+        assert Counter.total == 2
+
+    def test_instances_are_independent_of_default(self):
+        """Test that explicit instances keep their own state."""
+        counter = Counter(step=10)
+
+        assert counter.add() == 10
+        assert Counter.add() == 1
+        assert counter.total == 10
+
+    def test_class_attributes_stay_on_class(self):
+        """Test that attributes defined by the class are not forwarded."""
+        Counter.created = 5
+
+        assert Counter.__dict__['created'] == 5
+        assert Counter._default_instance is None
+
+    def test_patching_instance_state_is_restored(self):
+        """Test that mock.patch on the class patches and restores the default instance."""
+        Counter.add()
+
+        with patch.object(Counter, 'total', 100):
+            assert Counter.default().total == 100
+
+        assert Counter.default().total == 1
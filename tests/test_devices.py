@@ -0,0 +1,89 @@
+import pytest
+
+from unittest.mock import MagicMock, patch
+from audio.devices import Devices
+
+DEVICES = [
+    {'name': 'Built-in Microphone', 'max_input_channels': 2, 'max_output_channels': 0},
+    {'name': 'DJI Wireless Microphone RX', 'max_input_channels': 2, 'max_output_channels': 0},
+    {'name': 'DJI Speaker', 'max_input_channels': 0, 'max_output_channels': 2},
+]
+
+
+class TestDevices:
+    """Test the cached device registry."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Start every test with an empty cache."""
+        Devices.refresh()
+        with patch('sounddevice.query_devices', return_value=DEVICES) as mock_query_devices:
+            self.mock_query_devices = mock_query_devices
+            yield
+        Devices.refresh()
+
+    def test_find_matches_partial_name_per_direction(self):
+        """Test that lookups are case-insensitive and skip devices without channels in that direction."""
+        assert Devices.find('dji', 'input') == 1
+        assert Devices.find('dji', 'output') == 2
+        assert Devices.find('Nothing') is None
+        assert Devices.find(None) is None
+
+    def test_device_list_is_queried_once(self):
+        """Test that repeated lookups reuse the cached enumeration."""
+        for _ in range(3):
+            Devices.find('DJI')
+            Devices.find('Built-in')
+
+        self.mock_query_devices.assert_called_once()
+
+    def test_refresh_requeries_devices(self):
+        """Test that refresh drops the cache so hotplugged devices are found."""
+        assert Devices.find('USB Webcam') is None
+
+        self.mock_query_devices.return_value = DEVICES + [
+            {'name': 'USB Webcam', 'max_input_channels': 1, 'max_output_channels': 0}
+        ]
+        Devices.refresh()
+
+        assert Devices.find('USB Webcam') == 3
+
+    def test_refresh_reinitializes_portaudio_without_open_streams(self, portaudio_restart):
+        """Test that a reload restarts PortAudio, whose device list is fixed at startup."""
+        terminate, initialize = portaudio_restart
+        Devices.list()
+        terminate.reset_mock()
+        initialize.reset_mock()
+        Devices.refresh()
+
+        Devices.list()
+
+        terminate.assert_called_once()
+        initialize.assert_called_once()
+        assert self.mock_query_devices.call_count == 2
+
+    def test_refresh_keeps_portaudio_while_a_stream_is_open(self, portaudio_restart):
+        """Test that PortAudio is not restarted under an open stream."""
+        terminate, _ = portaudio_restart
+        stream = Devices.track(MagicMock(closed=False))
+        Devices.list()
+        terminate.reset_mock()
+        Devices.refresh()
+
+        Devices.list()
+        terminate.assert_not_called()
+
+        stream.closed = True
+        Devices.refresh()
+        Devices.list()
+        terminate.assert_called_once()
+
+    def test_refresh_interval_expires_cache(self):
+        """Test that the list is re-queried once the refresh interval has passed."""
+        with patch.object(Devices, '_refresh_seconds', 10.0), \
+                patch('audio.devices._time.monotonic', side_effect=[100.0, 105.0, 111.0]):
+            Devices.list()
+            Devices.list()
+            Devices.list()
+
+        assert self.mock_query_devices.call_count == 2
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+import sounddevice as sd
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from audio.duplex import Duplex
+
+
+DEVICES = [
+    {'name': 'USB Headset', 'max_input_channels': 1, 'max_output_channels': 2},
+]
+
+
+def _run(duplex, blocks, round_trip=0.0, rate=16000):
+    """Drive the duplex callback as PortAudio would, one block per input array."""
+    callback = duplex._stream.kwargs['callback']
+    for index, block in enumerate(blocks):
+        outdata = np.zeros((len(block), duplex.output._channels), dtype=np.float32)
+        now = index * len(block) / rate
+        time = SimpleNamespace(inputBufferAdcTime=now, outputBufferDacTime=now + round_trip, currentTime=now)
+        callback(block, outdata, len(block), time, None)
+
+
+def _stream(**kwargs):
+    stream = MagicMock()
+    stream.kwargs = kwargs
+    return stream
+
+
+@pytest.fixture
+def duplex():
+    with patch('sounddevice.Stream', side_effect=_stream), \
+         patch('sounddevice.query_devices', return_value=DEVICES):
+        duplex = Duplex(input_device='USB', output_device='USB', sample_rate=16000,
+                        input_channels=1, output_channels=2, frame_length=160)
+        duplex.start()
+        yield duplex
+        duplex.stop()
+
+
+class TestDuplex:
+    """Test capture and playback sharing one stream."""
+
+    def test_opens_one_stream_for_both_directions(self, duplex):
+        """Test that a single sd.Stream is opened with per-direction settings."""
+        kwargs = duplex._stream.kwargs
+        assert kwargs['samplerate'] == 16000
+        assert kwargs['blocksize'] == 160
+        assert kwargs['channels'] == (1, 2)
+        assert kwargs['device'] == (0, 0)
+        assert duplex.input._stream is duplex.output._stream is duplex._stream
+        duplex._stream.start.assert_called_once()
+
+    def test_write_does_not_open_an_output_stream(self, duplex):
+        """Test that writing to the duplex output plays through the shared stream."""
+        with patch('sounddevice.OutputStream') as output_stream:
+            duplex.output.write(np.full((160, 2), 0.5, dtype=np.float32))
+        output_stream.assert_not_called()
+
+    def test_callback_captures_and_plays(self, duplex):
+        """Test that one callback fills the capture buffer and mixes the output."""
+        duplex.output.write(np.full((320, 2), 0.25, dtype=np.float32))
+        blocks = [np.full((160, 1), value, dtype=np.float32) for value in (0.1, 0.2)]
+
+        _run(duplex, blocks)
+
+        np.testing.assert_array_equal(duplex.input.read(frame_length=320), np.concatenate(blocks))
+        np.testing.assert_array_equal(duplex.reference(0, 320), np.full((320, 2), 0.25))
+
+    def test_reference_is_aligned_by_round_trip(self, duplex):
+        """Test that the reference is shifted by the measured ADC to DAC latency."""
+        duplex.output.write(np.repeat(np.arange(480, dtype=np.float32)[:, None] / 1000, 2, axis=1))
+
+        _run(duplex, [np.zeros((160, 1), dtype=np.float32)] * 3, round_trip=0.005)
+
+        assert duplex.round_trip_frames == 80
+        reference = duplex.reference(100, 160)
+        np.testing.assert_array_equal(reference[:, 0], np.arange(20, 180, dtype=np.float32) / 1000)
+
+    def test_reference_before_playback_is_silence(self, duplex):
+        """Test that input captured before the first output frame has a zero reference."""
+        duplex.output.write(np.ones((160, 2), dtype=np.float32))
+
+        _run(duplex, [np.zeros((160, 1), dtype=np.float32)], round_trip=0.005)
+
+        reference = duplex.reference(0, 160)
+        assert not reference[:80].any()
+        assert reference[80:].all()
+
+    def test_reference_not_played_yet_raises(self, duplex):
+        """Test that asking for output beyond what was played raises IndexError."""
+        _run(duplex, [np.zeros((160, 1), dtype=np.float32)])
+
+        with pytest.raises(IndexError):
+            duplex.reference(100, 160)
+
+    def test_status_flags_go_to_their_direction(self, duplex, caplog):
+        """Test that input and output xruns are logged and counted once, by their own side."""
+        outdata = np.zeros((160, 2), dtype=np.float32)
+        status = sd.CallbackFlags(0x2 | 0x4)  # input overflow and output underflow
+
+        duplex._callback(np.zeros((160, 1), dtype=np.float32), outdata, 160, None, status)
+
+        input_stats = duplex.input.stats()['callback']
+        output_stats = duplex.output.stats()['callback']
+        assert (input_stats['input_overflows'], input_stats['output_underflows']) == (1, 0)
+        assert (output_stats['input_overflows'], output_stats['output_underflows']) == (0, 1)
+        messages = [record.getMessage() for record in caplog.records]
+        assert len([m for m in messages if m.startswith('Audio input status')]) == 1
+        assert len([m for m in messages if m.startswith('Audio callback status')]) == 1
+
+    def test_stop_closes_stream_and_capture(self, duplex):
+        """Test that stop closes the shared stream and ends readers of the input."""
+        stream = duplex._stream
+
+        duplex.stop()
+
+        stream.stop.assert_called_once()
+        stream.close.assert_called_once()
+        assert duplex.input._stream is None and duplex.output._stream is None
+        assert duplex.input._capture is None
@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+
+IMPORT_BUDGET_SECONDS = 0.5
+
+_PROBE = """
+import json, sys, time
+import numpy, sounddevice
+start = time.perf_counter()
+import audio
+elapsed = time.perf_counter() - start
+from audio.config import Setting
+print(json.dumps({
+    'seconds': elapsed,
+    'modules': [name for name in ('scipy', 'dotenv', 'asyncio') if name in sys.modules],
+    'lazy_config': isinstance(audio.Out.__dict__['_default_rate'], Setting),
+}))
+"""
+
+
+class TestImportTime:
+    """Test that importing the package stays cheap."""
+
+    def test_import_stays_within_budget_and_defers_heavy_modules(self):
+        """Test that import audio loads no SciPy, dotenv or asyncio and reads no config."""
+        result = subprocess.run([sys.executable, '-c', _PROBE], capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout)
+
+        assert probe['modules'] == []
+        assert probe['lazy_config']
+        assert probe['seconds'] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,103 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from audio.mixer import Mixer
+from audio.out_audio import Out
+from audio.source import Source
+
+
+class TestMixer:
+    """Test the allocation-free output stage."""
+
+    def test_float32_output_is_mixed_in_place(self):
+        """Test that float32 streams are accumulated straight into the device buffer."""
+        outdata = np.ones((256, 2), dtype=np.float32)
+
+        mixed = Mixer().accumulator(outdata)
+
+        assert mixed is outdata
+        assert not outdata.any()
+
+    def test_int16_output_reuses_scratch_buffer(self):
+        """Test that integer streams mix into one persistent scratch buffer."""
+        mixer = Mixer()
+        outdata = np.zeros((256, 2), dtype=np.int16)
+
+        first = mixer.accumulator(outdata)
+        second = mixer.accumulator(outdata[:128])
+
+        assert second.base is first.base or second.base is first
+        assert second.shape == (128, 2)
+
+    def test_write_clips_and_converts_into_outdata(self):
+        """Test that the mix is hard-clipped and scaled into the integer buffer."""
+        mixer = Mixer()
+        outdata = np.zeros((3, 1), dtype=np.int16)
+        mixed = mixer.accumulator(outdata)
+        mixed[:, 0] = [0.5, 2.0, -2.0]
+
+        mixer.write(mixed, outdata)
+
+        np.testing.assert_array_equal(outdata[:, 0], [16383, 32767, -32767])
+
+    def test_soft_limiter_leaves_signal_below_threshold_untouched(self):
+        """Test that samples under the threshold pass unchanged."""
+        outdata = np.array([[0.1], [-0.5], [0.79]], dtype=np.float32)
+        expected = outdata.copy()
+
+        Mixer().write(outdata, outdata, limit=0.8)
+
+        np.testing.assert_array_equal(outdata, expected)
+
+    def test_soft_limiter_compresses_peaks_below_full_scale(self):
+        """Test that overs are smoothly compressed, keep their sign and order, and stay in range."""
+        levels = np.array([0.8, 0.9, 1.2, 2.0, 8.0], dtype=np.float32)
+        outdata = np.concatenate([levels, -levels]).reshape(-1, 1)
+
+        Mixer().write(outdata, outdata, limit=0.8)
+
+        limited = outdata[:5, 0]
+        assert limited[0] == pytest.approx(0.8)
+        assert np.all(np.diff(limited[:4]) > 0)
+        assert np.all(limited[:4] < 1.0)
+        assert limited[4] <= 1.0
+        np.testing.assert_array_equal(outdata[5:, 0], -limited)
+
+
+class TestMixingAllocations:
+    """Test that the callback does not allocate audio buffers."""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Reset the mixer state."""
+        Out._active_sources.clear()
+        Out._pending_sources.clear()
+        yield
+        Out._active_sources.clear()
+        Out._pending_sources.clear()
+
+    @pytest.mark.parametrize('format', [np.float32, np.int16])
+    def test_callback_allocates_no_block_buffers(self, format):
+        """Test that mixing many sources never allocates anything the size of a block.
+
+        The only allocations left are the Python ints of the frame counters.
+        """
+        frames = 512
+        for index in range(32):
+            source = Source(f"alloc-{index}", 2)
+            source.enqueue(np.full((frames * 64, 2), 0.05, dtype=np.float32))
+            Out._pending_sources.append(source)
+        outdata = np.zeros((frames, 2), dtype=format)
+        Out._callback(outdata, frames, None, None)
+
+        tracemalloc.start()
+        try:
+            for _ in range(32):
+                Out._callback(outdata, frames, None, None)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < frames * 2 * np.dtype(np.float32).itemsize
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from audio.resampler import StreamingResampler
+
+
+RATE_PAIRS = [(48000, 44100), (44100, 48000), (22050, 44100), (24000, 44100), (16000, 48000)]
+
+
+class TestStreamingResampler:
+    """Test the stateful polyphase resampler."""
+
+    @pytest.mark.parametrize("input_rate, output_rate", RATE_PAIRS)
+    def test_delay_compensated_output_matches_resample_poly(self, input_rate, output_rate):
+        """Test that a flushed, delay-compensated run reproduces scipy's resample_poly."""
+        audio = np.random.default_rng(0).standard_normal((3000, 2)).astype(np.float32)
+        resampler = StreamingResampler(input_rate, output_rate, 2, delay_compensated=True)
+
+        result = np.concatenate([resampler.process(audio), resampler.flush()])
+
+        expected = signal.resample_poly(audio, resampler.up, resampler.down, axis=0)
+        np.testing.assert_allclose(result[:len(expected)], expected, atol=1e-5)
+
+    @pytest.mark.parametrize("input_rate, output_rate", RATE_PAIRS)
+    def test_chunked_processing_matches_single_call(self, input_rate, output_rate):
+        """Test that splitting the input into chunks does not change the output."""
+        audio = np.random.default_rng(1).standard_normal((5000, 2)).astype(np.float32)
+        whole = StreamingResampler(input_rate, output_rate, 2).process(audio)
+
+        resampler = StreamingResampler(input_rate, output_rate, 2)
+        chunked = np.concatenate([resampler.process(audio[start:start + 333]) for start in range(0, 5000, 333)])
+
+        np.testing.assert_array_equal(chunked, whole)
+
+    def test_output_length_tracks_rate_ratio_across_chunks(self):
+        """Test that the total output length follows the rate ratio without drift."""
+        resampler = StreamingResampler(44100, 48000, 1)
+
+        total = sum(len(resampler.process(np.zeros((441, 1), dtype=np.float32))) for _ in range(100))
+
+        assert total == 48000
+
+    def test_long_input_is_processed_in_bounded_blocks(self):
+        """Test that inputs longer than one block produce the same result as short chunks."""
+        audio = np.random.default_rng(2).standard_normal((StreamingResampler._block_frames * 3 + 17, 1))
+        audio = audio.astype(np.float32)
+        whole = StreamingResampler(48000, 16000, 1).process(audio)
+
+        resampler = StreamingResampler(48000, 16000, 1)
+        chunked = np.concatenate([resampler.process(audio[start:start + 1000]) for start in range(0, len(audio), 1000)])
+
+        np.testing.assert_array_equal(whole, chunked)
+        assert whole.dtype == np.float32
+
+    def test_empty_chunk_returns_empty_output(self):
+        """Test that an empty chunk yields no frames and keeps the channel count."""
+        resampler = StreamingResampler(48000, 44100, 2)
+
+        result = resampler.process(np.zeros((0, 2), dtype=np.float32))
+
+        assert result.shape == (0, 2)
@@ -0,0 +1,97 @@
+import numpy as np
+
+from audio.ring_buffer import ArraySegment, RingBuffer
+
+
+class TestRingBuffer:
+    """Test the growable circular frame buffer."""
+
+    def test_write_then_read_returns_same_frames(self):
+        """Test that frames come out in the order they were written."""
+        buffer = RingBuffer(2)
+        data = np.arange(20, dtype=np.float32).reshape(10, 2)
+
+        buffer.write(data)
+        out = np.zeros((10, 2), dtype=np.float32)
+        copied = buffer.read_into(out)
+
+        assert copied == 10
+        assert len(buffer) == 0
+        np.testing.assert_array_equal(out, data)
+
+    def test_read_wraps_around_end_of_buffer(self):
+        """Test that reads spanning the wrap point are contiguous in output."""
+        buffer = RingBuffer(1)
+        buffer.write(np.zeros((buffer.capacity - 4, 1), dtype=np.float32))
+        buffer.skip(buffer.capacity - 4)
+        data = np.arange(8, dtype=np.float32).reshape(8, 1)
+
+        buffer.write(data)
+        out = np.zeros((8, 1), dtype=np.float32)
+        buffer.read_into(out)
+
+        np.testing.assert_array_equal(out, data)
+
+    def test_write_grows_capacity_and_keeps_order(self):
+        """Test that writing beyond capacity grows the buffer without losing data."""
+        buffer = RingBuffer(1)
+        initial_capacity = buffer.capacity
+        buffer.write(np.zeros((initial_capacity - 10, 1), dtype=np.float32))
+        buffer.skip(initial_capacity - 20)
+        data = np.arange(initial_capacity, dtype=np.float32).reshape(-1, 1)
+
+        buffer.write(data)
+
+        assert buffer.capacity > initial_capacity
+        assert len(buffer) == initial_capacity + 10
+        out = np.zeros((len(buffer), 1), dtype=np.float32)
+        buffer.read_into(out)
+        np.testing.assert_array_equal(out[10:], data)
+
+    def test_add_into_accumulates_onto_output(self):
+        """Test that add_into mixes frames onto existing output."""
+        buffer = RingBuffer(2)
+        buffer.write(np.full((4, 2), 0.25, dtype=np.float32))
+        out = np.full((6, 2), 0.5, dtype=np.float32)
+
+        mixed = buffer.add_into(out)
+
+        assert mixed == 4
+        np.testing.assert_array_equal(out[:4], 0.75)
+        np.testing.assert_array_equal(out[4:], 0.5)
+
+    def test_skip_and_clear_discard_frames(self):
+        """Test that skip drops a bounded number of frames and clear drops all."""
+        buffer = RingBuffer(1)
+        buffer.write(np.zeros((10, 1), dtype=np.float32))
+
+        assert buffer.skip(4) == 4
+        assert len(buffer) == 6
+        assert buffer.skip(100) == 6
+
+        buffer.write(np.zeros((3, 1), dtype=np.float32))
+        buffer.clear()
+        assert len(buffer) == 0
+
+
+class TestArraySegment:
+    """Test the zero-copy queue segment."""
+
+    def test_add_into_reads_array_in_place_and_releases_it(self):
+        """Test that frames are mixed from the array and the reference is dropped when drained."""
+        frames = np.full((6, 2), 0.5, dtype=np.float32)
+        segment = ArraySegment(frames)
+        out = np.zeros((4, 2), dtype=np.float32)
+
+        assert segment.add_into(out) == 4
+        assert len(segment) == 2
+        assert segment.add_into(out) == 2
+        assert len(segment) == 0
+        assert segment._frames is None
+        np.testing.assert_array_equal(out[:2], 1.0)
+
+    def test_segment_never_accepts_writes(self):
+        """Test that a segment reports no free space so producers start a new ring."""
+        segment = ArraySegment(np.zeros((4, 1), dtype=np.float32))
+
+        assert segment.free == 0
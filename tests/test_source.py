@@ -0,0 +1,190 @@
+import threading
+import numpy as np
+import pytest
+
+from audio.ring_buffer import RingBuffer
+from audio.source import Source
+
+
+class TestSource:
+    """Test the per-source producer/consumer frame queue."""
+
+    def test_enqueue_then_mix_returns_frames_in_order(self):
+        """Test that queued frames are mixed in the order they were enqueued."""
+        source = Source('test', 1)
+        source.enqueue(np.arange(4, dtype=np.float32).reshape(-1, 1))
+        source.enqueue(np.arange(4, 8, dtype=np.float32).reshape(-1, 1))
+        out = np.zeros((8, 1), dtype=np.float32)
+
+        mixed = source.add_into(out)
+
+        assert mixed == 8
+        assert len(source) == 0
+        np.testing.assert_array_equal(out[:, 0], np.arange(8))
+
+    def test_enqueue_beyond_ring_capacity_chains_new_ring(self):
+        """Test that a write that does not fit starts a new ring instead of resizing."""
+        source = Source('test', 1)
+        first_ring = source._segments[0]
+        source.enqueue(np.ones((first_ring.capacity - 1, 1), dtype=np.float32))
+
+        source.enqueue(np.full((10, 1), 2.0, dtype=np.float32))
+
+        assert len(source._segments) == 2
+        assert source._segments[0] is first_ring
+        assert len(source) == first_ring.capacity + 9
+
+    def test_add_into_drains_across_rings_and_drops_empty_ones(self):
+        """Test that the consumer continues into the next ring and releases drained ones."""
+        source = Source('test', 1)
+        capacity = source._segments[0].capacity
+        source.enqueue(np.ones((capacity - 1, 1), dtype=np.float32))
+        source.enqueue(np.full((10, 1), 2.0, dtype=np.float32))
+        out = np.zeros((capacity + 4, 1), dtype=np.float32)
+
+        mixed = source.add_into(out)
+
+        assert mixed == capacity + 4
+        assert len(source._segments) == 1
+        np.testing.assert_array_equal(out[capacity - 1:, 0], 2.0)
+        assert len(source) == 5
+
+    def test_concurrent_producer_and_consumer_preserve_every_frame(self):
+        """Test that frames enqueued while the consumer mixes are neither lost nor reordered."""
+        source = Source('test', 1)
+        chunks = 400
+        chunk_frames = 300
+
+        def produce():
+            for index in range(chunks):
+                values = np.arange(index * chunk_frames, (index + 1) * chunk_frames, dtype=np.float32)
+                source.enqueue(values.reshape(-1, 1))
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = []
+        total = chunks * chunk_frames
+        while sum(len(block) for block in received) < total:
+            out = np.zeros((512, 1), dtype=np.float32)
+            mixed = source.add_into(out)
+            received.append(out[:mixed, 0])
+        producer.join()
+
+        np.testing.assert_array_equal(np.concatenate(received), np.arange(total, dtype=np.float32))
+
+
+class TestScheduledSegments:
+    """Test segments pinned to a stream frame."""
+
+    def test_scheduled_segment_starts_on_exact_frame_within_block(self):
+        """Test that the first frame lands on its stream frame and the output before it is untouched."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((4, 1), dtype=np.float32), start_frame=1029)
+        out = np.zeros((16, 1), dtype=np.float32)
+
+        mixed = source.add_into(out, position=1024)
+
+        assert mixed == 4
+        np.testing.assert_array_equal(out[:, 0], [0] * 5 + [1] * 4 + [0] * 7)
+
+    def test_repeated_scheduled_writes_do_not_grow_rings(self):
+        """Test that each scheduled copy is sized for its own write, not double the previous ring."""
+        source = Source('test', 2)
+        chunk = np.ones((256, 2), dtype=np.float32)
+        out = np.zeros((256, 2), dtype=np.float32)
+
+        for index in range(100):
+            source.enqueue(chunk, start_frame=index * 256 + 100)
+            source.add_into(out, position=index * 256)
+
+        assert max(segment.capacity for segment in source._segments) == RingBuffer._min_capacity
+
+    def test_scheduled_segment_waits_for_later_block(self):
+        """Test that nothing is mixed before the block containing the start frame."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((4, 1), dtype=np.float32), start_frame=20)
+        out = np.zeros((16, 1), dtype=np.float32)
+
+        assert source.add_into(out, position=0) == 0
+        assert len(source) == 4
+        assert source.add_into(out, position=16) == 4
+        np.testing.assert_array_equal(out[4:8, 0], 1.0)
+
+    def test_scheduled_write_after_queued_audio_leaves_gap(self):
+        """Test that a scheduled write on a playing source is separated by silence."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((4, 1), dtype=np.float32))
+        source.enqueue(np.full((2, 1), 2.0, dtype=np.float32), start_frame=10)
+        out = np.zeros((16, 1), dtype=np.float32)
+
+        source.add_into(out, position=0)
+
+        np.testing.assert_array_equal(out[:, 0], [1] * 4 + [0] * 6 + [2] * 2 + [0] * 4)
+
+    def test_late_scheduled_segment_plays_immediately(self):
+        """Test that a start frame in the past does not hold the source back."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((4, 1), dtype=np.float32), start_frame=3)
+        out = np.zeros((8, 1), dtype=np.float32)
+
+        assert source.add_into(out, position=100) == 4
+        np.testing.assert_array_equal(out[:4, 0], 1.0)
+
+    def test_unscheduled_write_follows_scheduled_segment(self):
+        """Test that later writes continue right after the scheduled audio."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((2, 1), dtype=np.float32), start_frame=4, copy=False)
+        source.enqueue(np.full((2, 1), 2.0, dtype=np.float32))
+        out = np.zeros((8, 1), dtype=np.float32)
+
+        source.add_into(out, position=0)
+
+        np.testing.assert_array_equal(out[:, 0], [0, 0, 0, 0, 1, 1, 2, 2])
+
+
+class TestBacklog:
+    """Test backlog accounting and dropping queued audio."""
+
+    def test_discard_oldest_is_applied_on_next_mix(self):
+        """Test that the consumer skips discarded frames across segments, then plays the rest."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((4, 1), dtype=np.float32))
+        source.enqueue(np.full((4, 1), 2.0, dtype=np.float32), copy=False)
+        source.enqueue(np.full((4, 1), 3.0, dtype=np.float32))
+
+        source.discard_oldest(6)
+        assert source.backlog == 6
+        assert len(source) == 12
+        out = np.zeros((8, 1), dtype=np.float32)
+        mixed = source.add_into(out)
+
+        assert mixed == 6
+        assert len(source) == 0
+        np.testing.assert_array_equal(out[:, 0], [2, 2, 3, 3, 3, 3, 0, 0])
+
+    def test_discard_oldest_never_passes_queued_frames(self):
+        """Test that discarding more than is queued only empties the queue."""
+        source = Source('test', 1)
+        source.enqueue(np.ones((4, 1), dtype=np.float32))
+
+        source.discard_oldest(10)
+        source.enqueue(np.full((2, 1), 2.0, dtype=np.float32))
+        out = np.zeros((4, 1), dtype=np.float32)
+        source.add_into(out)
+
+        np.testing.assert_array_equal(out[:, 0], [2, 2, 0, 0])
+
+    def test_has_room(self):
+        """Test the limit check used by blocking writers."""
+        source = Source('test', 1, max_frames=8)
+
+        assert source.has_room(100)
+        source.enqueue(np.ones((4, 1), dtype=np.float32))
+        assert source.has_room(4)
+        assert not source.has_room(5)
+        assert Source('test', 1).has_room(10 ** 9)
+
+    def test_unknown_policy_raises(self):
+        """Test that policies are validated at creation."""
+        with pytest.raises(ValueError):
+            Source('test', 1, max_frames=8, policy='wait')
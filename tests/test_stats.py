@@ -0,0 +1,66 @@
+import pytest
+
+from unittest.mock import Mock
+
+from audio.stats import CallbackStats, DurationStats
+
+
+def _status(**flags):
+    names = ('input_underflow', 'input_overflow', 'output_underflow', 'output_overflow', 'priming_output')
+    return Mock(**{name: flags.get(name, False) for name in names})
+
+
+class TestCallbackStats:
+    """Test callback counters and the budget histogram."""
+
+    def test_record_buckets_time_by_budget_fraction(self):
+        """Test that callback time is bucketed relative to frames / rate."""
+        stats = CallbackStats()
+
+        stats.record(0.001, 480, 48000)
+        stats.record(0.009, 480, 48000)
+        stats.record(0.02, 480, 48000)
+        snapshot = stats.snapshot()
+
+        assert snapshot['callbacks'] == 3
+        assert snapshot['frames'] == 1440
+        assert snapshot['budget_ms'] == 10.0
+        assert snapshot['max_ms'] == 20.0
+        assert snapshot['budget_histogram'] == {
+            '<=0.1': 1, '<=0.25': 0, '<=0.5': 0, '<=0.75': 0, '<=0.9': 1, '<=1': 0, '>1': 1
+        }
+
+    def test_record_counts_status_flags(self):
+        """Test that PortAudio status flags are tallied."""
+        stats = CallbackStats()
+
+        stats.record(0.001, 512, 44100, _status(output_underflow=True))
+        stats.record(0.001, 512, 44100, _status(output_underflow=True, input_overflow=True))
+        stats.record(0.001, 512, 44100, None)
+
+        assert stats.output_underflows == 2
+        assert stats.input_overflows == 1
+        assert stats.output_overflows == 0
+
+    def test_reset_clears_counters(self):
+        """Test that reset starts counting from zero."""
+        stats = CallbackStats()
+        stats.record(0.5, 512, 44100, _status(output_underflow=True))
+
+        stats.reset()
+
+        assert stats.snapshot()['callbacks'] == 0
+        assert sum(stats.histogram) == 0
+        assert stats.output_underflows == 0
+
+
+class TestDurationStats:
+    """Test the timing accumulator."""
+
+    def test_snapshot_reports_mean_and_max(self):
+        """Test that mean and max are reported in milliseconds."""
+        stats = DurationStats()
+        stats.add(0.002, 100)
+        stats.add(0.004, 100)
+
+        assert stats.snapshot() == {'count': 2, 'frames': 200, 'mean_ms': pytest.approx(3.0), 'max_ms': 4.0}
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from audio.vad import SpeechGate, speech_segments
+
+RATE = 16000
+FRAMES = 160
+
+
+def _tone(level=0.3, frequency=300.0):
+    t = np.arange(FRAMES) / RATE
+    return (level * np.sin(2 * np.pi * frequency * t)).astype(np.float32)[:, None]
+
+
+def _silence():
+    return np.zeros((FRAMES, 1), dtype=np.float32)
+
+
+def _noise(level=0.3, seed=0):
+    return (level * np.random.default_rng(seed).standard_normal((FRAMES, 1))).astype(np.float32)
+
+
+class TestSpeechGate:
+    """Test the per-block voice activity decision and segment state."""
+
+    def test_loud_tone_is_speech(self):
+        """Test that a voiced-like tone above the threshold passes."""
+        gate = SpeechGate(RATE)
+        gate.process(_tone())
+
+        level_db, zero_crossings, flatness = gate.features
+        assert gate.active.is_set()
+        assert level_db == pytest.approx(-13.5, abs=0.1)
+        assert zero_crossings < 0.1 and flatness < 0.01
+
+    def test_quiet_tone_and_white_noise_are_not_speech(self):
+        """Test that blocks below the threshold or flat and noisy are rejected."""
+        gate = SpeechGate(RATE)
+
+        assert gate.process(_tone(level=0.001)) == ()
+        assert gate.process(_noise()) == ()
+        assert not gate.active.is_set()
+
+    def test_int16_blocks_are_scaled_to_full_scale(self):
+        """Test that integer blocks give the same level as their float equivalent."""
+        gate = SpeechGate(RATE)
+        gate.process((_tone() * 32767).astype(np.int16).repeat(2, axis=1))
+
+        assert gate.features[0] == pytest.approx(-13.5, abs=0.1)
+
+    def test_segment_gets_pre_roll_and_hangover(self):
+        """Test that an onset releases the pre-roll and the gate stays open for the hangover."""
+        gate = SpeechGate(RATE, pre_roll=0.02, hangover=0.02)
+        silences = [_silence() for _ in range(3)]
+        for block in silences:
+            assert gate.process(block) == ()
+
+        onset = _tone()
+        emitted = gate.process(onset)
+        assert len(emitted) == 3 and emitted[0] is silences[1] and emitted[2] is onset
+
+        assert len(gate.process(_silence())) == 1
+        assert len(gate.process(_silence())) == 1
+        assert gate.process(_silence()) == ()
+        assert not gate.active.is_set()
+        assert (gate.blocks, gate.speech_blocks, gate.segments) == (7, 1, 1)
+
+    def test_is_speech_sizes_buffers_for_each_block_length(self):
+        """Test that is_speech works on a new gate and after the block length changes."""
+        gate = SpeechGate(RATE)
+
+        assert gate.is_speech(_tone())
+        assert gate.is_speech(np.concatenate([_tone(), _tone()]))
+        assert gate._mono.shape == (2 * FRAMES,)
+
+    def test_work_buffers_are_reused(self):
+        """Test that blocks of the same size do not reallocate the feature buffers."""
+        gate = SpeechGate(RATE)
+        gate.process(_tone())
+        buffers = gate._mono, gate._density
+
+        gate.process(_noise())
+
+        assert (gate._mono, gate._density) == buffers
+
+
+class TestSpeechSegments:
+    """Test grouping a block stream into speech segments."""
+
+    def test_only_speech_reaches_the_consumer(self):
+        """Test that silence between segments is consumed and each segment ends after its hangover."""
+        stream = [_silence()] * 5 + [_tone()] * 3 + [_silence()] * 10 + [_tone()] * 2 + [_silence()] * 2
+        gate = SpeechGate(RATE, pre_roll=0.01, hangover=0.01)
+
+        segments = [len(list(segment)) for segment in speech_segments(iter(stream), gate)]
+
+        assert segments == [5, 4]
+        assert gate.duty_cycle == pytest.approx(5 / 22)
+        assert not gate.active.is_set()
+
+    def test_unread_segment_is_skipped(self):
+        """Test that moving to the next segment drains the current one."""
+        stream = [_tone()] * 3 + [_silence()] * 4 + [_tone()]
+        gate = SpeechGate(RATE, pre_roll=0, hangover=0)
+
+        segments = speech_segments(iter(stream), gate)
+        next(segments)
+        second = list(next(segments))
+
+        assert len(second) == 1
@@ -0,0 +1,90 @@
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from audio.conversion import INT24
+from audio.wav import WavFile
+
+
+def _write_wav(path, payload: bytes, tag: int, channels: int, rate: int, bits: int, extensible: bool = False):
+    """Write a WAV file by hand, optionally with a WAVE_FORMAT_EXTENSIBLE header."""
+    block_align = channels * bits // 8
+    fmt = struct.pack('<HHIIHH', 0xFFFE if extensible else tag, channels, rate, rate * block_align,
+                      block_align, bits)
+    if extensible:
+        fmt += struct.pack('<HHI', 22, bits, 0) + struct.pack('<H', tag) + bytes(14)
+    chunks = b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+    chunks += b'LIST' + struct.pack('<I', 3) + b'abc\x00'
+    chunks += b'data' + struct.pack('<I', len(payload)) + payload
+    path.write_bytes(b'RIFF' + struct.pack('<I', 4 + len(chunks)) + b'WAVE' + chunks)
+    return path
+
+
+class TestWavFile:
+    """Test the memory-mapped WAV reader."""
+
+    def test_reads_int16_written_by_wave_module(self, tmp_path):
+        """Test that header fields and samples match what the wave module wrote."""
+        samples = np.arange(-50, 50, dtype=np.int16)
+        path = tmp_path / 'tone.wav'
+        with wave.open(str(path), 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(22050)
+            f.writeframes(samples.tobytes())
+
+        with WavFile(path) as wav:
+            assert (wav.format, wav.channels, wav.rate, wav.frames) == (np.int16, 2, 22050, 50)
+            with wav.read(10, 5) as view:
+                np.testing.assert_array_equal(np.frombuffer(view, dtype=np.int16), samples[20:30])
+
+    def test_read_past_end_is_truncated(self, tmp_path):
+        """Test that a read running over the end returns only the frames left."""
+        path = _write_wav(tmp_path / 'f.wav', np.zeros(8, dtype=np.float32).tobytes(), 3, 1, 8000, 32)
+
+        with WavFile(path) as wav:
+            with wav.read(6, 10) as view:
+                assert len(view) == 2 * 4
+            with wav.read(8, 10) as view:
+                assert len(view) == 0
+
+    def test_skips_unknown_chunks_and_odd_padding(self, tmp_path):
+        """Test that chunks other than fmt and data are skipped, including the pad byte."""
+        path = _write_wav(tmp_path / 'f.wav', np.ones(4, dtype=np.float64).tobytes(), 3, 2, 48000, 64)
+
+        with WavFile(path) as wav:
+            assert (wav.format, wav.frames) == (np.float64, 2)
+
+    def test_extensible_header_uses_sub_format(self, tmp_path):
+        """Test that WAVE_FORMAT_EXTENSIBLE files are decoded by their sub-format."""
+        path = _write_wav(tmp_path / 'f.wav', bytes(12), 1, 2, 96000, 24, extensible=True)
+
+        with WavFile(path) as wav:
+            assert (wav.format, wav.channels, wav.frames) == (INT24, 2, 2)
+
+    def test_release_keeps_frames_readable(self, tmp_path):
+        """Test that dropping consumed pages does not change what is read."""
+        samples = np.arange(100000, dtype=np.int16)
+        path = _write_wav(tmp_path / 'f.wav', samples.tobytes(), 1, 1, 44100, 16)
+
+        with WavFile(path) as wav:
+            wav.release(60000)
+            with wav.read(0, 100000) as view:
+                np.testing.assert_array_equal(np.frombuffer(view, dtype=np.int16), samples)
+
+    def test_not_a_wav_file_raises(self, tmp_path):
+        """Test that other files are rejected with ValueError."""
+        path = tmp_path / 'f.wav'
+        path.write_bytes(b'ID3' + bytes(100))
+
+        with pytest.raises(ValueError, match="not a WAV file"):
+            WavFile(path)
+
+    def test_unsupported_encoding_raises(self, tmp_path):
+        """Test that compressed encodings are rejected with ValueError."""
+        path = _write_wav(tmp_path / 'f.wav', bytes(8), 2, 1, 8000, 4)
+
+        with pytest.raises(ValueError, match="unsupported"):
+            WavFile(path)